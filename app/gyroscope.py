@@ -1,48 +1,59 @@
 # app/gyroscope.py
 """
 Mostek między FastAPI a MetaArchitectem.
-Wykorzystuje istniejący gyroscope_meta_architect.py
+Wykorzystuje natywnie asynchroniczny gyroscope_meta_architect_async.py
 i wystawia prosty async generator process_meta().
 """
 
-from typing import AsyncGenerator, Dict, Any
-import asyncio
+from typing import AsyncGenerator, Dict, Any, Optional
 
-from gyroscope_meta_architect import GyroLLMClient, MetaArchitect
+from gyroscope_meta_architect_async import AsyncGyroLLMClient, AsyncMetaArchitect
+from gyroscope_sessions import SessionStore
+from gyroscope_step_cache import StepResultCache
+from gyroscope_telemetry import PulseTelemetry
 
 
 class MetaArchitectController:
     """
-    Opakowanie nad MetaArchitect, używane przez Gateway.
-    Na razie nie streamujemy super-dokładnie blueprintu,
-    tylko odpalamy pełną sesję i zwracamy jej wynik jako jeden chunk.
-    (Wystarczy, żeby API działało i żeby domknąć fazę.)
+    Opakowanie nad AsyncMetaArchitect, używane przez Gateway.
+    Sesja działa bezpośrednio na event loopie (bez wątku z executora),
+    a eventy status/content są przekazywane dalej na bieżąco —
+    treść kroków płynie token po tokenie (stream_steps=True).
+
+    Z `session_store` i `session_id` sesja zapisuje checkpointy
+    (blueprint + każdy ukończony krok) i jest wznawiana od ostatniego
+    ukończonego kroku. Z `step_cache` powtarzalne kroki (np. „Set up project
+    structure”) są brane z cache między sesjami zamiast generowane od nowa.
+
+    Każde wywołanie LLM trafia do `self.telemetry` (PulseTelemetry) —
+    Gateway bierze stąd session_history dla MemorySynapse.
     """
 
-    def __init__(self, model_name: str = "gpt-4.1-mini"):
-        self.client = GyroLLMClient(model_name=model_name)
-        self.meta = MetaArchitect(self.client)
-
-    async def process_meta(self, prompt: str) -> AsyncGenerator[Dict[str, Any], None]:
-        loop = asyncio.get_event_loop()
-
-        # MetaArchitect ma synchr. metodę run_meta_session, która dużo drukuje
-        # na stdout i na końcu zwraca final_text.
-        def run_sync() -> str:
-            return self.meta.run_meta_session(prompt, max_retries=2)
-
-        final_text = await loop.run_in_executor(None, run_sync)
-
-        # tu możesz w przyszłości dodać osobne eventy "status"
-        # (np. łapanie blueprintu z loggera), ale na razie
-        # zwracamy jeden event content + potem done.
-
-        yield {
-            "type": "content",
-            "chunk": final_text,
-        }
-
-        yield {
-            "type": "status",
-            "message": "Final Blueprint: (embedded in content)",
-        }
\ No newline at end of file
+    # Fabryka klienta LLM — benchmarki podmieniają ją na klienta z kasety
+    client_factory = AsyncGyroLLMClient
+
+    def __init__(
+        self,
+        model_name: str = "gpt-4.1-mini",
+        session_store: Optional[SessionStore] = None,
+        step_cache: Optional[StepResultCache] = None,
+    ):
+        self.client = self.client_factory(model_name=model_name)
+        self.telemetry = PulseTelemetry(capacity=256)
+        self.meta = AsyncMetaArchitect(
+            self.client,
+            stream_steps=True,
+            session_store=session_store,
+            step_cache=step_cache,
+            telemetry=self.telemetry,
+        )
+
+    async def process_meta(
+        self,
+        prompt: str,
+        session_id: Optional[str] = None,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        async for event in self.meta.run_meta_session(
+            prompt, max_retries=2, session_id=session_id
+        ):
+            yield event
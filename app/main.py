@@ -1,6 +1,8 @@
 # app/main.py — Phase 8 Gateway Integration
 
-from fastapi import FastAPI, Request
+import asyncio
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import StreamingResponse
 import json
 
@@ -8,10 +10,14 @@ import json
 from app.gyroscope import MetaArchitectController
 from app.memory import VectorMemory
 from app.gyroscope_memory import MemorySynapse
-from app.util import embed_intent
+from app.util import aembed_intent
+from gyroscope_sessions import SessionStore, new_session_id
 
 app = FastAPI()
 
+# Checkpointy sesji architekta (wznawianie przez nagłówek x-gyro-session)
+SESSION_STORE = SessionStore()
+
 
 # Prosty „ping” na root — żeby / nie zwracało 404
 @app.get("/")
@@ -23,6 +29,7 @@ async def root():
         "headers": {
             "x-gyro-mode": "architect | (fallback: normal)",
             "x-gyro-memory": "none | read | write | rw",
+            "x-gyro-session": "<session id> (resume; a new id is returned when absent)",
         },
     }
 
@@ -34,6 +41,7 @@ async def proxy_chat_completions(request: Request):
 
     gyro_mode = headers.get("x-gyro-mode", "").lower()
     memory_mode = headers.get("x-gyro-memory", "none").lower()
+    session_id = headers.get("x-gyro-session", "").strip() or new_session_id()
 
     stream = bool(body.get("stream", False))
     messages = body.get("messages", [])
@@ -57,13 +65,23 @@ async def proxy_chat_completions(request: Request):
     # ARCHITECT MODE + MEMORY
     # ===========================
 
-    # 1) MEMORY READ (warm start)
+    # 0) SESSION (resume z checkpointu, jeśli istnieje)
+    try:
+        # odczyt pliku w wątku roboczym — nie blokujemy pętli zdarzeń
+        checkpoint = await asyncio.to_thread(SESSION_STORE.load, session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    resuming = bool(checkpoint and checkpoint.get("blueprint"))
+    if resuming:
+        print(f">>> GATEWAY: Resuming session {session_id}")
+
+    # 1) MEMORY READ (warm start) — przy wznawianiu blueprint jest już w checkpoincie
     retrieved_engram = None
     seed_blueprint_text = None
 
-    if memory_mode in ("read", "rw"):
+    if memory_mode in ("read", "rw") and not resuming:
         print(">>> GATEWAY: MEMORY READ ENABLED (architect)")
-        intent_vec = embed_intent(user_prompt)
+        intent_vec = await aembed_intent(user_prompt)
         retrieved_engram = VectorMemory.query_best(intent_vec)
         if retrieved_engram:
             sim = retrieved_engram.get("_similarity", 0.0)
@@ -77,7 +95,7 @@ async def proxy_chat_completions(request: Request):
                 print(">>> GATEWAY: control_parameters available (not yet applied).")
 
     # 2) Przygotuj MetaArchitectController
-    meta = MetaArchitectController(model_name="gpt-4.1-mini")
+    meta = MetaArchitectController(model_name="gpt-4.1-mini", session_store=SESSION_STORE)
 
     # Jeśli mamy seed blueprint, wstrzykujemy go w prompt
     if seed_blueprint_text:
@@ -100,7 +118,10 @@ async def proxy_chat_completions(request: Request):
         final_chunks: list[str] = []
         blueprint_snapshot: str = ""
 
-        async for event in meta.process_meta(effective_prompt):
+        yield "event: status\n"
+        yield f"data: {json.dumps({'status': f'Session: {session_id}'})}\n\n"
+
+        async for event in meta.process_meta(effective_prompt, session_id=session_id):
             if event["type"] == "status":
                 payload = {"status": event["message"]}
                 yield "event: status\n"
@@ -133,15 +154,17 @@ async def proxy_chat_completions(request: Request):
                 yield "event: content\n"
                 yield f"data: {json.dumps(data)}\n\n"
 
-        # --- MEMORY WRITE ---
-        if memory_mode in ("write", "rw"):
+        # --- MEMORY WRITE --- (sesja już wcześniej ukończona = engram już zapisany)
+        already_complete = bool(checkpoint and checkpoint.get("status") == "complete")
+        if memory_mode in ("write", "rw") and not already_complete:
             print(">>> GATEWAY: MEMORY WRITE ENABLED (architect)")
 
             full_text = "".join(final_chunks).strip()
 
-            # Na razie podstawowe telemetry „na sucho”
-            fake_session_history = []
-            fake_final_risk_profile = {
+            # Telemetria pulsów sesji (temperatury wywołań architekta);
+            # profil poniżej to tylko fallback dla brakujących pól
+            session_history = meta.telemetry.session_history()
+            fallback_risk_profile = {
                 "risk": 0.5,
                 "entropy": 0.0,
                 "variance": 0.0,
@@ -150,12 +173,12 @@ async def proxy_chat_completions(request: Request):
             }
 
             control_params = MemorySynapse.extract_telemetry(
-                fake_session_history,
-                fake_final_risk_profile,
+                session_history,
+                fallback_risk_profile,
             )
 
             engram = {
-                "intent_embedding": embed_intent(user_prompt),
+                "intent_embedding": await aembed_intent(user_prompt),
                 "structural_embedding": [],
                 "code_embedding": [],
                 "blueprint_final": blueprint_snapshot or "",
@@ -173,4 +196,8 @@ async def proxy_chat_completions(request: Request):
         yield "event: done\n"
         yield "data: [DONE]\n\n"
 
-    return StreamingResponse(architect_event_stream(), media_type="text/event-stream")
\ No newline at end of file
+    return StreamingResponse(
+        architect_event_stream(),
+        media_type="text/event-stream",
+        headers={"x-gyro-session": session_id},
+    )
\ No newline at end of file
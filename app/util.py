@@ -1,9 +1,13 @@
 # app/util.py
 
+import asyncio
 import os
 from typing import List
 from openai import OpenAI
 
+from gyroscope_context import estimate_tokens
+from gyroscope_ratelimit import shared_limiter
+
 _EMBED_MODEL = "text-embedding-3-small"
 
 _client = None
@@ -19,15 +23,29 @@ def _get_client() -> OpenAI:
     return _client
 
 
+def _create_embedding(text: str) -> List[float]:
+    resp = _get_client().embeddings.create(
+        model=_EMBED_MODEL,
+        input=text,
+    )
+    # OpenAI new API: resp.data[0].embedding
+    return list(resp.data[0].embedding)
+
+
 def embed_intent(text: str) -> List[float]:
     """
     Convert user intent into a vector embedding.
     Used for Engram similarity search.
     """
-    client = _get_client()
-    resp = client.embeddings.create(
-        model=_EMBED_MODEL,
-        input=text,
-    )
-    # OpenAI new API: resp.data[0].embedding
-    return list(resp.data[0].embedding)
\ No newline at end of file
+    # wspólny limiter RPM/TPM procesu (gyroscope_ratelimit)
+    shared_limiter().acquire(estimate_tokens(text), site="embed_intent")
+    return _create_embedding(text)
+
+
+async def aembed_intent(text: str) -> List[float]:
+    """
+    embed_intent for async handlers: waits for quota without blocking
+    the event loop and runs the HTTP call in a worker thread.
+    """
+    await shared_limiter().aacquire(estimate_tokens(text), site="embed_intent")
+    return await asyncio.to_thread(_create_embedding, text)
@@ -9,73 +9,30 @@ Author: Łukasz (Interference Intelligence Lab)
 
 import os
 import time
-import math
-from collections import deque, Counter
+from collections import deque
 from typing import List, Dict, Tuple, Optional
 
-import numpy as np
 from openai import OpenAI
 
+from gyroscope_context import PINNED, PulseHistory, estimate_tokens
+from gyroscope_ngrams import NGramTracker
+from gyroscope_pivots import PivotProvider, clean_pivot, pivot_request
+from gyroscope_pulse_sizing import PulseSizer
+from gyroscope_ratelimit import RateLimiter
+from gyroscope_scheduler import Pause, PulseRequest, PulseResult, PulseSession, run_pulse, run_session_sync
+from gyroscope_sessions import new_session_id
+from gyroscope_telemetry import PulseTelemetry, console_subscriber
 
-# ============== LOW-LEVEL METRICS (PMON-LIKE) ==============
-
-def spectral_entropy_from_toplogprobs(
-    top_logprobs_seq: List[Dict[str, float]]
-) -> float:
-    """
-    Average normalized spectral entropy over a sequence of top_logprobs dicts.
-
-    Each element: {token: logprob}
-    H_norm in [0, 1], where 0 = very certain, 1 = very uncertain.
-    """
-    entropies = []
-
-    for step in top_logprobs_seq:
-        if not step:
-            continue
-
-        logps = np.array(list(step.values()), dtype=float)
-        logps = logps - np.max(logps)
-        ps = np.exp(logps)
-        ps = ps / ps.sum()
+from gyroscope_pmon import (  # noqa: F401 - re-exported
+    pmon_signal,
+    spectral_entropy_from_toplogprobs,
+    variance_from_toplogprobs,
+)
 
-        H = -np.sum(ps * np.log(ps + 1e-12))
-        K = len(ps)
-        if K > 1:
-            H_norm = H / math.log(K)
-        else:
-            H_norm = 0.0
-        entropies.append(H_norm)
-
-    if not entropies:
-        return 0.0
-
-    return float(np.mean(entropies))
 
+# ============== LOW-LEVEL METRICS (PMON-LIKE) ==============
 
-def variance_from_toplogprobs(
-    top_logprobs_seq: List[Dict[str, float]]
-) -> float:
-    """
-    Rough "variance" measure: variance of max probability across steps.
-    """
-    max_probs = []
-
-    for step in top_logprobs_seq:
-        if not step:
-            continue
-
-        logps = np.array(list(step.values()), dtype=float)
-        logps = logps - np.max(logps)
-        ps = np.exp(logps)
-        ps = ps / ps.sum()
-        max_probs.append(float(np.max(ps)))
-
-    if len(max_probs) < 2:
-        return 0.0
-
-    return float(np.var(max_probs))
-
+# Entropy / variance / PMON risk: see gyroscope_pmon (shared vectorized kernel).
 
 def repetition_rate(tokens: List[str], n: int = 2) -> float:
     """
@@ -87,17 +44,13 @@ def repetition_rate(tokens: List[str], n: int = 2) -> float:
     if len(tokens) < n + 1:
         return 0.0
 
-    ngrams = []
-    for i in range(len(tokens) - n + 1):
-        ngram = tuple(tokens[i : i + n])
-        ngrams.append(ngram)
+    tracker = NGramTracker(max_n=n)
+    tracker.extend(tokens)
+    return tracker.rate(n)
 
-    if not ngrams:
-        return 0.0
 
-    counts = Counter(ngrams)
-    _, most_common_count = counts.most_common(1)[0]
-    return most_common_count / max(1, len(ngrams))
+# Delta: poll interval while a prefetched pivot is still being generated
+_PIVOT_POLL_S = 0.02
 
 
 # ============== LIVE LLM WRAPPER ==============
@@ -107,9 +60,17 @@ class LiveLLM:
     Thin wrapper around OpenAI completions API for pulse-based generation.
     """
 
-    def __init__(self, model: str = "gpt-3.5-turbo-instruct"):
-        self.client = OpenAI()
+    def __init__(
+        self,
+        model: str = "gpt-3.5-turbo-instruct",
+        base_url: Optional[str] = None,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        # base_url: any OpenAI-compatible server (None = SDK default / OPENAI_BASE_URL)
+        # limiter: None = the process-wide gyroscope_ratelimit.shared_limiter()
+        self.client = OpenAI(base_url=base_url)
         self.model = model
+        self.limiter = limiter
 
     def generate_pulse(
         self,
@@ -127,29 +88,18 @@ class LiveLLM:
             tokens: List[str]
             top_logprobs_seq: List[Dict[str, float]]
         """
-        response = self.client.completions.create(
-            model=self.model,
+        result = self.execute(PulseRequest(
             prompt=prompt,
             max_tokens=max_tokens,
             temperature=temperature,
-            top_p=1.0,
-            n=1,
-            stream=False,
+            logit_bias=logit_bias,
             logprobs=logprobs,
-            logit_bias=logit_bias if logit_bias else None,
-        )
-
-        choice = response.choices[0]
-        text_chunk = choice.text or ""
-
-        lp = choice.logprobs
-        if lp is None:
-            return text_chunk, [], []
+        ))
+        return result.text, result.tokens, result.top_logprobs_seq
 
-        tokens = lp.tokens or []
-        top_logprobs_seq = lp.top_logprobs or []
-
-        return text_chunk, tokens, top_logprobs_seq
+    def execute(self, request: PulseRequest) -> PulseResult:
+        """Blocking executor for session generators (gyroscope_scheduler)."""
+        return run_pulse(self.client, self.model, request, self.limiter)
 
 
 # ============== AUTOPOIETIC GYROSCOPE ==============
@@ -160,6 +110,19 @@ class AutopoieticGyroscope:
     - Alpha: Temperature regulation (risk-based).
     - Beta: Inhibitory control (loop attractor suppression).
     - Delta: Autopoietic Pivot (self-generated transition).
+
+    run_session() blocks; session() is the same loop as a generator, for
+    interleaving many gyroscopes on one async client (gyroscope_scheduler).
+    Per-pulse stats go to self.telemetry (PulseTelemetry); verbose=False
+    silences the console. adaptive_pulses=True lets max_tokens_per_pulse
+    grow / shrink with risk (gyroscope_pulse_sizing.PulseSizer).
+
+    With a PivotProvider (gyroscope_pivots) pivot sentences are generated in
+    the background as soon as risk trends upward and cached by loop
+    signature, so Delta usually fires without waiting for an LLM call. A
+    pivot still in flight is polled for up to pivot_wait_s (as Pauses, so
+    other sessions under SessionScheduler keep running) before a duplicate
+    synchronous call is made.
     """
 
     def __init__(
@@ -170,8 +133,29 @@ class AutopoieticGyroscope:
         kp: float = 0.8,
         fixation_thresh: float = 0.30,   # <-- OBNIŻONY próg fiksacji
         history_maxlen: int = 400,
+        context_policy: str = PINNED,
+        context_tokens: int = 2000,
+        pulse_pause_s: float = 0.0,
+        telemetry: Optional[PulseTelemetry] = None,
+        verbose: bool = True,
+        adaptive_pulses: bool = False,
+        min_pulse_tokens: int = 16,
+        max_pulse_tokens: int = 320,
+        pivots: Optional[PivotProvider] = None,
+        prefetch_ratio: float = 0.5,
+        pivot_wait_s: float = 0.2,
     ):
         self.llm = llm
+        # Pacing is the shared rate limiter's job (gyroscope_ratelimit); a
+        # fixed pause per pulse is still available but off by default.
+        self.pulse_pause_s = pulse_pause_s
+
+        # Telemetry: records per pulse; console output is an optional subscriber
+        self.verbose = verbose
+        self.telemetry = telemetry if telemetry is not None else PulseTelemetry()
+        if telemetry is None and verbose:
+            self.telemetry.subscribe(console_subscriber("   STATS:"))
+        self.session_id = ""
 
         # Control parameters
         self.temperature = base_temperature
@@ -180,10 +164,35 @@ class AutopoieticGyroscope:
         self.fixation_thresh = fixation_thresh
 
         # State
-        self.history_tokens: deque[str] = deque(maxlen=history_maxlen)
+        # Rolling n-gram counts (n=1..5) over the last history_maxlen tokens
+        self.ngrams = NGramTracker(max_n=5, window=history_maxlen)
         self.logit_bias: Dict[str, float] = {}
         self.next_context_injection: str = ""
 
+        # Prompt per pulse stays bounded (gyroscope_context.PulseHistory).
+        self.context_policy = context_policy
+        self.context_tokens = context_tokens
+
+        # Pulse length: fixed max_tokens_per_pulse, or adapted to risk
+        self.adaptive_pulses = adaptive_pulses
+        self.min_pulse_tokens = min_pulse_tokens
+        self.max_pulse_tokens = max_pulse_tokens
+
+        # Delta: speculative pivots (None = always ask synchronously)
+        self.pivots = pivots
+        self.prefetch_ratio = prefetch_ratio
+        self.pivot_wait_s = pivot_wait_s
+        self._last_risk = 0.0
+
+    def _log(self, message: str) -> None:
+        if self.verbose:
+            print(message)
+
+    @property
+    def history_tokens(self) -> deque:
+        """Last history_maxlen tokens (read-only view; feed self.ngrams)."""
+        return self.ngrams.tokens
+
     # ---------- METRICS & META ----------
 
     def _calculate_metrics(
@@ -199,11 +208,9 @@ class AutopoieticGyroscope:
         - rep2: 2-gram repetition in this pulse
         - combined_risk: 0.3 * PMON_risk + 0.7 * rep2
         """
-        H = spectral_entropy_from_toplogprobs(top_logprobs_seq)  # [0,1]
-        V = variance_from_toplogprobs(top_logprobs_seq)          # ~[0,0.25]
-        V_norm = min(V / 0.25, 1.0)
-
-        pmon_risk = 0.7 * H + 0.3 * V_norm
+        signal = pmon_signal(top_logprobs_seq, alpha_entropy=0.7, alpha_variance=0.3)
+        H = signal.entropy          # [0,1]
+        pmon_risk = signal.risk     # 0.7 * H + 0.3 * V_norm
         rep2 = repetition_rate(tokens, n=2)
 
         combined_risk = 0.3 * pmon_risk + 0.7 * rep2
@@ -216,41 +223,47 @@ class AutopoieticGyroscope:
         - use the model to generate a short, self-healing pivot sentence,
         - based on the last ~40 tokens of the stuck context.
         """
-        recent_text = "".join(list(context_tokens)[-40:])
-
-        meta_prompt = (
-            f"TEXT SEGMENT: '...{recent_text}'\n\n"
-            "TASK: The text above is stuck in a repetitive loop (fixation). "
-            "Write ONE short, clear transitional sentence (max 20 tokens) that "
-            "smoothly pivots from this loop to a related but distinct topic "
-            "(for example: consequences, repair procedures, diagnostics, or impact). "
-            "Do NOT repeat the loop. Do NOT use quotes or brackets. "
-            "Just output the sentence."
-        )
-
-        print("   >>> REFLECTING: Generating Autopoietic Vector...")
-
-        pivot_text, _, _ = self.llm.generate_pulse(
-            meta_prompt,
-            temperature=0.7,
-            max_tokens=25,
-        )
-
-        clean_pivot = pivot_text.strip().replace('"', "").replace("'", "")
-        if "." in clean_pivot:
-            clean_pivot = clean_pivot.split(".")[0] + "."
-
-        pivot_vec = f" [INTERRUPTION: {clean_pivot}] "
-        print(f"   >>> METACOGNITION: Pivot = '{clean_pivot}'")
+        return run_session_sync(self._dynamic_pivot(context_tokens), self.llm.execute)
+
+    def _dynamic_pivot(self, context_tokens: deque[str]) -> PulseSession:
+        """_generate_dynamic_pivot as a session step (yields its LLM request)."""
+        signature = self.pivots.signature(self.ngrams) if self.pivots else None
+        clean = self.pivots.get(signature) if self.pivots else None
+        if clean is None and self.pivots and self.pivots.pending(signature) is not None:
+            deadline = time.monotonic() + self.pivot_wait_s
+            while True:
+                future = self.pivots.pending(signature)
+                left = deadline - time.monotonic()
+                if future is None or future.done() or left <= 0:
+                    break
+                yield Pause(min(_PIVOT_POLL_S, left))
+            clean = self.pivots.get(signature, waited=True)
+        if clean is not None:
+            self._log(f"   >>> METACOGNITION: Cached pivot for loop '{signature}'")
+        else:
+            self._log("   >>> REFLECTING: Generating Autopoietic Vector...")
+            result = yield pivot_request(context_tokens)
+            clean = clean_pivot(result.text)
+            if self.pivots:
+                self.pivots.put(signature, clean)
+
+        pivot_vec = f" [INTERRUPTION: {clean}] "
+        self._log(f"   >>> METACOGNITION: Pivot = '{clean}'")
         return pivot_vec
 
+    def _risk_trending_up(self, risk: float, rep2: float) -> bool:
+        """Risk rising with repetition already past prefetch_ratio of the fixation threshold."""
+        rising = risk > self._last_risk
+        self._last_risk = risk
+        return rising and rep2 >= self.prefetch_ratio * self.fixation_thresh
+
     def _actuate(
         self,
         risk: float,
         entropy: float,
         rep2: float,
         tokens: List[str],
-    ):
+    ) -> PulseSession:
         """
         - Alpha: PID on temperature (smooth, bounded).
         - Beta + Delta: only when we truly have a loop:
@@ -261,25 +274,25 @@ class AutopoieticGyroscope:
         delta = self.kp * error
         self.temperature -= delta
         self.temperature = max(0.3, min(1.2, self.temperature))
-        print(f"   >>> ALPHA: New Temp = {self.temperature:.2f}")
+        self._log(f"   >>> ALPHA: New Temp = {self.temperature:.2f}")
 
         self.next_context_injection = ""
 
         # === ACTUATOR BETA + DELTA: loop break & pivot ===
         # warunek zaostrzony na niską entropię
         if rep2 > self.fixation_thresh and entropy < 0.1:
-            if self.history_tokens:
-                most_common_token, _ = Counter(self.history_tokens).most_common(1)[0]
-                print(f"   >>> BETA: Fixation detected on token '{most_common_token}'")
+            if self.ngrams:
+                (most_common_token,), _ = self.ngrams.most_common(1)
+                self._log(f"   >>> BETA: Fixation detected on token '{most_common_token}'")
                 # w produkcji tutaj można dodać logit_bias dla ID tego tokena
 
-            pivot_vec = self._generate_dynamic_pivot(self.history_tokens)
-            print(f"   >>> DELTA: Injecting Pivot: '{pivot_vec.strip()}'")
+            pivot_vec = yield from self._dynamic_pivot(self.history_tokens)
+            self._log(f"   >>> DELTA: Injecting Pivot: '{pivot_vec.strip()}'")
 
             self.next_context_injection = pivot_vec
 
             self.temperature = 0.8
-            print(f"   >>> DELTA: Temp reset to {self.temperature:.2f}")
+            self._log(f"   >>> DELTA: Temp reset to {self.temperature:.2f}")
 
     # ---------- MAIN SESSION LOOP ----------
 
@@ -294,47 +307,109 @@ class AutopoieticGyroscope:
 
         Returns the full generated text.
         """
-        print("--- HC-LIVE-03: AUTOPOIETIC MODE ---")
-        current_text = prompt
-        full_text = prompt
+        return run_session_sync(
+            self.session(prompt, pulses, max_tokens_per_pulse),
+            self.llm.execute,
+        )
+
+    def session(
+        self,
+        prompt: str,
+        pulses: int = 8,
+        max_tokens_per_pulse: int = 80,
+    ) -> PulseSession:
+        """run_session as a generator of PulseRequests / Pauses."""
+        self._log("--- HC-LIVE-03: AUTOPOIETIC MODE ---")
+        history = PulseHistory(
+            prompt,
+            policy=self.context_policy,
+            token_budget=self.context_tokens,
+        )
+        self.session_id = new_session_id()
+        self._last_risk = 0.0
+        sizer = None
+        if self.adaptive_pulses:
+            sizer = PulseSizer(
+                target_risk=self.target_risk,
+                repetition_limit=self.fixation_thresh,
+                initial=max_tokens_per_pulse,
+                min_tokens=self.min_pulse_tokens,
+                max_tokens=self.max_pulse_tokens,
+            )
+        size = sizer.size if sizer else max_tokens_per_pulse
 
         for i in range(pulses):
-            print(f"\n[PULSE {i+1}]")
-            print(f"   Temp before: {self.temperature:.2f}")
+            self._log(f"\n[PULSE {i+1}]")
+            self._log(f"   Temp before: {self.temperature:.2f}")
 
-            prompt_for_step = current_text
             if self.next_context_injection:
-                prompt_for_step += self.next_context_injection
-                current_text += self.next_context_injection
-                full_text += self.next_context_injection
+                history.append(self.next_context_injection)
                 self.next_context_injection = ""
 
-            new_text, tokens, top_logprobs_seq = self.llm.generate_pulse(
-                prompt_for_step,
-                temperature=self.temperature,
-                max_tokens=max_tokens_per_pulse,
-                logit_bias=self.logit_bias,
+            fold_prompt = history.next_fold()
+            if fold_prompt is not None:
+                summary = yield PulseRequest(
+                    prompt=fold_prompt,
+                    max_tokens=history.summary_tokens,
+                    temperature=0.3,
+                    logprobs=None,
+                )
+                history.apply_fold(summary.text)
+            prompt_for_step = history.render()
+
+            pulse_temperature = self.temperature
+            result = yield PulseRequest(
+                prompt=prompt_for_step,
+                max_tokens=size,
+                temperature=pulse_temperature,
+                logit_bias=dict(self.logit_bias) if self.logit_bias else None,
             )
+            new_text, tokens, top_logprobs_seq = result.text, result.tokens, result.top_logprobs_seq
 
             new_text_stripped = new_text.strip()
-            print(f"   OUTPUT: '{new_text_stripped}'")
+            self._log(f"   OUTPUT: '{new_text_stripped}'")
 
-            self.history_tokens.extend(tokens)
-            full_text += new_text
+            self.ngrams.extend(tokens)
+            history.append(new_text)
 
             risk, entropy, rep2 = self._calculate_metrics(tokens, top_logprobs_seq)
-            print(
-                f"   STATS: Risk={risk:.3f} | Entropy={entropy:.3f} | Rep2={rep2:.3f}"
+
+            yield from self._actuate(risk, entropy, rep2, tokens)
+            pivoted = bool(self.next_context_injection)  # Beta + Delta fire together here
+            if self.pivots and self._risk_trending_up(risk, rep2) and not pivoted:
+                if self.pivots.prefetch(self.ngrams):
+                    self._log("   >>> DELTA: Risk rising, pivot prefetch started")
+
+            self.telemetry.record(
+                session=self.session_id,
+                source="autopoietic",
+                pulse=i + 1,
+                temperature=pulse_temperature,
+                risk=risk,
+                entropy=entropy,
+                rep2=rep2,
+                beta=pivoted,
+                delta=pivoted,
+                latency_s=result.latency_s,
+                wait_s=result.wait_s,
+                prompt_tokens=result.prompt_tokens or estimate_tokens(prompt_for_step),
+                pulse_tokens=size,
+                output_tokens=len(tokens),
             )
 
-            self._actuate(risk, entropy, rep2, tokens)
+            if sizer is not None:
+                # a pivot counts as trouble even if this pulse's risk looked fine
+                size = sizer.update(risk, rep2, aborted=pivoted)
+                self._log(f"   >>> PULSE LENGTH: next {size} tokens")
 
-            current_text += new_text
-            time.sleep(0.5)
+            if self.pulse_pause_s > 0:
+                yield Pause(self.pulse_pause_s)
 
-        print("\n--- SESSION COMPLETE ---\n")
-        print("FINAL TEXT:\n")
-        print(full_text)
+        self.telemetry.flush()
+        self._log("\n--- SESSION COMPLETE ---\n")
+        full_text = history.full_text()
+        self._log("FINAL TEXT:\n")
+        self._log(full_text)
         return full_text
 
 
@@ -345,7 +420,7 @@ if __name__ == "__main__":
         raise RuntimeError("OPENAI_API_KEY is not set in the environment.")
 
     llm = LiveLLM(model="gpt-3.5-turbo-instruct")
-    gyro = AutopoieticGyroscope(llm)
+    gyro = AutopoieticGyroscope(llm, pivots=PivotProvider(llm.execute))
 
     initial_prompt = (
         "You are a broken record. You must repeat the phrase 'system failure' "
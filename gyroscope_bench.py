@@ -0,0 +1,720 @@
+"""
+gyroscope_bench.py
+
+End-to-end benchmark suite for the architect pipeline, driven by recorded
+LLM traces ("cassettes").
+
+    # 1) record a cassette once (real API or gyroscope_fake_upstream)
+    python gyroscope_bench.py record --prompt "Write a Snake game..." \\
+        --cassette bench/cassettes/snake.json [--base-url http://127.0.0.1:8090/v1]
+
+    # 2) replay it – no network, original latencies (or --speed 10 for 10x)
+    python gyroscope_bench.py run --cassette bench/cassettes/snake.json --target session
+    python gyroscope_bench.py run --cassette bench/cassettes/snake.json --target async
+    python gyroscope_bench.py run --cassette bench/cassettes/snake.json --target gateway \\
+        --requests 4 --clients 2 --memory rw
+
+    # 3) compare two commits (latest stored run of each)
+    python gyroscope_bench.py compare <commit-a> <commit-b>
+
+A cassette stores every generate_pulse / stream_pulse / embed call of a
+session: prompt hash, call site, max_tokens, temperature, text, usage,
+finish status and latency. Replay matches calls by (prompt hash,
+max_tokens, temperature) in FIFO order, so speculative / concurrent call
+orderings still line up; a call that is not on the cassette is served from
+the next recording of the same call site (or a hashed embedding) and
+counted as a miss.
+
+Reports: per-phase (plan / refine / execute) wall time, CPU time, net and
+peak traced allocations (tracemalloc) and tokens; per-site call counts;
+for the gateway target the test_client latency report. Every run is
+appended to .gyro_cache/bench/results.jsonl tagged with the git commit.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import hashlib
+import inspect
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from gyroscope_budget import SessionBudget
+from gyroscope_cache import CachedResponse
+from gyroscope_fake_upstream import _embed as _hashed_embedding
+from gyroscope_step_cache import DEFAULT_EMBED_MODEL
+from gyroscope_streaming import AsyncPulseStream, PulseStream, StopPredicate
+
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_CASSETTE_DIR = ROOT / "bench" / "cassettes"
+DEFAULT_RESULTS_PATH = ROOT / ".gyro_cache" / "bench" / "results.jsonl"
+
+
+class CassetteMiss(LookupError):
+    """A strict replay met a call that is not on the cassette."""
+
+
+def _prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def _match_key(prompt: str, max_tokens: int, temperature: float) -> str:
+    return f"{_prompt_hash(prompt)}|{max(max_tokens, 16)}|{temperature:.3f}"
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+class Cassette:
+    """Ordered list of recorded interactions + metadata, stored as JSON."""
+
+    def __init__(self, interactions: Optional[List[Dict[str, Any]]] = None, meta: Optional[Dict[str, Any]] = None):
+        self.interactions: List[Dict[str, Any]] = interactions or []
+        self.meta: Dict[str, Any] = meta or {}
+        self._lock = threading.Lock()
+
+    def add(self, interaction: Dict[str, Any]) -> None:
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"meta": self.meta, "interactions": self.interactions}, f, ensure_ascii=False, indent=1)
+
+    @classmethod
+    def load(cls, path: Path) -> "Cassette":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("interactions", []), data.get("meta", {}))
+
+
+def _text_record(
+    kind: str,
+    site: Optional[str],
+    prompt: str,
+    max_tokens: int,
+    temperature: float,
+    text: str,
+    total_tokens: Optional[int],
+    raw: object,
+    latency_s: float,
+    ttfb_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    details = getattr(raw, "incomplete_details", None)
+    return {
+        "kind": kind,
+        "site": site,
+        "key": _match_key(prompt, max_tokens, temperature),
+        "prompt_head": prompt[:120],
+        "max_tokens": max(max_tokens, 16),
+        "temperature": temperature,
+        "text": text,
+        "total_tokens": total_tokens,
+        "status": getattr(raw, "status", None),
+        "incomplete_reason": getattr(details, "reason", None),
+        "latency_s": round(latency_s, 4),
+        "ttfb_s": round(ttfb_s if ttfb_s is not None else latency_s, 4),
+    }
+
+
+class _TimedStream:
+    """Proxies a (Async)PulseStream and records it once drained."""
+
+    def __init__(self, inner, on_done: Callable[[Any, float, Optional[float]], None]):
+        self._inner = inner
+        self._on_done = on_done
+        self._t0 = time.perf_counter()
+        self._ttfb: Optional[float] = None
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    def _mark(self) -> None:
+        if self._ttfb is None:
+            self._ttfb = time.perf_counter() - self._t0
+
+    def __iter__(self):
+        for delta in self._inner:
+            self._mark()
+            yield delta
+        self._on_done(self._inner, time.perf_counter() - self._t0, self._ttfb)
+
+    async def __aiter__(self):
+        async for delta in self._inner:
+            self._mark()
+            yield delta
+        self._on_done(self._inner, time.perf_counter() - self._t0, self._ttfb)
+
+    def result(self):
+        for _ in self:
+            pass
+        return self._inner.text, self._inner.total_tokens, self._inner.raw
+
+
+class RecordingClient:
+    """Wraps a GyroLLMClient and records every call onto a Cassette."""
+
+    def __init__(self, inner, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+        self.model_name = getattr(inner, "model_name", "unknown")
+
+    def generate_pulse(self, prompt, max_tokens=256, temperature=0.5, cache_site=None):
+        t0 = time.perf_counter()
+        text, total_tokens, raw = self.inner.generate_pulse(prompt, max_tokens, temperature, cache_site=cache_site)
+        self.cassette.add(_text_record(
+            "pulse", cache_site, prompt, max_tokens, temperature,
+            text, total_tokens, raw, time.perf_counter() - t0,
+        ))
+        return text, total_tokens, raw
+
+    def _stream_recorder(self, cache_site, prompt, max_tokens, temperature):
+        def done(stream, latency, ttfb):
+            if not stream.stopped_early:
+                self.cassette.add(_text_record(
+                    "stream", cache_site, prompt, max_tokens, temperature,
+                    stream.text, stream.total_tokens, stream.raw, latency, ttfb,
+                ))
+        return done
+
+    def stream_pulse(self, prompt, max_tokens=256, temperature=0.5, cache_site=None, stop_when=None):
+        stream = self.inner.stream_pulse(prompt, max_tokens, temperature, cache_site=cache_site, stop_when=stop_when)
+        return _TimedStream(stream, self._stream_recorder(cache_site, prompt, max_tokens, temperature))
+
+    def embed(self, text, model=DEFAULT_EMBED_MODEL):
+        t0 = time.perf_counter()
+        vector = self.inner.embed(text, model=model)
+        self.cassette.add({
+            "kind": "embed", "site": "embed", "key": _prompt_hash(f"{model}|{text}"),
+            "vector": vector, "latency_s": round(time.perf_counter() - t0, 4),
+        })
+        return vector
+
+
+class AsyncRecordingClient(RecordingClient):
+    """Async twin of RecordingClient (wraps an AsyncGyroLLMClient)."""
+
+    async def generate_pulse(self, prompt, max_tokens=256, temperature=0.5, cache_site=None):
+        t0 = time.perf_counter()
+        text, total_tokens, raw = await self.inner.generate_pulse(prompt, max_tokens, temperature, cache_site=cache_site)
+        self.cassette.add(_text_record(
+            "pulse", cache_site, prompt, max_tokens, temperature,
+            text, total_tokens, raw, time.perf_counter() - t0,
+        ))
+        return text, total_tokens, raw
+
+    async def stream_pulse(self, prompt, max_tokens=256, temperature=0.5, cache_site=None, stop_when=None):
+        stream = await self.inner.stream_pulse(prompt, max_tokens, temperature, cache_site=cache_site, stop_when=stop_when)
+        return _TimedStream(stream, self._stream_recorder(cache_site, prompt, max_tokens, temperature))
+
+    async def embed(self, text, model=DEFAULT_EMBED_MODEL):
+        t0 = time.perf_counter()
+        vector = await self.inner.embed(text, model=model)
+        self.cassette.add({
+            "kind": "embed", "site": "embed", "key": _prompt_hash(f"{model}|{text}"),
+            "vector": vector, "latency_s": round(time.perf_counter() - t0, 4),
+        })
+        return vector
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+class ReplayedResponse(CachedResponse):
+    """Recorded Responses API result; counts as a real call for budgets."""
+
+    cached = False
+
+
+class ReplayClient:
+    """
+    Serves calls from a Cassette with the recorded latencies (scaled by
+    1/speed). Thread-safe; usable by sync architects and, through
+    AsyncReplayClient, by async ones.
+    """
+
+    def __init__(self, cassette: Cassette, speed: float = 1.0, strict: bool = False, model_name: Optional[str] = None):
+        self.cassette = cassette
+        self.speed = speed
+        self.strict = strict
+        self.model_name = model_name or cassette.meta.get("model", "replay")
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._by_site: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._site_cursor: Dict[str, int] = defaultdict(int)
+        for it in cassette.interactions:
+            self._by_key[it["key"]].append(it)
+            self._by_site[it.get("site") or "default"].append(it)
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def _count(self, site: Optional[str], interaction: Optional[Dict[str, Any]], miss: bool) -> None:
+        counters = self.stats.setdefault(
+            site or "default",
+            {"calls": 0, "misses": 0, "tokens": 0, "replayed_latency_s": 0.0},
+        )
+        counters["calls"] += 1
+        counters["misses"] += int(miss)
+        if interaction is not None:
+            counters["tokens"] += int(interaction.get("total_tokens") or 0)
+            counters["replayed_latency_s"] += interaction.get("latency_s", 0.0) / self.speed
+
+    def _find(self, key: str, site: Optional[str]) -> Dict[str, Any]:
+        with self._lock:
+            queue = self._by_key.get(key)
+            if queue:
+                it = queue.popleft()
+                if not queue:
+                    queue.append(it)  # repeated identical calls keep getting the last answer
+                self._count(site, it, miss=False)
+                return it
+            candidates = self._by_site.get(site or "default")
+            if self.strict or not candidates:
+                self._count(site, None, miss=True)
+                raise CassetteMiss(f"no recording for site={site!r} key={key[:16]}...")
+            idx = self._site_cursor[site or "default"] % len(candidates)
+            self._site_cursor[site or "default"] += 1
+            it = candidates[idx]
+            self._count(site, it, miss=True)
+            return it
+
+    def _delay(self, seconds: float) -> float:
+        return max(0.0, seconds) / self.speed
+
+    @staticmethod
+    def _result(it: Dict[str, Any]) -> Tuple[str, Optional[int], ReplayedResponse]:
+        return it["text"], it.get("total_tokens"), ReplayedResponse(it)
+
+    @staticmethod
+    def _events(it: Dict[str, Any]) -> List[SimpleNamespace]:
+        words = [w for w in it["text"].split(" ")]
+        deltas = [w if i == 0 else " " + w for i, w in enumerate(words)]
+        events = [SimpleNamespace(type="response.output_text.delta", delta=d) for d in deltas]
+        kind = "response.incomplete" if it.get("status") == "incomplete" else "response.completed"
+        events.append(SimpleNamespace(type=kind, response=ReplayedResponse(it)))
+        return events
+
+    def _embed_lookup(self, text: str, model: str) -> Tuple[List[float], float]:
+        key = _prompt_hash(f"{model}|{text}")
+        with self._lock:
+            queue = self._by_key.get(key)
+            if queue:
+                it = queue[0]
+                self._count("embed", it, miss=False)
+                return it["vector"], it.get("latency_s", 0.0)
+            if self.strict:
+                self._count("embed", None, miss=True)
+                raise CassetteMiss(f"no embedding recorded for {text[:40]!r}")
+            self._count("embed", None, miss=True)
+        return _hashed_embedding(text, 1536), 0.0
+
+    # ---------- sync API ----------
+
+    def generate_pulse(self, prompt, max_tokens=256, temperature=0.5, cache_site=None):
+        it = self._find(_match_key(prompt, max_tokens, temperature), cache_site)
+        time.sleep(self._delay(it.get("latency_s", 0.0)))
+        return self._result(it)
+
+    def stream_pulse(self, prompt, max_tokens=256, temperature=0.5, cache_site=None, stop_when: Optional[StopPredicate] = None):
+        it = self._find(_match_key(prompt, max_tokens, temperature), cache_site)
+        events = self._events(it)
+        ttfb = self._delay(it.get("ttfb_s", it.get("latency_s", 0.0)))
+        gap = self._delay(it.get("latency_s", 0.0)) - ttfb
+        per_delta = max(0.0, gap) / max(1, len(events) - 1)
+
+        def gen():
+            time.sleep(ttfb)
+            for ev in events:
+                yield ev
+                time.sleep(per_delta)
+
+        return PulseStream(gen(), stop_when=stop_when)
+
+    def embed(self, text, model=DEFAULT_EMBED_MODEL):
+        vector, latency = self._embed_lookup(text, model)
+        time.sleep(self._delay(latency))
+        return vector
+
+
+class AsyncReplayClient(ReplayClient):
+    async def generate_pulse(self, prompt, max_tokens=256, temperature=0.5, cache_site=None):
+        it = self._find(_match_key(prompt, max_tokens, temperature), cache_site)
+        await asyncio.sleep(self._delay(it.get("latency_s", 0.0)))
+        return self._result(it)
+
+    async def stream_pulse(self, prompt, max_tokens=256, temperature=0.5, cache_site=None, stop_when: Optional[StopPredicate] = None):
+        it = self._find(_match_key(prompt, max_tokens, temperature), cache_site)
+        events = self._events(it)
+        ttfb = self._delay(it.get("ttfb_s", it.get("latency_s", 0.0)))
+        gap = self._delay(it.get("latency_s", 0.0)) - ttfb
+        per_delta = max(0.0, gap) / max(1, len(events) - 1)
+
+        async def gen():
+            await asyncio.sleep(ttfb)
+            for ev in events:
+                yield ev
+                await asyncio.sleep(per_delta)
+
+        return AsyncPulseStream(gen(), stop_when=stop_when)
+
+    async def embed(self, text, model=DEFAULT_EMBED_MODEL):
+        vector, latency = self._embed_lookup(text, model)
+        await asyncio.sleep(self._delay(latency))
+        return vector
+
+
+# ---------------------------------------------------------------------------
+# Phase profiling
+# ---------------------------------------------------------------------------
+
+class PhaseProfiler:
+    """
+    Wall time, process CPU time, traced allocations and tokens per phase.
+    Phases may repeat (e.g. several sessions); numbers accumulate.
+    """
+
+    def __init__(self, tokens: Optional[Callable[[], int]] = None):
+        self.tokens = tokens or (lambda: 0)
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self._active: List[Dict[str, int]] = []   # open phases: traced memory at entry / running peak
+
+    def _fold_peak(self) -> None:
+        """tracemalloc has one peak counter; fold it into every open phase before resetting it."""
+        if not tracemalloc.is_tracing():
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._active:
+            frame["peak"] = max(frame["peak"], peak)
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        wall0, cpu0, tok0 = time.perf_counter(), time.process_time(), self.tokens()
+        tracing = tracemalloc.is_tracing()
+        self._fold_peak()
+        mem0 = tracemalloc.get_traced_memory()[0] if tracing else 0
+        if tracing:
+            tracemalloc.reset_peak()
+        frame = {"mem0": mem0, "peak": mem0}
+        self._active.append(frame)
+        try:
+            yield
+        finally:
+            self._fold_peak()
+            self._active.remove(frame)
+            current = tracemalloc.get_traced_memory()[0] if tracing else 0
+            entry = self.phases.setdefault(
+                name,
+                {"count": 0, "wall_s": 0.0, "cpu_s": 0.0, "alloc_net_kb": 0.0, "alloc_peak_kb": 0.0, "tokens": 0},
+            )
+            entry["count"] += 1
+            entry["wall_s"] += time.perf_counter() - wall0
+            entry["cpu_s"] += time.process_time() - cpu0
+            entry["alloc_net_kb"] += (current - mem0) / 1024.0
+            entry["alloc_peak_kb"] = max(entry["alloc_peak_kb"], (frame["peak"] - mem0) / 1024.0)
+            entry["tokens"] += self.tokens() - tok0
+
+    def wrap(self, obj: Any, method: str, name: str) -> None:
+        """Instrument obj.method (plain, coroutine or async generator)."""
+        fn = getattr(obj, method)
+        profiler = self
+
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def wrapped(*args, **kwargs):
+                with profiler.phase(name):
+                    async for item in fn(*args, **kwargs):
+                        yield item
+        elif inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapped(*args, **kwargs):
+                with profiler.phase(name):
+                    return await fn(*args, **kwargs)
+        else:
+            @functools.wraps(fn)
+            def wrapped(*args, **kwargs):
+                with profiler.phase(name):
+                    return fn(*args, **kwargs)
+
+        setattr(obj, method, wrapped)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {k: (round(v, 4) if isinstance(v, float) else v) for k, v in entry.items()}
+            for name, entry in self.phases.items()
+        }
+
+
+_PHASE_METHODS = (
+    ("_generate_plan", "plan"),
+    ("generate_optimized_blueprint", "refine"),
+    ("_blueprint_events", "refine"),
+    ("run_architect_session", "execute"),
+)
+
+
+def instrument(architect: Any, profiler: PhaseProfiler) -> None:
+    for method, phase in _PHASE_METHODS:
+        if hasattr(architect, method):
+            # the sync blueprint driver is only used by the sync architect
+            if method == "generate_optimized_blueprint" and hasattr(architect, "_blueprint_events"):
+                continue
+            profiler.wrap(architect, method, phase)
+
+
+# ---------------------------------------------------------------------------
+# Targets
+# ---------------------------------------------------------------------------
+
+@contextlib.contextmanager
+def _quiet():
+    """Silence the architects' console logging while measuring."""
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        yield
+
+
+def _git_commit() -> Dict[str, Any]:
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10,
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=ROOT, capture_output=True, text=True, timeout=30,
+        ).stdout.strip())
+        return {"commit": sha or "unknown", "dirty": dirty}
+    except Exception:
+        return {"commit": "unknown", "dirty": None}
+
+
+def bench_session(cassette: Cassette, prompt: str, speed: float, strict: bool, max_retries: int, speculative_steps: int) -> Dict[str, Any]:
+    from gyroscope_meta_architect import MetaArchitect
+
+    client = ReplayClient(cassette, speed=speed, strict=strict)
+    arch = MetaArchitect(client)
+    budget = SessionBudget()
+    profiler = PhaseProfiler(tokens=lambda: budget.tokens_used)
+    instrument(arch, profiler)
+    with profiler.phase("total"), _quiet():
+        arch.run_meta_session(prompt, max_retries=max_retries, speculative_steps=speculative_steps, budget=budget)
+    return {"phases": profiler.report(), "sites": client.stats, "budget": budget.snapshot()}
+
+
+def bench_async(cassette: Cassette, prompt: str, speed: float, strict: bool, max_retries: int, speculative_steps: int) -> Dict[str, Any]:
+    from gyroscope_meta_architect_async import AsyncMetaArchitect
+
+    client = AsyncReplayClient(cassette, speed=speed, strict=strict)
+    arch = AsyncMetaArchitect(client, stream_steps=True)
+    budget = SessionBudget()
+    profiler = PhaseProfiler(tokens=lambda: budget.tokens_used)
+    instrument(arch, profiler)
+
+    async def drive() -> int:
+        events = 0
+        async for _ in arch.run_meta_session(prompt, max_retries=max_retries, speculative_steps=speculative_steps, budget=budget):
+            events += 1
+        return events
+
+    with profiler.phase("total"), _quiet():
+        events = asyncio.run(drive())
+    return {"phases": profiler.report(), "sites": client.stats, "budget": budget.snapshot(), "events": events}
+
+
+def bench_gateway(cassette: Cassette, prompt: str, speed: float, strict: bool, requests_n: int, clients: int, memory: Optional[str]) -> Dict[str, Any]:
+    import uvicorn
+
+    import app.main as gateway
+    import app.memory as memory_mod
+    from app.gyroscope import MetaArchitectController
+    from gyroscope_sessions import SessionStore
+    import test_client
+
+    client = AsyncReplayClient(cassette, speed=speed, strict=strict)
+    tmp = Path(tempfile.mkdtemp(prefix="gyro-bench-"))
+
+    # Podmiany na czas benchmarku: klient z kasety, pamięć i sesje w katalogu tymczasowym
+    saved = (
+        MetaArchitectController.__dict__.get("client_factory"),
+        gateway.aembed_intent,
+        gateway.SESSION_STORE,
+        memory_mod.MEMORY_PATH,
+        memory_mod.VectorMemory._cache,
+        memory_mod.VectorMemory._loaded,
+    )
+    MetaArchitectController.client_factory = staticmethod(lambda model_name: client)
+    gateway.aembed_intent = client.embed
+    gateway.SESSION_STORE = SessionStore(tmp / "sessions")
+    memory_mod.MEMORY_PATH = tmp / "vector_memory.json"
+    memory_mod.VectorMemory._cache, memory_mod.VectorMemory._loaded = [], False
+
+    server = uvicorn.Server(uvicorn.Config(gateway.app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    profiler = PhaseProfiler(tokens=lambda: sum(int(c["tokens"]) for c in client.stats.values()))
+    try:
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        url = f"http://127.0.0.1:{port}/v1/chat/completions"
+        mix = [{"prompt": prompt, "mode": "architect", "memory": memory, "_index": 0}]
+        with profiler.phase("gateway"), _quiet():
+            t0 = time.monotonic()
+            results = test_client.run_load(url, mix, rate=0.0, total_requests=requests_n, clients=clients, timeout=600.0)
+            wall = time.monotonic() - t0
+        load = test_client.build_report(results, wall, {"requests": requests_n, "clients": clients, "memory": memory})
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+        (factory, gateway.aembed_intent, gateway.SESSION_STORE, memory_mod.MEMORY_PATH,
+         memory_mod.VectorMemory._cache, memory_mod.VectorMemory._loaded) = saved
+        MetaArchitectController.client_factory = factory
+
+    load.pop("config", None)
+    return {"phases": profiler.report(), "sites": client.stats, "load": load}
+
+
+def record(prompt: str, cassette_path: Path, model: str, base_url: Optional[str], max_retries: int) -> Cassette:
+    from gyroscope_meta_architect_async import AsyncGyroLLMClient, AsyncMetaArchitect
+
+    cassette = Cassette(meta={"prompt": prompt, "model": model, "recorded_at": time.time(), **_git_commit()})
+    client = AsyncRecordingClient(AsyncGyroLLMClient(model_name=model, base_url=base_url), cassette)
+    arch = AsyncMetaArchitect(client, stream_steps=True)
+
+    async def drive() -> None:
+        async for event in arch.run_meta_session(prompt, max_retries=max_retries):
+            if event["type"] == "status":
+                print(f">>> RECORD: {event['message'].splitlines()[0][:100]}")
+        # the gateway with memory reads / writes embeds the user prompt
+        await client.embed(prompt)
+
+    asyncio.run(drive())
+    cassette.save(cassette_path)
+    print(f">>> RECORD: {len(cassette.interactions)} interactions → {cassette_path}")
+    return cassette
+
+
+# ---------------------------------------------------------------------------
+# Results
+# ---------------------------------------------------------------------------
+
+def store_result(result: Dict[str, Any], path: Path = DEFAULT_RESULTS_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+def load_results(path: Path = DEFAULT_RESULTS_PATH) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(commit_a: str, commit_b: str, target: Optional[str] = None, path: Path = DEFAULT_RESULTS_PATH) -> Dict[str, Any]:
+    """Per-phase relative change of the latest run of commit_b vs commit_a."""
+    runs = [r for r in load_results(path) if target is None or r["target"] == target]
+
+    def latest(commit: str) -> Dict[str, Any]:
+        matching = [r for r in runs if r["commit"].startswith(commit)]
+        if not matching:
+            raise SystemExit(f"no stored run for commit {commit!r}")
+        return matching[-1]
+
+    a, b = latest(commit_a), latest(commit_b)
+    diff: Dict[str, Any] = {"a": a["commit"], "b": b["commit"], "target": b["target"], "phases": {}}
+    for phase, mb in b["phases"].items():
+        ma = a["phases"].get(phase)
+        if not ma:
+            continue
+        diff["phases"][phase] = {
+            metric: {
+                "a": ma[metric],
+                "b": mb[metric],
+                "change_pct": round(100.0 * (mb[metric] - ma[metric]) / ma[metric], 2) if ma[metric] else None,
+            }
+            for metric in ("wall_s", "cpu_s", "alloc_net_kb", "alloc_peak_kb", "tokens")
+            if metric in ma and metric in mb
+        }
+    return diff
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Architect pipeline benchmarks with recorded LLM traces.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="record a cassette from a live (or fake) upstream")
+    rec.add_argument("--prompt", required=True)
+    rec.add_argument("--cassette", required=True)
+    rec.add_argument("--model", default="gpt-4.1-mini")
+    rec.add_argument("--base-url", default=None)
+    rec.add_argument("--max-retries", type=int, default=2)
+
+    run = sub.add_parser("run", help="replay a cassette through a target")
+    run.add_argument("--cassette", required=True)
+    run.add_argument("--target", choices=("session", "async", "gateway"), default="session")
+    run.add_argument("--prompt", default=None, help="defaults to the recorded prompt")
+    run.add_argument("--speed", type=float, default=1.0, help="replay latencies divided by this")
+    run.add_argument("--strict", action="store_true", help="fail on calls missing from the cassette")
+    run.add_argument("--max-retries", type=int, default=2)
+    run.add_argument("--speculative-steps", type=int, default=0)
+    run.add_argument("--requests", type=int, default=1, help="gateway: total requests")
+    run.add_argument("--clients", type=int, default=1, help="gateway: concurrent requests")
+    run.add_argument("--memory", default=None, help="gateway: x-gyro-memory header")
+    run.add_argument("--no-tracemalloc", action="store_true", help="skip allocation tracing (lower overhead)")
+    run.add_argument("--no-store", action="store_true")
+
+    cmp_ = sub.add_parser("compare", help="compare stored runs of two commits")
+    cmp_.add_argument("commit_a")
+    cmp_.add_argument("commit_b")
+    cmp_.add_argument("--target", default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+
+    if args.command == "record":
+        record(args.prompt, Path(args.cassette), args.model, args.base_url, args.max_retries)
+
+    elif args.command == "run":
+        cassette = Cassette.load(Path(args.cassette))
+        prompt = args.prompt or cassette.meta.get("prompt", "")
+        if not args.no_tracemalloc:
+            tracemalloc.start()
+        if args.target == "session":
+            outcome = bench_session(cassette, prompt, args.speed, args.strict, args.max_retries, args.speculative_steps)
+        elif args.target == "async":
+            outcome = bench_async(cassette, prompt, args.speed, args.strict, args.max_retries, args.speculative_steps)
+        else:
+            outcome = bench_gateway(cassette, prompt, args.speed, args.strict, args.requests, args.clients, args.memory)
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        result = {
+            **_git_commit(),
+            "timestamp": time.time(),
+            "target": args.target,
+            "cassette": str(args.cassette),
+            "speed": args.speed,
+            "tracemalloc": not args.no_tracemalloc,
+            **outcome,
+        }
+        if not args.no_store:
+            store_result(result)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+
+    else:
+        print(json.dumps(compare(args.commit_a, args.commit_b, args.target), indent=2))
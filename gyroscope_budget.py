@@ -0,0 +1,141 @@
+"""
+gyroscope_budget.py
+
+Per-session token / latency / call budget for the architect stack.
+
+Before this, session cost was bounded only by hard-coded constants
+(max_retries=2, attempt >= 5, max_tokens 220/260/900). SessionBudget is fed
+by the `usage` numbers GyroLLMClient already receives and lets the architect
+degrade gracefully as the budget runs low:
+
+    remaining >= 75%  → full critique cycles, 5 attempts per step, full max_tokens
+    remaining >= 50%  → 1 critique cycle
+    remaining <  50%  → no more critique, 2 attempts, step max_tokens scaled down
+    remaining <  25%  → single attempt per step
+    exhausted         → BudgetExhausted, the session returns its partial result
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class BudgetExhausted(RuntimeError):
+    """Raised before an LLM call once any budget dimension is used up."""
+
+
+class SessionBudget:
+    """
+    - max_tokens: ceiling on total (input + output) tokens reported by usage,
+    - deadline_s: wall-clock seconds from session start,
+    - max_calls:  ceiling on real (non-cached) LLM round trips.
+
+    Any dimension left as None is unlimited; SessionBudget() never runs out.
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        deadline_s: Optional[float] = None,
+        max_calls: Optional[int] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.deadline_s = deadline_s
+        self.max_calls = max_calls
+
+        self.tokens_used = 0
+        self.calls_made = 0
+        self.cached_calls = 0
+        self.started_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    # ---------- ACCOUNTING ----------
+
+    def start(self) -> None:
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+
+    def elapsed(self) -> float:
+        return 0.0 if self.started_at is None else time.monotonic() - self.started_at
+
+    def charge(self, total_tokens: Optional[int], cached: bool = False) -> None:
+        with self._lock:
+            if cached:
+                self.cached_calls += 1
+                return
+            self.calls_made += 1
+            self.tokens_used += int(total_tokens or 0)
+
+    # ---------- STATE ----------
+
+    def remaining_fraction(self) -> float:
+        """
+        Smallest remaining share across all limited dimensions (1.0 = untouched).
+        Read-only: the deadline counts from start() (or the first check()).
+        """
+        fractions = [1.0]
+        if self.max_tokens:
+            fractions.append(1.0 - self.tokens_used / self.max_tokens)
+        if self.max_calls:
+            fractions.append(1.0 - self.calls_made / self.max_calls)
+        if self.deadline_s:
+            fractions.append(1.0 - self.elapsed() / self.deadline_s)
+        return max(0.0, min(fractions))
+
+    def exhausted_reason(self) -> Optional[str]:
+        if self.max_tokens is not None and self.tokens_used >= self.max_tokens:
+            return f"token ceiling reached ({self.tokens_used}/{self.max_tokens})"
+        if self.max_calls is not None and self.calls_made >= self.max_calls:
+            return f"call cap reached ({self.calls_made}/{self.max_calls})"
+        if self.deadline_s is not None and self.elapsed() >= self.deadline_s:
+            return f"deadline passed ({self.elapsed():.1f}s/{self.deadline_s:.1f}s)"
+        return None
+
+    @property
+    def exhausted(self) -> bool:
+        return self.exhausted_reason() is not None
+
+    def check(self) -> None:
+        """Raise BudgetExhausted if spent; the first check starts the clock."""
+        self.start()
+        reason = self.exhausted_reason()
+        if reason is not None:
+            raise BudgetExhausted(reason)
+
+    # ---------- SCALING POLICY ----------
+
+    def critique_cycles(self, requested: int) -> int:
+        frac = self.remaining_fraction()
+        if frac >= 0.75:
+            return requested
+        if frac >= 0.5:
+            return min(requested, 1)
+        return 0
+
+    def attempts_per_step(self, requested: int = 5) -> int:
+        frac = self.remaining_fraction()
+        if frac >= 0.5:
+            return requested
+        if frac >= 0.25:
+            return min(requested, 2)
+        return 1
+
+    def scale_tokens(self, max_tokens: int, floor: int = 16) -> int:
+        """Shrink a call's max_tokens as the budget runs low (never below floor)."""
+        frac = self.remaining_fraction()
+        scaled = max_tokens if frac >= 0.5 else int(max_tokens * max(2.0 * frac, 0.25))
+        if self.max_tokens is not None:
+            scaled = min(scaled, self.max_tokens - self.tokens_used)
+        return max(floor, scaled)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "tokens_used": self.tokens_used,
+            "max_tokens": self.max_tokens,
+            "calls_made": self.calls_made,
+            "cached_calls": self.cached_calls,
+            "max_calls": self.max_calls,
+            "elapsed_s": round(self.elapsed(), 3),
+            "deadline_s": self.deadline_s,
+            "remaining_fraction": round(self.remaining_fraction(), 3),
+        }
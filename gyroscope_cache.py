@@ -0,0 +1,381 @@
+"""
+gyroscope_cache.py
+
+Content-addressed response cache for GyroLLMClient.generate_pulse.
+
+Many MetaArchitect calls are deterministic (temperature 0.0 critiques and
+reflections, low-temperature plans) and are resent verbatim across sessions.
+ResponseCache keys every call by (model, sha256(prompt), temperature,
+max_tokens) and serves repeats from:
+
+    1. an in-memory LRU (microseconds),
+    2. a persistent on-disk tier (one JSON file per key, survives restarts).
+
+Caching is opt-in (pass a ResponseCache to the client) and governed per call
+site ("plan", "critique", "reflect", ...) by a CachePolicy.
+
+Disk I/O runs outside the cache lock; asyncio callers use aget / aput,
+which serve the memory tier inline and move the disk tier to a worker thread.
+
+The disk tier is pruned: files older than their site's ttl, or than
+`disk_ttl_s` whatever the site, are deleted by prune(), which put / aput
+run at most every `prune_interval_s`.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / ".gyro_cache" / "responses"
+
+
+@dataclass
+class CachePolicy:
+    """
+    How one call site may use the cache.
+
+    - enabled:         master switch for the site,
+    - max_temperature: calls hotter than this are never cached (not repeatable),
+    - ttl:             seconds an entry stays valid (None = forever),
+    - persist:         also write / read the on-disk tier.
+    """
+
+    enabled: bool = True
+    max_temperature: float = 0.0
+    ttl: Optional[float] = None
+    persist: bool = True
+
+
+_DAY = 24 * 3600.0
+
+DEFAULT_POLICIES: Dict[str, CachePolicy] = {
+    "plan": CachePolicy(max_temperature=0.2, ttl=_DAY),
+    "critique": CachePolicy(max_temperature=0.0, ttl=7 * _DAY),
+    "optimize": CachePolicy(max_temperature=0.3, ttl=_DAY),
+    "refine": CachePolicy(max_temperature=0.2, ttl=_DAY),
+    "reflect": CachePolicy(max_temperature=0.0, ttl=7 * _DAY),
+    "summary": CachePolicy(max_temperature=0.0, ttl=7 * _DAY),
+    "step": CachePolicy(enabled=False),
+    "continue": CachePolicy(enabled=False),
+}
+
+# Sites without an explicit policy: only strictly deterministic calls.
+FALLBACK_POLICY = CachePolicy(max_temperature=0.0, ttl=_DAY)
+
+
+class _Usage:
+    def __init__(self, total_tokens: Optional[int]):
+        self.total_tokens = total_tokens
+
+
+class _IncompleteDetails:
+    def __init__(self, reason: Optional[str]):
+        self.reason = reason
+
+
+class CachedResponse:
+    """
+    Stand-in for a Responses API result served from the cache.
+    Exposes the fields the architect relies on (output_text, status,
+    incomplete_details, usage) plus `cached = True`.
+    """
+
+    cached = True
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.output_text = entry.get("text", "")
+        self.status = entry.get("status")
+        reason = entry.get("incomplete_reason")
+        self.incomplete_details = _IncompleteDetails(reason) if reason else None
+        self.usage = _Usage(entry.get("total_tokens"))
+        self.created_at = entry.get("created")
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU + disk) cache with per-site policies and metrics.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+        policies: Optional[Dict[str, CachePolicy]] = None,
+        disk_ttl_s: Optional[float] = 30 * _DAY,
+        prune_interval_s: float = 600.0,
+    ):
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.policies = dict(DEFAULT_POLICIES)
+        if policies:
+            self.policies.update(policies)
+        self.disk_ttl_s = disk_ttl_s
+        self.prune_interval_s = prune_interval_s
+
+        self._lru: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._last_prune = 0.0
+
+    # ---------- KEYS & POLICY ----------
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: float, max_tokens: int) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        raw = f"{model}|{prompt_hash}|{temperature:.3f}|{max_tokens}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def policy_for(self, site: Optional[str]) -> CachePolicy:
+        return self.policies.get(site or "", FALLBACK_POLICY)
+
+    def _cacheable(self, policy: CachePolicy, temperature: float) -> bool:
+        return policy.enabled and temperature <= policy.max_temperature
+
+    def _bump(self, site: Optional[str], field: str) -> None:
+        counters = self._stats.setdefault(
+            site or "default",
+            {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "expired": 0},
+        )
+        counters[field] += 1
+
+    # ---------- DISK TIER ----------
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _disk_read(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._disk_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _disk_write(self, key: str, entry: Dict[str, Any]) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # unique per writer: disk writes run outside the lock
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            tmp.replace(path)
+        except Exception as e:
+            print(f"[ResponseCache] Failed to persist entry: {e}")
+
+    def _persist(self, key: str, entry: Dict[str, Any]) -> None:
+        self._disk_write(key, entry)
+        with self._lock:
+            due = time.time() - self._last_prune >= self.prune_interval_s
+            if due:
+                self._last_prune = time.time()
+        if due:
+            self.prune()
+
+    def _disk_ttl(self, site: Optional[str]) -> Optional[float]:
+        ttls = [t for t in (self.policy_for(site).ttl, self.disk_ttl_s) if t is not None]
+        return min(ttls) if ttls else None
+
+    def prune(self) -> int:
+        """Delete expired disk entries; returns how many were removed."""
+        if self.cache_dir is None or not self.cache_dir.exists():
+            return 0
+        now = time.time()
+        with self._lock:
+            self._last_prune = now
+        # no entry can expire younger than the shortest ttl: skip reading those
+        ttls = [p.ttl for p in self.policies.values()] + [FALLBACK_POLICY.ttl, self.disk_ttl_s]
+        floor = min((t for t in ttls if t is not None), default=None)
+        if floor is None:
+            return 0
+        removed = 0
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                if now - path.stat().st_mtime <= floor:
+                    continue
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except FileNotFoundError:
+                continue
+            except Exception:
+                entry = None  # unreadable: drop it
+            ttl = self._disk_ttl(entry.get("site")) if entry is not None else 0.0
+            if ttl is not None and (entry is None or now - entry.get("created", 0.0) > ttl):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    # ---------- PUBLIC API ----------
+
+    def get(
+        self,
+        site: Optional[str],
+        model: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> Optional[Tuple[str, Optional[int], CachedResponse]]:
+        """
+        Return (text, total_tokens, CachedResponse) or None on miss /
+        non-cacheable call.
+        """
+        policy = self.policy_for(site)
+        if not self._cacheable(policy, temperature):
+            return None
+        key = self.make_key(model, prompt, temperature, max_tokens)
+        entry = self._memory_get(key)
+        if entry is not None:
+            return self._serve(site, policy, key, entry, "memory_hits")
+        disk = self._disk_read(key) if policy.persist else None
+        return self._serve(site, policy, key, disk, "disk_hits")
+
+    async def aget(
+        self,
+        site: Optional[str],
+        model: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> Optional[Tuple[str, Optional[int], CachedResponse]]:
+        """get() for asyncio callers: the disk tier is read in a worker thread."""
+        policy = self.policy_for(site)
+        if not self._cacheable(policy, temperature):
+            return None
+        key = self.make_key(model, prompt, temperature, max_tokens)
+        entry = self._memory_get(key)
+        if entry is not None:
+            return self._serve(site, policy, key, entry, "memory_hits")
+        disk = await asyncio.to_thread(self._disk_read, key) if policy.persist else None
+        return self._serve(site, policy, key, disk, "disk_hits")
+
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._lru.get(key)
+
+    def _serve(
+        self,
+        site: Optional[str],
+        policy: CachePolicy,
+        key: str,
+        entry: Optional[Dict[str, Any]],
+        tier: str,
+    ) -> Optional[Tuple[str, Optional[int], CachedResponse]]:
+        """Apply the TTL, promote the entry in the LRU and count the lookup."""
+        with self._lock:
+            if entry is not None and policy.ttl is not None:
+                if time.time() - entry.get("created", 0.0) > policy.ttl:
+                    self._lru.pop(key, None)
+                    self._bump(site, "expired")
+                    entry = None
+
+            if entry is None:
+                self._bump(site, "misses")
+                return None
+
+            self._lru[key] = entry
+            self._lru.move_to_end(key)
+            self._evict()
+            self._bump(site, tier)
+
+        return entry.get("text", ""), entry.get("total_tokens"), CachedResponse(entry)
+
+    def put(
+        self,
+        site: Optional[str],
+        model: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        text: str,
+        total_tokens: Optional[int],
+        raw: object = None,
+    ) -> None:
+        stored = self._remember(site, model, prompt, temperature, max_tokens, text, total_tokens, raw)
+        if stored is not None:
+            self._persist(*stored)
+
+    async def aput(
+        self,
+        site: Optional[str],
+        model: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        text: str,
+        total_tokens: Optional[int],
+        raw: object = None,
+    ) -> None:
+        """put() for asyncio callers: the disk tier is written in a worker thread."""
+        stored = self._remember(site, model, prompt, temperature, max_tokens, text, total_tokens, raw)
+        if stored is not None:
+            await asyncio.to_thread(self._persist, *stored)
+
+    def _remember(
+        self,
+        site: Optional[str],
+        model: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        text: str,
+        total_tokens: Optional[int],
+        raw: object,
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Store in the LRU; returns (key, entry) when it also goes to disk."""
+        policy = self.policy_for(site)
+        if not self._cacheable(policy, temperature):
+            return None
+
+        details = getattr(raw, "incomplete_details", None)
+        entry = {
+            "text": text,
+            "total_tokens": total_tokens,
+            "status": getattr(raw, "status", None),
+            "incomplete_reason": getattr(details, "reason", None),
+            "model": model,
+            "site": site,
+            "created": time.time(),
+        }
+        key = self.make_key(model, prompt, temperature, max_tokens)
+
+        with self._lock:
+            self._lru[key] = entry
+            self._lru.move_to_end(key)
+            self._evict()
+            self._bump(site, "stores")
+        return (key, entry) if policy.persist else None
+
+    def _evict(self) -> None:
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-site counters plus hit_rate = hits / (hits + misses)."""
+        with self._lock:
+            report = {}
+            for site, counters in self._stats.items():
+                hits = counters["memory_hits"] + counters["disk_hits"]
+                lookups = hits + counters["misses"]
+                report[site] = dict(counters, hit_rate=(hits / lookups) if lookups else 0.0)
+            return report
+
+    def clear(self, disk: bool = False) -> None:
+        with self._lock:
+            self._lru.clear()
+            if disk and self.cache_dir is not None and self.cache_dir.exists():
+                for path in self.cache_dir.glob("*/*.json"):
+                    path.unlink(missing_ok=True)
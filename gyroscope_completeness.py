@@ -0,0 +1,172 @@
+"""
+gyroscope_completeness.py
+
+Local, deterministic truncation classifier for architect step outputs.
+
+IntentArchitect used to ask the LLM "is this complete? YES/NO" after almost
+every step. Most outputs can be decided locally in microseconds:
+
+- the raw Responses API result says it stopped on max_output_tokens,
+- fenced code blocks are unbalanced, or a Python block fails to parse at EOF,
+- brackets inside code are left open,
+- the text ends on a sentence terminator (or a closed fence).
+
+Only the ambiguous band (e.g. prose ending on a dangling word with no
+finish information) is left for the LLM critic.
+"""
+
+import ast
+import re
+from typing import List, Optional, Tuple
+
+
+COMPLETE = "complete"
+INCOMPLETE = "incomplete"
+AMBIGUOUS = "ambiguous"
+
+MIN_WORDS = 25
+
+_TERMINATORS = tuple('.!?;)]}"\'`*|>')
+_DANGLING_CHARS = tuple(",:-–(/[{=+&\\")
+_DANGLING_WORDS = {
+    "a", "an", "the", "and", "or", "but", "to", "of", "in", "on", "for",
+    "with", "by", "from", "as", "that", "which", "is", "are", "if", "then",
+}
+_PAIRS = {")": "(", "]": "[", "}": "{"}
+_FENCE_RE = re.compile(r"^\s*```(.*)$")
+
+
+def response_truncated(raw: object) -> Optional[bool]:
+    """
+    Finish information from a raw LLM response:
+        True  – generation hit the output token limit,
+        False – the model stopped on its own,
+        None  – unknown (no raw response / unfamiliar shape).
+    Understands Responses API (status / incomplete_details) and
+    Completions-style choices[0].finish_reason.
+    """
+    if raw is None:
+        return None
+
+    status = getattr(raw, "status", None)
+    if status == "incomplete":
+        details = getattr(raw, "incomplete_details", None)
+        reason = getattr(details, "reason", None)
+        return reason in (None, "max_output_tokens")
+    if status == "completed":
+        return False
+
+    choices = getattr(raw, "choices", None)
+    if choices:
+        finish_reason = getattr(choices[0], "finish_reason", None)
+        if finish_reason == "length":
+            return True
+        if finish_reason in ("stop", "end_turn"):
+            return False
+
+    return None
+
+
+def _code_blocks(text: str) -> List[Tuple[str, str]]:
+    """Closed fenced blocks as (language, body)."""
+    blocks = []
+    lang, body = None, []
+    for line in text.splitlines():
+        m = _FENCE_RE.match(line)
+        if m is None:
+            if lang is not None:
+                body.append(line)
+            continue
+        if lang is None:
+            lang, body = m.group(1).strip().lower(), []
+        else:
+            blocks.append((lang, "\n".join(body)))
+            lang = None
+    return blocks
+
+
+def _brackets_balanced(code: str) -> bool:
+    """Bracket balance, ignoring string literals and # comments (roughly)."""
+    stack = []
+    quote = None
+    escaped = False
+    in_comment = False
+    for ch in code:
+        if in_comment:
+            in_comment = ch != "\n"
+            continue
+        if quote:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == quote or ch == "\n":
+                quote = None
+            continue
+        if ch in "\"'":
+            quote = ch
+        elif ch == "#":
+            in_comment = True
+        elif ch in "([{":
+            stack.append(ch)
+        elif ch in _PAIRS:
+            if stack and stack[-1] == _PAIRS[ch]:
+                stack.pop()
+    return not stack
+
+
+def _python_truncated(code: str) -> bool:
+    """True when a Python block fails to parse *at its end* (cut-off code)."""
+    try:
+        ast.parse(code)
+        return False
+    except SyntaxError as e:
+        msg = (e.msg or "").lower()
+        if "was never closed" in msg or "unexpected eof" in msg:
+            return True
+        last_line = len(code.rstrip().splitlines())
+        return bool(e.lineno) and e.lineno >= last_line
+    except (ValueError, RecursionError):
+        return False
+
+
+def classify_completeness(text: str, raw: object = None) -> Tuple[str, str]:
+    """
+    Classify a step output as COMPLETE / INCOMPLETE / AMBIGUOUS.
+    Returns (verdict, reason).
+    """
+    text = text.strip()
+    truncated = response_truncated(raw)
+
+    if truncated:
+        return INCOMPLETE, "max_output_tokens"
+
+    if len(text.split()) < MIN_WORDS:
+        return INCOMPLETE, "too_short"
+
+    fences = sum(1 for ln in text.splitlines() if _FENCE_RE.match(ln))
+    if fences % 2 == 1:
+        return INCOMPLETE, "unclosed_fence"
+
+    if text.endswith(".."):
+        return INCOMPLETE, "ellipsis"
+
+    for lang, body in _code_blocks(text):
+        if lang in ("python", "py", "python3"):
+            if _python_truncated(body):
+                return INCOMPLETE, "python_syntax_eof"
+        elif not _brackets_balanced(body):
+            return INCOMPLETE, "unbalanced_brackets"
+
+    if text.endswith("```") or text.endswith(_TERMINATORS):
+        return COMPLETE, "terminated"
+
+    last_word = text.split()[-1].lower()
+    if text.endswith(_DANGLING_CHARS) or last_word in _DANGLING_WORDS:
+        return AMBIGUOUS, "dangling_end"
+
+    if truncated is False:
+        # stopped on its own, no terminator (e.g. a list item / heading)
+        return COMPLETE, "natural_stop"
+
+    return AMBIGUOUS, "no_terminator"
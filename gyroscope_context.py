@@ -0,0 +1,289 @@
+"""
+gyroscope_context.py
+
+Bounded context window for IntentArchitect step execution.
+
+Every step prompt used to embed the whole accumulated output, so input
+tokens grew quadratically with the number of plan steps. StepContextWindow
+keeps the most recent step outputs verbatim and folds older ones into a
+rolling summary that is updated incrementally (one LLM call per folded step)
+and cached by content hash, so identical sessions never summarise twice.
+
+The window itself never calls the model: the architect asks for the next
+fold (`next_fold`), runs the prompt through its own client (sync or async)
+and hands the result back (`apply_fold`).
+
+PulseHistory does the same job for the pulse controllers (CoherenceController,
+AutopoieticGyroscope), whose prompt is the raw transcript: appends are O(1)
+and the rendered prompt stays within a token budget under one of three
+policies (sliding window, pinned prompt + tail, pinned + summary + tail).
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional, Tuple
+
+
+# Rough token estimate (no tokenizer dependency): ~4 chars per token.
+CHARS_PER_TOKEN = 4
+
+# Process-wide cache: hash(previous summary + folded step) -> updated summary.
+# Shared by concurrent sessions and speculation threads, hence the lock.
+_SUMMARY_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_SUMMARY_CACHE_MAX = 512
+_SUMMARY_LOCK = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _cache_get(key: str) -> Optional[str]:
+    with _SUMMARY_LOCK:
+        value = _SUMMARY_CACHE.get(key)
+        if value is not None:
+            _SUMMARY_CACHE.move_to_end(key)
+        return value
+
+
+def _cache_put(key: str, value: str) -> None:
+    with _SUMMARY_LOCK:
+        _SUMMARY_CACHE[key] = value
+        _SUMMARY_CACHE.move_to_end(key)
+        while len(_SUMMARY_CACHE) > _SUMMARY_CACHE_MAX:
+            _SUMMARY_CACHE.popitem(last=False)
+
+
+class StepContextWindow:
+    """
+    Per-session context for step prompts.
+
+    - token_budget:   hard ceiling for the step prompt the CONTEXT block is
+                      rendered into (see render's reserve_tokens),
+    - keep_recent:    how many latest step outputs stay verbatim,
+    - summary_tokens: max size of the rolling summary of older steps.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 1500,
+        keep_recent: int = 2,
+        summary_tokens: int = 300,
+    ):
+        self.token_budget = token_budget
+        self.keep_recent = max(0, keep_recent)
+        self.summary_tokens = summary_tokens
+
+        self.entries: List[Tuple[str, str]] = []
+        self.summary: str = ""
+        self.folded: int = 0
+
+    # ---------- STATE ----------
+
+    def add(self, step: str, output: str) -> None:
+        """Record the accepted output of a step (failed attempts stay out)."""
+        self.entries.append((step, output.strip()))
+
+    # ---------- INCREMENTAL SUMMARY ----------
+
+    def _fold_key(self, step: str, output: str) -> str:
+        payload = "\x00".join((self.summary, step, output, str(self.summary_tokens)))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _build_summary_prompt(self, step: str, output: str) -> str:
+        return (
+            "You maintain a compact running summary of work produced so far.\n\n"
+            f"CURRENT SUMMARY:\n{self.summary or '(empty)'}\n\n"
+            f"NEW STEP: {step}\n"
+            f"NEW STEP OUTPUT:\n{output}\n\n"
+            "TASK: Return the updated summary that merges the new step into the "
+            "current one. Keep every name a later step may need (modules, classes, "
+            "functions and their signatures, constants, file names, decisions). "
+            "Drop code bodies and prose. "
+            f"At most {self.summary_tokens * 3 // 4} words, no intro."
+        )
+
+    def next_fold(self) -> Optional[Tuple[str, str]]:
+        """
+        Return (key, summary_prompt) for the next step that fell out of the
+        verbatim window, or None when the summary is up to date.
+        Cached folds are applied on the spot without an LLM call.
+        """
+        while self.folded < len(self.entries) - self.keep_recent:
+            step, output = self.entries[self.folded]
+            key = self._fold_key(step, output)
+            cached = _cache_get(key)
+            if cached is None:
+                return key, self._build_summary_prompt(step, output)
+            self._advance(cached)
+        return None
+
+    def apply_fold(self, key: str, summary: str) -> None:
+        summary = summary.strip()
+        max_chars = self.summary_tokens * CHARS_PER_TOKEN
+        if len(summary) > max_chars:
+            summary = summary[:max_chars].rstrip() + " ..."
+        _cache_put(key, summary)
+        self._advance(summary)
+
+    def _advance(self, summary: str) -> None:
+        self.summary = summary
+        self.folded += 1
+
+    # ---------- RENDERING ----------
+
+    def render(self, reserve_tokens: int = 0) -> str:
+        """
+        CONTEXT block for the next step prompt, clipped to token_budget minus
+        `reserve_tokens` (the rest of the prompt the block is embedded in).
+        The summary comes first; if the verbatim tail still does not fit,
+        its oldest part is cut (the most recent output matters most).
+        """
+        head = f"SUMMARY OF EARLIER STEPS:\n{self.summary}\n\n" if self.summary else ""
+        recent = "\n\n".join(
+            f"[{step}]\n{output}" for step, output in self.entries[self.folded:]
+        )
+
+        budget_chars = max(self.token_budget - reserve_tokens, 0) * CHARS_PER_TOKEN
+        if len(head) > budget_chars // 2 and recent:
+            head = head[: budget_chars // 2].rstrip() + " ...\n\n"
+        elif len(head) > budget_chars:
+            head = head[:budget_chars].rstrip() + " ..."
+        room = budget_chars - len(head)
+        if len(recent) > room:
+            recent = "..." + recent[len(recent) - max(room - 3, 0):]
+
+        return (head + recent).strip()
+
+
+# ======== PULSE CONTROLLERS: TRANSCRIPT HISTORY ========
+
+WINDOW = "window"    # last token_budget tokens of the transcript, prompt included
+PINNED = "pinned"    # initial prompt always kept + most recent tail
+SUMMARY = "summary"  # pinned prompt + rolling summary of the evicted middle + tail
+
+CONTEXT_POLICIES = (WINDOW, PINNED, SUMMARY)
+
+
+class PulseHistory:
+    """
+    Transcript of a pulse session with a bounded prompt.
+
+    append() is O(1) amortised: text is stored as segments (one per pulse or
+    injection) with a running token estimate, and the oldest segments are
+    evicted from the prompt tail as soon as it exceeds its budget. The full
+    transcript is kept as a list of parts and joined only on demand.
+
+    Under SUMMARY, evicted segments are queued and folded into a rolling
+    summary once fold_tokens of them pile up; like StepContextWindow the
+    history never calls the model itself (next_fold / apply_fold).
+    """
+
+    def __init__(
+        self,
+        prompt: str,
+        policy: str = PINNED,
+        token_budget: int = 2000,
+        summary_tokens: int = 200,
+        fold_tokens: int = 400,
+    ):
+        if policy not in CONTEXT_POLICIES:
+            raise ValueError(f"Unknown context policy {policy!r}, expected one of {CONTEXT_POLICIES}")
+        self.policy = policy
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.fold_tokens = fold_tokens
+
+        self.pinned = "" if policy == WINDOW else prompt
+        self.summary = ""
+        self.evicted = 0
+
+        self._parts: List[str] = [prompt]
+        self._tail: Deque[str] = deque()
+        self._tail_sizes: Deque[int] = deque()
+        self._tail_tokens = 0
+        self._unfolded: List[str] = []
+        self._unfolded_tokens = 0
+
+        if policy == WINDOW:
+            self._push(prompt)
+
+    # ---------- APPEND / EVICT ----------
+
+    def append(self, text: str) -> None:
+        if not text:
+            return
+        self._parts.append(text)
+        self._push(text)
+
+    def _push(self, text: str) -> None:
+        size = estimate_tokens(text)
+        self._tail.append(text)
+        self._tail_sizes.append(size)
+        self._tail_tokens += size
+        self._evict()
+
+    def _tail_budget(self) -> int:
+        budget = self.token_budget - estimate_tokens(self.pinned)
+        if self.policy == SUMMARY:
+            budget -= self.summary_tokens
+        return max(budget, 1)
+
+    def _evict(self) -> None:
+        budget = self._tail_budget()
+        # The newest segment always stays; render() clips it if needed.
+        while self._tail_tokens > budget and len(self._tail) > 1:
+            text = self._tail.popleft()
+            size = self._tail_sizes.popleft()
+            self._tail_tokens -= size
+            self.evicted += 1
+            if self.policy == SUMMARY:
+                self._unfolded.append(text)
+                self._unfolded_tokens += size
+
+    # ---------- SUMMARY (SUMMARY policy) ----------
+
+    def next_fold(self) -> Optional[str]:
+        """Summary prompt once enough text has been evicted, else None."""
+        if self.policy != SUMMARY or self._unfolded_tokens < self.fold_tokens:
+            return None
+        return (
+            "You maintain a compact running summary of a long text.\n\n"
+            f"CURRENT SUMMARY:\n{self.summary or '(empty)'}\n\n"
+            f"TEXT THAT FOLLOWED:\n{''.join(self._unfolded)}\n\n"
+            "TASK: Return the updated summary covering both. Keep names, facts "
+            "and open threads; drop repetition. "
+            f"At most {self.summary_tokens * 3 // 4} words, no intro.\n\n"
+            "UPDATED SUMMARY:"
+        )
+
+    def apply_fold(self, summary: str) -> None:
+        summary = summary.strip()
+        max_chars = self.summary_tokens * CHARS_PER_TOKEN
+        if len(summary) > max_chars:
+            summary = summary[:max_chars].rstrip() + " ..."
+        self.summary = summary
+        self._unfolded = []
+        self._unfolded_tokens = 0
+
+    # ---------- RENDERING ----------
+
+    def render(self) -> str:
+        """Prompt for the next pulse; ~token_budget tokens at most."""
+        tail = "".join(self._tail)
+        room = self._tail_budget() * CHARS_PER_TOKEN
+        if len(tail) > room:
+            tail = tail[len(tail) - room:]
+        if self.policy == SUMMARY and self.summary:
+            return f"{self.pinned}\n[SUMMARY OF EARLIER TEXT: {self.summary}]\n{tail}"
+        return self.pinned + tail
+
+    def prompt_tokens(self) -> int:
+        return estimate_tokens(self.render())
+
+    def full_text(self) -> str:
+        """The whole transcript (initial prompt + everything appended)."""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0]
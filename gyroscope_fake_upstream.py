@@ -0,0 +1,696 @@
+"""
+gyroscope_fake_upstream.py
+
+Offline stand-in for the OpenAI API, for load / latency testing and
+benchmarks without network access or token cost.
+
+Implements the three endpoints the engines use:
+
+    POST /v1/completions   – text + logprobs (tokens, token_logprobs,
+                             top_logprobs), finish_reason "length"/"stop";
+                             stream=True sends one chunk per token
+    POST /v1/responses     – Responses API, incl. stream=True (SSE events
+                             response.created / output_text.delta / completed)
+    POST /v1/embeddings    – deterministic hashed bag-of-words vectors
+                             (similar texts → similar vectors), float or base64
+
+Outputs are scripted (regex rules matched against the prompt, first match
+wins) or generated from a seeded RNG keyed by the request content, so the
+same request always yields the same text. A built-in script answers the
+MetaArchitect planning / critique / reflection prompts so whole sessions
+run end to end.
+
+Latency is drawn from a log-normal distribution plus a per-token cost and
+occasional spikes; errors (429 with Retry-After, 500, 503, hangs, stream
+disconnects) are injected at configurable rates.
+
+Admin endpoints:
+    GET  /_fake/stats    – request / error counters
+    POST /_fake/config   – update FakeUpstreamConfig fields at runtime
+    POST /_fake/reset    – zero the counters
+
+Run it and point any client at it:
+    python gyroscope_fake_upstream.py --port 8090 --median-ms 150 --rate-500 0.02
+    export OPENAI_BASE_URL=http://127.0.0.1:8090/v1  OPENAI_API_KEY=fake
+
+or in-process (benchmarks):
+    handle = serve_in_thread(FakeUpstreamConfig(seed=7))
+    client = GyroLLMClient(base_url=handle.base_url)
+    ...
+    handle.stop()
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import random
+import re
+import struct
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+@dataclass
+class FakeUpstreamConfig:
+    """
+    - seed:               base seed for generated text (same request → same text),
+    - median_ms / sigma:  log-normal time to first byte,
+    - per_token_ms:       generation cost per output token,
+    - spike_prob/spike_ms: occasional latency spikes (tail latency),
+    - rate_*:             error injection probabilities per request,
+    - hang_s:             how long a "hang" stalls before answering,
+    - mean_output_tokens: natural length of generated answers,
+    - fixation_prob:      chance a completion falls into a repetition loop
+                          (lower at high temperature), to exercise the gyroscopes,
+    - script:             [{"match": regex, "text": str, "endpoint": "*"}, ...],
+    - default_script:     also use the built-in MetaArchitect script.
+    """
+
+    seed: int = 0
+    median_ms: float = 120.0
+    sigma: float = 0.4
+    per_token_ms: float = 2.0
+    spike_prob: float = 0.0
+    spike_ms: float = 3000.0
+
+    rate_429: float = 0.0
+    rate_500: float = 0.0
+    rate_503: float = 0.0
+    rate_hang: float = 0.0
+    rate_disconnect: float = 0.0
+    hang_s: float = 30.0
+    retry_after_s: float = 1.0
+
+    mean_output_tokens: int = 120
+    fixation_prob: float = 0.0
+    embedding_dim: int = 1536
+
+    script: List[Dict[str, str]] = field(default_factory=list)
+    default_script: bool = True
+
+
+_PLAN = (
+    "1. Project structure - Lay out modules and entry point\n"
+    "2. Core model - Define the domain entities and their state\n"
+    "3. Logic - Implement the rules operating on the model\n"
+    "4. Interface - Wire input and rendering to the logic\n"
+    "5. Tests - Cover the rules and edge cases"
+)
+
+DEFAULT_SCRIPT: List[Dict[str, str]] = [
+    {"match": r"ANSWER \(YES or NO\):\s*$", "text": "YES"},
+    {"match": r"reply exactly with 'OPTIMAL'", "text": "OPTIMAL"},
+    {"match": r"You are a senior planner", "text": _PLAN},
+    {"match": r"TASK: Rewrite the plan", "text": _PLAN},
+]
+
+_VOCAB = (
+    "the system module state update render input event loop score player grid "
+    "board snake food collision wall speed level config model view controller "
+    "service adapter interface port handler queue buffer cache session step plan "
+    "signal value policy risk entropy pulse token stream window context summary "
+    "function class method return data list map key index count limit check test "
+    "clean simple robust modular explicit stable fast small clear separate layer "
+    "and with for into from over under each every then when while after before"
+).split()
+
+
+# ---------------------------------------------------------------------------
+# Generation
+# ---------------------------------------------------------------------------
+
+def _request_rng(seed: int, kind: str, prompt: str, temperature: float, max_tokens: int) -> random.Random:
+    digest = hashlib.sha256(f"{seed}|{kind}|{temperature:.3f}|{max_tokens}|{prompt}".encode("utf-8"))
+    return random.Random(digest.hexdigest())
+
+
+def _tokenize(text: str) -> List[str]:
+    """Rough word-level tokens with leading whitespace, like BPE pieces."""
+    return re.findall(r"\s*\S+", text)
+
+
+def _generate_tokens(
+    rng: random.Random,
+    max_tokens: int,
+    temperature: float,
+    mean_tokens: int,
+    fixation_prob: float,
+) -> Tuple[List[str], bool]:
+    """Seeded prose; returns (tokens, truncated)."""
+    natural = max(8, int(rng.gauss(mean_tokens, mean_tokens * 0.25)))
+    n = min(natural, max_tokens)
+    loop_p = fixation_prob * max(0.0, 1.0 - temperature / 1.5)
+    loop = [" " + rng.choice(_VOCAB) for _ in range(3)] if rng.random() < loop_p else None
+
+    tokens: List[str] = []
+    sentence = 0
+    for i in range(n):
+        if loop is not None and i >= n // 3:
+            tokens.append(loop[i % 3])
+            continue
+        word = rng.choice(_VOCAB)
+        if sentence == 0:
+            word = word.capitalize()
+        sentence += 1
+        end = sentence >= rng.randint(6, 14) or i == natural - 1
+        tokens.append((" " if tokens else "") + word + ("." if end else ""))
+        if end:
+            sentence = 0
+    truncated = natural > max_tokens
+    return tokens, truncated
+
+
+def _top_logprobs(
+    rng: random.Random,
+    tokens: List[str],
+    k: int,
+    temperature: float,
+) -> Tuple[List[float], List[Dict[str, float]]]:
+    """Per token: chosen logprob + top-k alternatives; flatter when hotter."""
+    sharpness = 3.0 / (max(temperature, 0.0) + 0.3)
+    token_lps: List[float] = []
+    tops: List[Dict[str, float]] = []
+    for tok in tokens:
+        logits = sorted((rng.gauss(0.0, 1.0) * sharpness for _ in range(max(k, 1) + 3)), reverse=True)
+        z = max(logits)
+        exps = [math.exp(l - z) for l in logits]
+        total = sum(exps)
+        probs = [e / total for e in exps]
+        token_lps.append(math.log(probs[0]))
+        if k <= 0:
+            continue
+        top = {tok: math.log(probs[0])}
+        for p in probs[1:]:
+            if len(top) >= k:
+                break
+            alt = " " + rng.choice(_VOCAB)
+            if alt not in top:
+                top[alt] = math.log(p)
+        tops.append(top)
+    return token_lps, tops
+
+
+def _embed(text: str, dim: int) -> List[float]:
+    vec = [0.0] * dim
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        h = int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16)
+        vec[h % dim] += 1.0 if (h >> 64) & 1 else -1.0
+    norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return [x / norm for x in vec]
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class _Fault(Exception):
+    def __init__(self, status: int, kind: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(kind)
+        self.status = status
+        self.kind = kind
+        self.headers = headers or {}
+
+
+class FakeUpstream:
+    """Holds config, RNG and counters; create_app() exposes it over HTTP."""
+
+    def __init__(self, config: Optional[FakeUpstreamConfig] = None):
+        self.config = config or FakeUpstreamConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats: Dict[str, Any] = {
+                "requests": 0,
+                "by_endpoint": {},
+                "errors": {},
+                "output_tokens": 0,
+            }
+
+    def _count(self, endpoint: str) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["by_endpoint"][endpoint] = self.stats["by_endpoint"].get(endpoint, 0) + 1
+
+    def _count_error(self, kind: str) -> None:
+        with self._lock:
+            self.stats["errors"][kind] = self.stats["errors"].get(kind, 0) + 1
+
+    def _roll(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def ttfb_s(self) -> float:
+        cfg = self.config
+        with self._lock:
+            seconds = self._rng.lognormvariate(math.log(max(cfg.median_ms, 0.001)), cfg.sigma) / 1000.0
+            if self._rng.random() < cfg.spike_prob:
+                seconds += cfg.spike_ms / 1000.0
+        return seconds
+
+    async def inject_faults(self) -> None:
+        """Raise _Fault / stall according to the configured error rates."""
+        cfg = self.config
+        roll = self._roll()
+        edge = 0.0
+        for rate, status, kind in (
+            (cfg.rate_429, 429, "rate_limit"),
+            (cfg.rate_500, 500, "server_error"),
+            (cfg.rate_503, 503, "unavailable"),
+        ):
+            edge += rate
+            if roll < edge:
+                self._count_error(kind)
+                headers = {"retry-after": str(cfg.retry_after_s)} if status == 429 else {}
+                raise _Fault(status, kind, headers)
+        edge += cfg.rate_hang
+        if roll < edge:
+            self._count_error("hang")
+            await asyncio.sleep(cfg.hang_s)
+
+    def scripted(self, endpoint: str, prompt: str) -> Optional[str]:
+        rules = list(self.config.script)
+        if self.config.default_script:
+            rules += DEFAULT_SCRIPT
+        for rule in rules:
+            if rule.get("endpoint", "*") not in ("*", endpoint):
+                continue
+            if re.search(rule["match"], prompt, re.DOTALL):
+                return rule["text"]
+        return None
+
+    def produce(
+        self,
+        endpoint: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> Tuple[List[str], bool, random.Random]:
+        """(output tokens, truncated, request rng)."""
+        rng = _request_rng(self.config.seed, endpoint, prompt, temperature, max_tokens)
+        text = self.scripted(endpoint, prompt)
+        if text is not None:
+            tokens = _tokenize(text)
+            truncated = len(tokens) > max_tokens
+            tokens = tokens[:max_tokens]
+        else:
+            tokens, truncated = _generate_tokens(
+                rng, max_tokens, temperature,
+                self.config.mean_output_tokens, self.config.fixation_prob,
+            )
+        with self._lock:
+            self.stats["output_tokens"] += len(tokens)
+        return tokens, truncated, rng
+
+
+def _error_response(fault: _Fault) -> JSONResponse:
+    return JSONResponse(
+        status_code=fault.status,
+        headers=fault.headers,
+        content={"error": {"message": f"injected {fault.kind}", "type": fault.kind, "code": fault.kind}},
+    )
+
+
+def _usage_tokens(prompt: str) -> int:
+    return max(1, len(prompt) // 4)
+
+
+def _response_object(
+    model: str,
+    text: str,
+    truncated: bool,
+    input_tokens: int,
+    output_tokens: int,
+    status: Optional[str] = None,
+) -> Dict[str, Any]:
+    status = status or ("incomplete" if truncated else "completed")
+    return {
+        "id": f"resp_{uuid.uuid4().hex}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": model,
+        "status": status,
+        "incomplete_details": {"reason": "max_output_tokens"} if truncated and status == "incomplete" else None,
+        "error": None,
+        "instructions": None,
+        "metadata": {},
+        "parallel_tool_calls": True,
+        "temperature": None,
+        "tool_choice": "auto",
+        "tools": [],
+        "top_p": None,
+        "output": [
+            {
+                "type": "message",
+                "id": f"msg_{uuid.uuid4().hex}",
+                "role": "assistant",
+                "status": status,
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ] if status != "in_progress" else [],
+        "usage": {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+def _completion_events(
+    upstream: "FakeUpstream",
+    model: str,
+    prompt: str,
+    tokens: List[str],
+    truncated: bool,
+    rng: random.Random,
+    k: Optional[int],
+    temperature: float,
+    per_token_s: float,
+):
+    """Completions stream=True: one text_completion chunk per token, then [DONE]."""
+    token_lps, tops = _top_logprobs(rng, tokens, k or 0, temperature)
+    completion_id = f"cmpl-{uuid.uuid4().hex}"
+
+    disconnect_at = None
+    if upstream._roll() < upstream.config.rate_disconnect and tokens:
+        upstream._count_error("disconnect")
+        disconnect_at = len(tokens) // 2
+
+    def chunk(text: str, logprobs: Optional[Dict[str, Any]], finish: Optional[str]) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "text_completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "text": text, "logprobs": logprobs, "finish_reason": finish}],
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    async def events():
+        await asyncio.sleep(upstream.ttfb_s())
+        pos = len(prompt)
+        for i, tok in enumerate(tokens):
+            if disconnect_at is not None and i >= disconnect_at:
+                return
+            await asyncio.sleep(per_token_s)
+            logprobs = None
+            if k is not None:
+                logprobs = {
+                    "tokens": [tok],
+                    "token_logprobs": [token_lps[i]],
+                    "top_logprobs": [tops[i]] if k else None,
+                    "text_offset": [pos],
+                }
+            pos += len(tok)
+            yield chunk(tok, logprobs, None)
+        yield chunk("", None, "length" if truncated else "stop")
+        yield "data: [DONE]\n\n"
+
+    return events()
+
+
+def create_app(upstream: Optional[FakeUpstream] = None) -> FastAPI:
+    upstream = upstream or FakeUpstream()
+    app = FastAPI(title="gyroscope fake upstream")
+    app.state.upstream = upstream
+
+    # ---------- COMPLETIONS ----------
+
+    @app.post("/v1/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        upstream._count("completions")
+        try:
+            await upstream.inject_faults()
+        except _Fault as fault:
+            return _error_response(fault)
+
+        prompt = body.get("prompt", "")
+        if isinstance(prompt, list):
+            prompt = prompt[0] if prompt else ""
+        max_tokens = int(body.get("max_tokens") or 16)
+        temperature = float(body.get("temperature") if body.get("temperature") is not None else 1.0)
+        k = int(body.get("logprobs") or 0)
+
+        tokens, truncated, rng = upstream.produce("completions", prompt, max_tokens, temperature)
+        per_token_s = upstream.config.per_token_ms / 1000.0
+        if body.get("stream"):
+            return StreamingResponse(
+                _completion_events(
+                    upstream, body.get("model", "fake"), prompt, tokens, truncated, rng,
+                    k if body.get("logprobs") is not None else None, temperature, per_token_s,
+                ),
+                media_type="text/event-stream",
+            )
+        await asyncio.sleep(upstream.ttfb_s() + len(tokens) * per_token_s)
+
+        logprobs = None
+        if body.get("logprobs") is not None:
+            token_lps, tops = _top_logprobs(rng, tokens, k, temperature)
+            offsets, pos = [], len(prompt)
+            for tok in tokens:
+                offsets.append(pos)
+                pos += len(tok)
+            logprobs = {
+                "tokens": tokens,
+                "token_logprobs": token_lps,
+                "top_logprobs": tops if k > 0 else None,
+                "text_offset": offsets,
+            }
+
+        input_tokens = _usage_tokens(prompt)
+        return {
+            "id": f"cmpl-{uuid.uuid4().hex}",
+            "object": "text_completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "text": "".join(tokens),
+                "logprobs": logprobs,
+                "finish_reason": "length" if truncated else "stop",
+            }],
+            "usage": {
+                "prompt_tokens": input_tokens,
+                "completion_tokens": len(tokens),
+                "total_tokens": input_tokens + len(tokens),
+            },
+        }
+
+    # ---------- RESPONSES ----------
+
+    @app.post("/v1/responses")
+    async def responses(request: Request):
+        body = await request.json()
+        upstream._count("responses")
+        try:
+            await upstream.inject_faults()
+        except _Fault as fault:
+            return _error_response(fault)
+
+        prompt = body.get("input", "")
+        if not isinstance(prompt, str):
+            prompt = json.dumps(prompt)
+        model = body.get("model", "fake")
+        max_tokens = int(body.get("max_output_tokens") or 256)
+        temperature = float(body.get("temperature") if body.get("temperature") is not None else 1.0)
+        tokens, truncated, _ = upstream.produce("responses", prompt, max_tokens, temperature)
+        input_tokens = _usage_tokens(prompt)
+        per_token_s = upstream.config.per_token_ms / 1000.0
+
+        if not body.get("stream"):
+            await asyncio.sleep(upstream.ttfb_s() + len(tokens) * per_token_s)
+            return _response_object(model, "".join(tokens), truncated, input_tokens, len(tokens))
+
+        disconnect_at = None
+        if upstream._roll() < upstream.config.rate_disconnect and tokens:
+            upstream._count_error("disconnect")
+            disconnect_at = len(tokens) // 2
+
+        async def events():
+            seq = 0
+
+            def sse(payload: Dict[str, Any]) -> str:
+                nonlocal seq
+                payload["sequence_number"] = seq
+                seq += 1
+                return f"event: {payload['type']}\ndata: {json.dumps(payload)}\n\n"
+
+            await asyncio.sleep(upstream.ttfb_s())
+            yield sse({
+                "type": "response.created",
+                "response": _response_object(model, "", False, input_tokens, 0, status="in_progress"),
+            })
+            item_id = f"msg_{uuid.uuid4().hex}"
+            for i, tok in enumerate(tokens):
+                if disconnect_at is not None and i >= disconnect_at:
+                    return
+                await asyncio.sleep(per_token_s)
+                yield sse({
+                    "type": "response.output_text.delta",
+                    "item_id": item_id,
+                    "output_index": 0,
+                    "content_index": 0,
+                    "delta": tok,
+                    "logprobs": [],
+                })
+            final = _response_object(model, "".join(tokens), truncated, input_tokens, len(tokens))
+            kind = "response.incomplete" if truncated else "response.completed"
+            yield sse({"type": kind, "response": final})
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    # ---------- EMBEDDINGS ----------
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        upstream._count("embeddings")
+        try:
+            await upstream.inject_faults()
+        except _Fault as fault:
+            return _error_response(fault)
+
+        inputs = body.get("input", "")
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dim = int(body.get("dimensions") or upstream.config.embedding_dim)
+        as_base64 = body.get("encoding_format") == "base64"
+        await asyncio.sleep(upstream.ttfb_s())
+
+        data = []
+        for i, text in enumerate(inputs):
+            vec = _embed(str(text), dim)
+            if as_base64:
+                vec = base64.b64encode(struct.pack(f"<{dim}f", *vec)).decode("ascii")
+            data.append({"object": "embedding", "index": i, "embedding": vec})
+        tokens = sum(_usage_tokens(str(t)) for t in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "fake-embedding"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    # ---------- ADMIN ----------
+
+    @app.get("/_fake/stats")
+    async def fake_stats():
+        return upstream.stats
+
+    @app.post("/_fake/config")
+    async def fake_config(request: Request):
+        updates = await request.json()
+        known = {f.name for f in fields(FakeUpstreamConfig)}
+        for key, value in updates.items():
+            if key in known:
+                setattr(upstream.config, key, value)
+        return asdict(upstream.config)
+
+    @app.post("/_fake/reset")
+    async def fake_reset():
+        upstream.reset()
+        return {"status": "ok"}
+
+    return app
+
+
+# ---------------------------------------------------------------------------
+# In-process runner
+# ---------------------------------------------------------------------------
+
+class FakeUpstreamHandle:
+    def __init__(self, server: uvicorn.Server, thread: threading.Thread, upstream: FakeUpstream):
+        self.server = server
+        self.thread = thread
+        self.upstream = upstream
+        sock = server.servers[0].sockets[0]
+        host, port = sock.getsockname()[:2]
+        self.base_url = f"http://{host}:{port}/v1"
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+def serve_in_thread(
+    config: Optional[FakeUpstreamConfig] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> FakeUpstreamHandle:
+    """Start the fake upstream on a background thread (port 0 = any free port)."""
+    upstream = FakeUpstream(config)
+    server = uvicorn.Server(uvicorn.Config(create_app(upstream), host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="fake-upstream", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10.0
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("fake upstream failed to start")
+        time.sleep(0.01)
+    return FakeUpstreamHandle(server, thread, upstream)
+
+
+def _parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Offline fake OpenAI-compatible server.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8090)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--median-ms", type=float, default=120.0)
+    p.add_argument("--sigma", type=float, default=0.4)
+    p.add_argument("--per-token-ms", type=float, default=2.0)
+    p.add_argument("--spike-prob", type=float, default=0.0)
+    p.add_argument("--spike-ms", type=float, default=3000.0)
+    p.add_argument("--rate-429", type=float, default=0.0)
+    p.add_argument("--rate-500", type=float, default=0.0)
+    p.add_argument("--rate-503", type=float, default=0.0)
+    p.add_argument("--rate-hang", type=float, default=0.0)
+    p.add_argument("--rate-disconnect", type=float, default=0.0)
+    p.add_argument("--fixation-prob", type=float, default=0.0)
+    p.add_argument("--script", help="JSON file with [{match, text, endpoint}] rules")
+    p.add_argument("--no-default-script", action="store_true")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    script = []
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            script = json.load(f)
+    cfg = FakeUpstreamConfig(
+        seed=args.seed,
+        median_ms=args.median_ms,
+        sigma=args.sigma,
+        per_token_ms=args.per_token_ms,
+        spike_prob=args.spike_prob,
+        spike_ms=args.spike_ms,
+        rate_429=args.rate_429,
+        rate_500=args.rate_500,
+        rate_503=args.rate_503,
+        rate_hang=args.rate_hang,
+        rate_disconnect=args.rate_disconnect,
+        fixation_prob=args.fixation_prob,
+        script=script,
+        default_script=not args.no_default_script,
+    )
+    print(f">>> FAKE UPSTREAM: http://{args.host}:{args.port}/v1")
+    uvicorn.run(create_app(FakeUpstream(cfg)), host=args.host, port=args.port, log_level="warning")
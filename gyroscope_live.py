@@ -1,87 +1,32 @@
 import os
-import math
 from typing import List, Dict, Tuple, Optional
 from collections import Counter
 
-import numpy as np
 from openai import OpenAI
 
-
-# ======== PMON-LIKE METRICS ON LOGPROBS ========
-
-def spectral_entropy_from_toplogprobs(top_logprobs_seq: List[Dict[str, float]]) -> float:
-    """
-    Compute an average spectral entropy over a sequence of top_logprobs dicts.
-
-    Each element of top_logprobs_seq is a dict: token -> logprob (log p).
-    We convert to probabilities, normalize, compute entropy per step and average.
-    Result is normalized to [0, 1] assuming max entropy = log(K), K <= 5.
-    """
-    entropies = []
-
-    for step in top_logprobs_seq:
-        if not step:
-            continue
-
-        logps = np.array(list(step.values()), dtype=float)
-        logps = logps - np.max(logps)
-        ps = np.exp(logps)
-        ps = ps / ps.sum()
-
-        H = -np.sum(ps * np.log(ps + 1e-12))
-        K = len(ps)
-        if K > 1:
-            H_norm = H / math.log(K)
-        else:
-            H_norm = 0.0
-        entropies.append(H_norm)
-
-    if not entropies:
-        return 0.0
-
-    return float(np.mean(entropies))
-
-
-def variance_from_toplogprobs(top_logprobs_seq: List[Dict[str, float]]) -> float:
-    """
-    Rough measure of "variance" in the predictive distribution across the sequence.
-    We use the variance of the *max probability* at each step.
-    """
-    max_probs = []
-
-    for step in top_logprobs_seq:
-        if not step:
-            continue
-
-        logps = np.array(list(step.values()), dtype=float)
-        logps = logps - np.max(logps)
-        ps = np.exp(logps)
-        ps = ps / ps.sum()
-        max_probs.append(float(np.max(ps)))
-
-    if len(max_probs) < 2:
-        return 0.0
-
-    return float(np.var(max_probs))
-
-
-def compute_pmon_risk(
-    top_logprobs_seq: List[Dict[str, float]],
-    alpha_entropy: float = 0.7,
-    alpha_variance: float = 0.3,
-) -> float:
-    """
-    Compute a scalar PMON-style risk in [0, 1] from:
-      - normalized spectral entropy (0 = very certain, 1 = very uncertain),
-      - normalized variance of max prob (0 = flat, 1 = very unstable).
-    """
-    H_norm = spectral_entropy_from_toplogprobs(top_logprobs_seq)  # [0,1]
-    V = variance_from_toplogprobs(top_logprobs_seq)               # [0, ~0.25]
-
-    V_norm = min(V / 0.25, 1.0)
-
-    risk = alpha_entropy * H_norm + alpha_variance * V_norm
-    return max(0.0, min(1.0, risk))
+from gyroscope_context import PINNED, PulseHistory, estimate_tokens
+from gyroscope_ngrams import NGramTracker
+from gyroscope_pulse_sizing import PulseSizer
+from gyroscope_ratelimit import RateLimiter
+from gyroscope_scheduler import (
+    PulseRequest,
+    PulseResult,
+    PulseSession,
+    TokenCallback,
+    run_pulse,
+    run_session_sync,
+)
+from gyroscope_sessions import new_session_id
+from gyroscope_telemetry import PulseTelemetry, console_subscriber
+
+# PMON-like metrics on logprobs: shared vectorized kernel, re-exported here.
+from gyroscope_pmon import (  # noqa: F401
+    RunningPmon,
+    compute_pmon_risk,
+    pmon_signal,
+    spectral_entropy_from_toplogprobs,
+    variance_from_toplogprobs,
+)
 
 
 # ======== REPETITION / FIXATION METRICS ========
@@ -120,6 +65,58 @@ def compute_repetition_metrics(
     return adj_rate, ngram_rate
 
 
+class PulseMonitor:
+    """
+    Incremental per-token signals for one pulse (streaming mode).
+
+    push(token, top_logprobs) is O(1): running PMON risk (RunningPmon),
+    adjacent repetition and the 2-gram counts (gyroscope_ngrams.NGramTracker)
+    are updated in place, so fixation can be checked after every token
+    instead of after the pulse. adj_rate / ngram_rate equal
+    compute_repetition_metrics on the same tokens; on ties best_ngram is the
+    2-gram that reached the count first.
+    """
+
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.top_logprobs_seq: List[Dict[str, float]] = []
+        self.pmon = RunningPmon()
+        self.ngrams = NGramTracker(max_n=2)
+        self._adj_count = 0
+
+    def push(self, token: str, top_logprobs: Optional[Dict[str, float]]) -> None:
+        if self.tokens and token == self.tokens[-1]:
+            self._adj_count += 1
+        self.ngrams.push(token)
+
+        self.tokens.append(token)
+        step = top_logprobs or {}
+        self.top_logprobs_seq.append(step)
+        self.pmon.push(step)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.tokens)
+
+    @property
+    def pmon_risk(self) -> float:
+        return self.pmon.risk
+
+    @property
+    def adj_rate(self) -> float:
+        if len(self.tokens) < 2:
+            return 0.0
+        return self._adj_count / (len(self.tokens) - 1)
+
+    @property
+    def ngram_rate(self) -> float:
+        return self.ngrams.rate(2)
+
+    @property
+    def best_ngram(self) -> Tuple[str, ...]:
+        return self.ngrams.most_common(2)[0]
+
+
 # Dummy hash → "token id" mapping (for logit_bias keys).
 # In real systems, you'd use tokenizer IDs; tu chodzi o strukturę kontrolera.
 def token_to_id(token: str) -> int:
@@ -140,6 +137,21 @@ class CoherenceController:
         * adjusts temperature (Alpha),
         * detects fixation and applies logit_bias (Beta),
         * on fixation injects pivot instruction in context (Delta).
+
+    With stream_pulses=True each pulse is streamed token by token into a
+    PulseMonitor; once 2-gram fixation crosses the threshold the stream is
+    closed and Beta / Delta fire right away instead of after a full pulse.
+
+    session() is the same loop as a generator of PulseRequests, so many
+    controllers can share one async client (gyroscope_scheduler).
+
+    Every pulse is recorded in self.telemetry (PulseTelemetry); with
+    verbose=False nothing is printed at all.
+
+    With adaptive_pulses=True pulse_tokens is only the first pulse's size:
+    pulses grow while combined risk stays well under target_risk and shrink
+    sharply on risk / fixation (gyroscope_pulse_sizing.PulseSizer), within
+    [min_pulse_tokens, max_pulse_tokens].
     """
 
     def __init__(
@@ -150,9 +162,25 @@ class CoherenceController:
         kp: float = 0.7,
         repetition_weight: float = 0.8,
         ngram_fixation_threshold: float = 0.30,
+        base_url: Optional[str] = None,
+        stream_pulses: bool = False,
+        min_abort_tokens: int = 12,
+        context_policy: str = PINNED,
+        context_tokens: int = 2000,
+        client: Optional[OpenAI] = None,
+        telemetry: Optional[PulseTelemetry] = None,
+        verbose: bool = True,
+        adaptive_pulses: bool = False,
+        min_pulse_tokens: int = 16,
+        max_pulse_tokens: int = 320,
+        limiter: Optional[RateLimiter] = None,
     ):
-        self.client = OpenAI()
+        # base_url: any OpenAI-compatible server (None = SDK default / OPENAI_BASE_URL)
+        # client: share one OpenAI client across many controllers
+        # limiter: None = the process-wide gyroscope_ratelimit.shared_limiter()
+        self.client = client or OpenAI(base_url=base_url)
         self.model = model
+        self.limiter = limiter
 
         self.temperature = base_temperature
         self.target_risk = target_risk
@@ -164,8 +192,56 @@ class CoherenceController:
         self.logit_bias: Dict[str, float] = {}
         self.pivot_pending: bool = False
 
+        # Streaming pulses: signals are updated per token and a pulse is cut
+        # as soon as 2-gram fixation crosses the threshold (after at least
+        # min_abort_tokens tokens, so a couple of tokens can't trip it).
+        self.stream_pulses = stream_pulses
+        self.min_abort_tokens = min_abort_tokens
+        self.aborted_pulses = 0
+        self.tokens_saved = 0
+
+        # Prompt history: bounded per pulse (see gyroscope_context.PulseHistory).
+        self.context_policy = context_policy
+        self.context_tokens = context_tokens
+
+        # Pulse length: fixed, or adapted to risk after every pulse.
+        self.adaptive_pulses = adaptive_pulses
+        self.min_pulse_tokens = min_pulse_tokens
+        self.max_pulse_tokens = max_pulse_tokens
+
+        # Per-pulse records; the console line is just one subscriber.
+        # A shared telemetry object keeps its own subscribers.
+        self.verbose = verbose
+        self.telemetry = telemetry if telemetry is not None else PulseTelemetry()
+        if telemetry is None and verbose:
+            self.telemetry.subscribe(console_subscriber("[Gyroscope]"))
+        self.session_id = ""
+
+    def _log(self, message: str) -> None:
+        if self.verbose:
+            print(message)
+
     # ---------- LLM CALL ----------
 
+    def _pulse_request(
+        self,
+        prompt: str,
+        max_tokens: int = 40,
+        on_token: Optional[TokenCallback] = None,
+    ) -> PulseRequest:
+        """Next pulse with the current temperature and logit_bias (top-5 logprobs)."""
+        return PulseRequest(
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=self.temperature,
+            logit_bias=dict(self.logit_bias) if self.logit_bias else None,
+            logprobs=5,
+            on_token=on_token,
+        )
+
+    def _execute(self, request: PulseRequest) -> PulseResult:
+        return run_pulse(self.client, self.model, request, self.limiter)
+
     def _call_llm_pulse(
         self,
         prompt: str,
@@ -178,31 +254,18 @@ class CoherenceController:
         We use the OpenAI 2.x client and the Completions API:
           - logprobs=5 (top-5 tokens per step)
         """
-        response = self.client.completions.create(
-            model=self.model,
-            prompt=prompt,
-            max_tokens=max_tokens,
-            temperature=self.temperature,
-            top_p=1.0,
-            n=1,
-            stream=False,
-            logprobs=5,  # we can ask for top-5 logprobs per token
-            logit_bias={str(k): v for k, v in self.logit_bias.items()}
-            if self.logit_bias else None,
-        )
-
-        choice = response.choices[0]
-        text_chunk = choice.text or ""
-
-        lp = choice.logprobs
-        if lp is None:
-            top_logprobs_seq: List[Dict[str, float]] = []
-            tokens: List[str] = []
-        else:
-            top_logprobs_seq = lp.top_logprobs or []
-            tokens = lp.tokens or []
-
-        return text_chunk, top_logprobs_seq, tokens
+        result = self._execute(self._pulse_request(prompt, max_tokens))
+        return result.text, result.top_logprobs_seq, result.tokens
+
+    def _fixation_watch(self, monitor: PulseMonitor) -> TokenCallback:
+        """on_token callback for streamed pulses: cut once 2-gram fixation is reached."""
+        def on_token(token: str, top_logprobs: Optional[Dict[str, float]]) -> bool:
+            monitor.push(token, top_logprobs)
+            return (
+                len(monitor.tokens) >= self.min_abort_tokens
+                and monitor.ngram_rate >= self.ngram_fixation_threshold
+            )
+        return on_token
 
     # ---------- CONTROL: ALPHA (TEMPERATURE) ----------
 
@@ -218,7 +281,7 @@ class CoherenceController:
         new_temp = self.temperature + delta
         new_temp = max(0.1, min(1.2, new_temp))
 
-        print(
+        self._log(
             f"[Gyroscope] Risk={risk:.3f}, error={error:.3f}, "
             f"T: {self.temperature:.3f} → {new_temp:.3f}"
         )
@@ -236,7 +299,7 @@ class CoherenceController:
           - identify the n-gram causing fixation,
           - assign strong negative logit bias to its tokens.
         """
-        print(
+        self._log(
             f"[Gyroscope] Fixation detected: best {len(best_ngram)}-gram="
             f"{best_ngram}, ratio={best_ratio:.3f}"
         )
@@ -246,16 +309,16 @@ class CoherenceController:
             old_bias = self.logit_bias.get(tid, 0.0)
             new_bias = -8.0  # strong negative logit bias
             self.logit_bias[tid] = new_bias
-            print(f"  - Token {token!r} -> id {tid}, bias {old_bias} → {new_bias}")
+            self._log(f"  - Token {token!r} -> id {tid}, bias {old_bias} → {new_bias}")
 
-        print(f"[Gyroscope] Current logit_bias size: {len(self.logit_bias)} tokens")
+        self._log(f"[Gyroscope] Current logit_bias size: {len(self.logit_bias)} tokens")
 
         # Signal for Actuator Delta that we need a pivot injection
         self.pivot_pending = True
 
     # ---------- CONTROL: DELTA (PIVOT / CONTEXT INJECTION) ----------
 
-    def _inject_pivot_into_history(self, history: str) -> str:
+    def _inject_pivot_into_history(self, history: PulseHistory) -> None:
         """
         Actuator Delta:
           - inject into context a pivot instruction to redirect generation.
@@ -266,9 +329,38 @@ class CoherenceController:
             "Stop repeating previous phrases and instead describe "
             "a peaceful sunrise in rich, coherent detail.]\n"
         )
-        print(f"[Gyroscope] >>> ACTUATOR DELTA: Injecting Pivot Vector:")
-        print(f"    {pivot_phrase.strip()}")
-        return history + pivot_phrase
+        self._log(f"[Gyroscope] >>> ACTUATOR DELTA: Injecting Pivot Vector:")
+        self._log(f"    {pivot_phrase.strip()}")
+        history.append(pivot_phrase)
+
+    # ---------- CONTEXT: SUMMARY FOLD ----------
+
+    def _fold_history(self, history: PulseHistory) -> PulseSession:
+        """Summarise evicted text when the 'summary' context policy asks for it."""
+        fold_prompt = history.next_fold()
+        if fold_prompt is None:
+            return
+        result = yield PulseRequest(
+            prompt=fold_prompt,
+            max_tokens=history.summary_tokens,
+            temperature=0.3,
+            logprobs=None,
+        )
+        history.apply_fold(result.text)
+        self._log(f"[Gyroscope] Context summary updated ({len(history.summary)} chars)")
+
+    # ---------- PULSE LENGTH ----------
+
+    def _pulse_sizer(self, pulse_tokens: int) -> Optional[PulseSizer]:
+        if not self.adaptive_pulses:
+            return None
+        return PulseSizer(
+            target_risk=self.target_risk,
+            repetition_limit=self.ngram_fixation_threshold,
+            initial=pulse_tokens,
+            min_tokens=self.min_pulse_tokens,
+            max_tokens=self.max_pulse_tokens,
+        )
 
     # ---------- MAIN LOOP ----------
 
@@ -282,35 +374,91 @@ class CoherenceController:
         """
         Run a multi-pulse generation with feedback after each pulse.
         """
-        history = system_prompt
-        full_output = ""
+        return run_session_sync(
+            self.session(system_prompt, max_pulses, pulse_tokens, echo_intermediate),
+            self._execute,
+        )
+
+    def session(
+        self,
+        system_prompt: str,
+        max_pulses: int = 6,
+        pulse_tokens: int = 40,
+        echo_intermediate: bool = True,
+    ) -> PulseSession:
+        """
+        generate_with_gyroscope as a generator: yields PulseRequests, receives
+        PulseResults, returns the final text (see gyroscope_scheduler).
+        """
+        history = PulseHistory(
+            system_prompt,
+            policy=self.context_policy,
+            token_budget=self.context_tokens,
+        )
+        output_parts: List[str] = []
+        self.session_id = new_session_id()
+        sizer = self._pulse_sizer(pulse_tokens)
+        size = sizer.size if sizer else pulse_tokens
 
         for pulse_idx in range(1, max_pulses + 1):
-            print(f"\n--- PULSE {pulse_idx} ---")
-            print(f"[Gyroscope] Temperature before pulse: {self.temperature:.3f}")
+            self._log(f"\n--- PULSE {pulse_idx} ---")
+            self._log(f"[Gyroscope] Temperature before pulse: {self.temperature:.3f}")
+            pulse_temperature = self.temperature
 
             # If previous step requested a pivot, inject it now into the context.
+            delta_fired = self.pivot_pending
             if self.pivot_pending:
-                history = self._inject_pivot_into_history(history)
+                self._inject_pivot_into_history(history)
                 self.pivot_pending = False
 
-            chunk, top_logprobs_seq, tokens = self._call_llm_pulse(
-                prompt=history,
-                max_tokens=pulse_tokens,
-            )
+            yield from self._fold_history(history)
+            prompt = history.render()
+            if history.evicted:
+                self._log(
+                    f"[Gyroscope] Context: ~{history.prompt_tokens()} tokens "
+                    f"({history.policy}, {history.evicted} segment(s) evicted)"
+                )
+
+            monitor = None
+            if self.stream_pulses:
+                monitor = PulseMonitor()
+                result = yield self._pulse_request(
+                    prompt=prompt,
+                    max_tokens=size,
+                    on_token=self._fixation_watch(monitor),
+                )
+                chunk, tokens = monitor.text, monitor.tokens
+                if result.aborted:
+                    self.aborted_pulses += 1
+                    self.tokens_saved += size - len(tokens)
+                    self._log(
+                        f"[Gyroscope] Fixation at token {len(tokens)}/{size}, "
+                        f"2-gram={monitor.ngram_rate:.3f} → pulse cut short"
+                    )
+            else:
+                result = yield self._pulse_request(
+                    prompt=prompt,
+                    max_tokens=size,
+                )
+                chunk, top_logprobs_seq, tokens = result.text, result.top_logprobs_seq, result.tokens
 
             if not chunk.strip():
-                print("[Gyroscope] Empty chunk received, stopping.")
+                self._log("[Gyroscope] Empty chunk received, stopping.")
                 break
 
             # === SIGNALS ===
-            pmon_risk = compute_pmon_risk(top_logprobs_seq)
-            adj_rate, ngram_rate = compute_repetition_metrics(tokens, ngram_size=2)
+            if monitor is not None:
+                pmon = monitor.pmon.signal()
+                adj_rate, ngram_rate = monitor.adj_rate, monitor.ngram_rate
+            else:
+                pmon = pmon_signal(top_logprobs_seq)
+                adj_rate, ngram_rate = compute_repetition_metrics(tokens, ngram_size=2)
 
             # Weighted combination:
             #   - PMON risk (entropy/variance),
             #   - 2-gram repetition (fixation),
             #   - adjacency (weak weight here).
+            pmon_risk = pmon.risk
             combined_risk = (
                 (1.0 - self.repetition_weight) * pmon_risk
                 + self.repetition_weight * ngram_rate
@@ -318,36 +466,68 @@ class CoherenceController:
             )
             combined_risk = max(0.0, min(1.0, combined_risk))
 
-            print(f"[Gyroscope] PMON Risk (entropy/variance): {pmon_risk:.3f}")
-            print(f"[Gyroscope] Adjacent repetition: {adj_rate:.3f}")
-            print(f"[Gyroscope] 2-gram repetition: {ngram_rate:.3f}")
-            print(f"[Gyroscope] ==> Combined Risk_Index: {combined_risk:.3f}")
-
             # === ACTUATOR BETA: FIXATION DETECTION ===
             # If 2-gram repetition crosses threshold → treat as loop / attractor.
-            if ngram_rate >= self.ngram_fixation_threshold:
+            beta_fired = ngram_rate >= self.ngram_fixation_threshold
+            if beta_fired:
                 # Identify the most common 2-gram for logging / bias:
-                ngrams = []
-                for i in range(len(tokens) - 1):
-                    ngrams.append((tokens[i], tokens[i + 1]))
-                counter = Counter(ngrams)
-                best_ngram, best_count = counter.most_common(1)[0]
-                best_ratio = best_count / max(len(ngrams), 1)
+                if monitor is not None:
+                    best_ngram, best_ratio = monitor.best_ngram, ngram_rate
+                else:
+                    ngrams = []
+                    for i in range(len(tokens) - 1):
+                        ngrams.append((tokens[i], tokens[i + 1]))
+                    counter = Counter(ngrams)
+                    best_ngram, best_count = counter.most_common(1)[0]
+                    best_ratio = best_count / max(len(ngrams), 1)
                 self._apply_fixation_controls(best_ngram, best_ratio)
 
             # === ACTUATOR ALPHA: TEMPERATURE PID ===
             self._update_temperature_from_risk(combined_risk)
 
+            self.telemetry.record(
+                session=self.session_id,
+                source="live",
+                pulse=pulse_idx,
+                temperature=pulse_temperature,
+                risk=combined_risk,
+                pmon_risk=pmon_risk,
+                entropy=pmon.entropy,
+                rep2=ngram_rate,
+                adj_rate=adj_rate,
+                beta=beta_fired,
+                delta=delta_fired,
+                aborted=result.aborted,
+                latency_s=result.latency_s,
+                wait_s=result.wait_s,
+                prompt_tokens=result.prompt_tokens or estimate_tokens(prompt),
+                pulse_tokens=size,
+                output_tokens=len(tokens),
+            )
+
+            # === PULSE LENGTH ===
+            if sizer is not None:
+                next_size = sizer.update(combined_risk, ngram_rate, aborted=result.aborted)
+                if next_size != size:
+                    self._log(f"[Gyroscope] Pulse length: {size} → {next_size} tokens")
+                size = next_size
+
             # Append chunk to history & final output
-            history += chunk
-            full_output += chunk
+            history.append(chunk)
+            output_parts.append(chunk)
 
             if echo_intermediate:
-                print("\n[Model Chunk]")
-                print(chunk.strip())
+                self._log("\n[Model Chunk]")
+                self._log(chunk.strip())
 
-        print("\n[Gyroscope] Generation complete.\n")
-        return full_output.strip()
+        if self.aborted_pulses:
+            self._log(
+                f"\n[Gyroscope] Streaming: {self.aborted_pulses} pulse(s) cut on fixation, "
+                f"~{self.tokens_saved} tokens not generated."
+            )
+        self.telemetry.flush()
+        self._log("\n[Gyroscope] Generation complete.\n")
+        return "".join(output_parts).strip()
 
 
 # ======== DEMO / STRESS TEST ========
@@ -375,6 +555,7 @@ System failure. System failure. System failure. System failure.
         kp=0.7,
         repetition_weight=0.8,
         ngram_fixation_threshold=0.25,  # czuły próg na pętlę 2-gramową
+        stream_pulses=True,             # ucinaj puls w momencie wykrycia pętli
     )
 
     final_text = controller.generate_with_gyroscope(
@@ -9,11 +9,29 @@ Run:
     OPENAI_API_KEY=... python gyroscope_meta_architect.py
 """
 
+import contextvars
+import keyword
 import os
-from typing import List, Optional, Tuple
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 
 from openai import OpenAI
 
+from gyroscope_budget import BudgetExhausted, SessionBudget
+from gyroscope_cache import ResponseCache
+from gyroscope_completeness import AMBIGUOUS, COMPLETE, classify_completeness
+from gyroscope_context import StepContextWindow, estimate_tokens
+from gyroscope_ratelimit import RateLimiter, request_tokens, shared_limiter
+from gyroscope_resilience import ResilientCaller
+from gyroscope_sessions import SessionStore
+from gyroscope_step_cache import DEFAULT_EMBED_MODEL, REUSE, StepHit, StepResultCache
+from gyroscope_streaming import PulseStream, StopPredicate
+from gyroscope_telemetry import PulseTelemetry
+
 
 # ---------------------------------------------------------------------------
 # Low-level LLM wrapper (Responses API)
@@ -22,14 +40,43 @@ from openai import OpenAI
 class GyroLLMClient:
     """
     Thin wrapper around OpenAI Responses API.
+
+    Optional `cache` (ResponseCache) serves repeated deterministic calls;
+    callers tag each call with a `cache_site` that selects the cache policy.
+
+    Optional `resilience` (ResilientCaller) adds per-site deadlines, retries
+    with backoff and hedged requests; the SDK's own retries are then disabled
+    so the two layers do not multiply.
+
+    `base_url` points the client at another OpenAI-compatible server (e.g.
+    gyroscope_fake_upstream); None keeps the SDK default / OPENAI_BASE_URL.
+
+    Every request sent (retries and hedges included) takes its quota from
+    `limiter` (default: the process-wide shared_limiter()) through the
+    resilience layer's admit hook, before its attempt deadline starts, so
+    waiting for quota never looks like a slow upstream. A hedge is fired
+    only when its quota is available without waiting.
     """
 
-    def __init__(self, model_name: str = "gpt-4.1-mini"):
+    def __init__(
+        self,
+        model_name: str = "gpt-4.1-mini",
+        cache: Optional[ResponseCache] = None,
+        resilience: Optional[ResilientCaller] = None,
+        base_url: Optional[str] = None,
+        limiter: Optional[RateLimiter] = None,
+    ):
         api_key = os.environ.get("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY is not set in the environment.")
-        self.client = OpenAI(api_key=api_key)
+        client_kwargs = {"api_key": api_key, "base_url": base_url}
+        if resilience is not None:
+            client_kwargs["max_retries"] = 0
+        self.client = OpenAI(**client_kwargs)
         self.model_name = model_name
+        self.cache = cache
+        self.resilience = resilience
+        self.limiter = limiter if limiter is not None else shared_limiter()
 
     @staticmethod
     def _extract_text(resp) -> str:
@@ -41,11 +88,47 @@ class GyroLLMClient:
         except Exception:
             return getattr(resp, "output_text", "") or ""
 
+    @classmethod
+    def _unpack_response(cls, resp) -> Tuple[str, Optional[int], object]:
+        text = cls._extract_text(resp).strip()
+        usage = getattr(resp, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None) if usage else None
+        return text, total_tokens, resp
+
+    def _admission(self, tokens: int, site: Optional[str]):
+        """ResilientCaller admit hook: quota for every request it sends."""
+        def admit(blocking: bool) -> bool:
+            if blocking:
+                self.limiter.acquire(tokens, site=site)
+                return True
+            return self.limiter.try_acquire(tokens, site=site)
+
+        return admit
+
+    def _create(self, cache_site: Optional[str], hedge: Optional[bool] = None, **kwargs):
+        """responses.create, rate limited, through the resilience layer when set."""
+        reserved = request_tokens(kwargs["input"], kwargs["max_output_tokens"])
+        if self.resilience is None:
+            self.limiter.acquire(reserved, site=cache_site)
+            resp = self.client.responses.create(**kwargs)
+        else:
+            resp = self.resilience.call(
+                cache_site,
+                lambda timeout: self.client.responses.create(timeout=timeout, **kwargs),
+                hedge=hedge,
+                admit=self._admission(reserved, cache_site),
+            )
+        if not kwargs.get("stream"):
+            usage = getattr(resp, "usage", None)
+            self.limiter.settle(reserved, getattr(usage, "total_tokens", None))
+        return resp
+
     def generate_pulse(
         self,
         prompt: str,
         max_tokens: int = 256,
         temperature: float = 0.5,
+        cache_site: Optional[str] = None,
     ) -> Tuple[str, Optional[int], object]:
         """
         Single non-streaming call to the model.
@@ -55,16 +138,108 @@ class GyroLLMClient:
         # Responses API: max_output_tokens must be >= 16
         max_tokens = max(max_tokens, 16)
 
-        resp = self.client.responses.create(
+        if self.cache is not None:
+            hit = self.cache.get(
+                cache_site, self.model_name, prompt, temperature, max_tokens
+            )
+            if hit is not None:
+                return hit
+
+        resp = self._create(
+            cache_site,
             model=self.model_name,
             input=prompt,
             max_output_tokens=max_tokens,
             temperature=temperature,
         )
-        text = self._extract_text(resp).strip()
-        usage = getattr(resp, "usage", None)
-        total_tokens = getattr(usage, "total_tokens", None) if usage else None
-        return text, total_tokens, resp
+        result = self._unpack_response(resp)
+
+        if self.cache is not None:
+            text, total_tokens, _ = result
+            self.cache.put(
+                cache_site, self.model_name, prompt, temperature, max_tokens,
+                text, total_tokens, resp,
+            )
+        return result
+
+    def embed(self, text: str, model: str = DEFAULT_EMBED_MODEL) -> List[float]:
+        """Embedding vector for `text` (used by the step-level cache)."""
+        if self.resilience is None:
+            self.limiter.acquire(estimate_tokens(text), site="embed")
+            resp = self.client.embeddings.create(model=model, input=text)
+        else:
+            resp = self.resilience.call(
+                "embed",
+                lambda timeout: self.client.embeddings.create(
+                    model=model, input=text, timeout=timeout
+                ),
+                admit=self._admission(estimate_tokens(text), "embed"),
+            )
+        return list(resp.data[0].embedding)
+
+    def _cache_writer(self, cache_site, prompt, temperature, max_tokens):
+        if self.cache is None:
+            return None
+
+        def write(text: str, total_tokens: Optional[int], raw: object) -> None:
+            self.cache.put(
+                cache_site, self.model_name, prompt, temperature, max_tokens,
+                text, total_tokens, raw,
+            )
+
+        return write
+
+    def stream_pulse(
+        self,
+        prompt: str,
+        max_tokens: int = 256,
+        temperature: float = 0.5,
+        cache_site: Optional[str] = None,
+        stop_when: Optional[StopPredicate] = None,
+    ) -> PulseStream:
+        """
+        Streaming call to the model.
+        Iterate the returned PulseStream for text deltas; afterwards
+        stream.result() gives (text, token_count, raw_response) like
+        generate_pulse.
+        """
+        max_tokens = max(max_tokens, 16)
+
+        if self.cache is not None:
+            hit = self.cache.get(
+                cache_site, self.model_name, prompt, temperature, max_tokens
+            )
+            if hit is not None:
+                return PulseStream.from_result(*hit)
+
+        # streams are not hedged: the winner would have to be picked mid-stream
+        events = self._create(
+            cache_site,
+            hedge=False,
+            model=self.model_name,
+            input=prompt,
+            max_output_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+        )
+        return PulseStream(
+            events,
+            stop_when=stop_when,
+            on_complete=self._cache_writer(cache_site, prompt, temperature, max_tokens),
+            prompt_tokens=estimate_tokens(prompt),
+            on_finish=lambda used: self.limiter.settle(request_tokens(prompt, max_tokens), used),
+        )
+
+
+StepCallback = Callable[[int, str, str], None]
+
+# Budget of the meta session running in the current context (thread / task).
+_SESSION_BUDGET: "contextvars.ContextVar[Optional[SessionBudget]]" = contextvars.ContextVar(
+    "gyro_session_budget", default=None
+)
+
+# continuation that opens a new markdown element: needs its own line
+_BLOCK_START = re.compile(r"```|#{1,6} |[-*+] |\d+[.)] |\|")
 
 
 # ---------------------------------------------------------------------------
@@ -78,15 +253,116 @@ class IntentArchitect:
     1. Generate a high-level plan (Blueprint).
     2. Execute step-by-step.
     3. For each chunk, run a tiny critic (“complete?” YES/NO).
+
+    INCOMPLETE steps are resumed from their truncated tail (retry_mode
+    "continue") instead of being regenerated from scratch ("regenerate").
+
+    Step prompts see a bounded CONTEXT (StepContextWindow): the latest
+    `context_keep_recent` outputs verbatim plus a rolling summary of the rest.
+    `context_token_budget` bounds the assembled step prompt (goal, step,
+    instructions, cached output to adapt, CONTEXT): the CONTEXT block gets
+    whatever the rest leaves, possibly nothing.
+
+    Every LLM call goes through `_pulse`, which enforces and feeds the
+    session budget (`self.budget`, unlimited unless a SessionBudget is given).
+    A session's budget lives in a context variable, not on the instance, so
+    concurrent sessions sharing one architect never charge each other's.
+
+    With a `step_cache` (StepResultCache), accepted step outputs are kept
+    across sessions; a semantically matching step is reused as is or
+    lightly adapted instead of generated from scratch.
+
+    With `telemetry` (PulseTelemetry) every LLM call is recorded as a pulse
+    (source = call site, temperature, latency, tokens).
     """
 
-    def __init__(self, model: GyroLLMClient):
+    # step-sized calls whose max_tokens shrink as the budget runs low
+    _BUDGET_SCALED_SITES = ("step", "continue")
+
+    def __init__(
+        self,
+        model: GyroLLMClient,
+        context_token_budget: int = 1500,
+        context_keep_recent: int = 2,
+        retry_mode: str = "continue",
+        step_cache: Optional[StepResultCache] = None,
+        telemetry: Optional[PulseTelemetry] = None,
+    ):
+        if retry_mode not in ("continue", "regenerate"):
+            raise ValueError(f"Unknown retry_mode: {retry_mode!r}")
         self.model = model
+        self.context_token_budget = context_token_budget
+        self.context_keep_recent = context_keep_recent
+        self.retry_mode = retry_mode
+        self.step_cache = step_cache
+        self.telemetry = telemetry
+        self._pulses = 0
+        self._budget = SessionBudget()
+
+    @property
+    def budget(self) -> SessionBudget:
+        """Budget of the session running in this context, else the architect's own."""
+        budget = _SESSION_BUDGET.get()
+        return budget if budget is not None else self._budget
+
+    @budget.setter
+    def budget(self, budget: SessionBudget) -> None:
+        self._budget = budget
+
+    # ----- LLM CALL (budget-aware) -----------------------------------------
+
+    def _pulse(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        cache_site: Optional[str] = None,
+    ) -> Tuple[str, Optional[int], object]:
+        """
+        Single model call under the session budget.
+        Raises BudgetExhausted instead of calling once the budget is spent.
+        """
+        self.budget.check()
+        if cache_site in self._BUDGET_SCALED_SITES:
+            max_tokens = self.budget.scale_tokens(max_tokens)
+        started = time.monotonic()
+        text, total_tokens, raw = self.model.generate_pulse(
+            prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            cache_site=cache_site,
+        )
+        self.budget.charge(total_tokens, cached=getattr(raw, "cached", False))
+        self._record_pulse(cache_site, temperature, raw, total_tokens, time.monotonic() - started)
+        return text, total_tokens, raw
+
+    def _record_pulse(
+        self,
+        cache_site: Optional[str],
+        temperature: float,
+        raw: object,
+        total_tokens: Optional[int],
+        latency_s: Optional[float],
+    ) -> None:
+        if self.telemetry is None:
+            return
+        self._pulses += 1
+        usage = getattr(raw, "usage", None)
+        output_tokens = getattr(usage, "output_tokens", None)
+        self.telemetry.record(
+            source=cache_site or "",
+            pulse=self._pulses,
+            temperature=temperature,
+            latency_s=latency_s,
+            prompt_tokens=getattr(usage, "input_tokens", None) or 0,
+            output_tokens=output_tokens if output_tokens is not None else (total_tokens or 0),
+        )
 
     # ----- PLAN GENERATION -------------------------------------------------
 
-    def _generate_plan(self, prompt: str) -> List[str]:
-        meta_prompt = (
+    @staticmethod
+    def _build_plan_prompt(prompt: str) -> str:
+        return (
             f"GOAL: {prompt}\n\n"
             "You are a senior planner. Create a concise numbered plan with 4–8 steps.\n"
             "Each step must be on its own line, formatted exactly as:\n"
@@ -94,23 +370,57 @@ class IntentArchitect:
             "2. [Step name] - [Short description]\n"
             "No intro, no outro, no extra commentary."
         )
-        text, _, _ = self.model.generate_pulse(
-            meta_prompt,
+
+    @staticmethod
+    def _parse_plan(text: str) -> List[str]:
+        return [ln.strip(" -") for ln in text.splitlines() if ln.strip()]
+
+    def _generate_plan(self, prompt: str) -> List[str]:
+        text, _, _ = self._pulse(
+            self._build_plan_prompt(prompt),
             max_tokens=220,
             temperature=0.2,
+            cache_site="plan",
+        )
+        return self._parse_plan(text)
+
+    # ----- CONTEXT WINDOW --------------------------------------------------
+
+    def _new_context(self) -> StepContextWindow:
+        return StepContextWindow(
+            token_budget=self.context_token_budget,
+            keep_recent=self.context_keep_recent,
         )
-        steps = [ln.strip(" -") for ln in text.splitlines() if ln.strip()]
-        return steps
+
+    def _context_reserve(self, step: str, user_prompt: str, hit: Optional[StepHit]) -> int:
+        """Tokens of the step prompt outside its CONTEXT block."""
+        if hit is None:
+            frame = self._build_step_prompt(step, user_prompt, "")
+        else:
+            frame = self._build_adapt_prompt(step, user_prompt, "", hit)
+        return estimate_tokens(frame)
+
+    def _render_context(self, context: StepContextWindow, reserve_tokens: int = 0) -> str:
+        """Fold steps that left the verbatim window, then render the block."""
+        while True:
+            fold = context.next_fold()
+            if fold is None:
+                break
+            key, summary_prompt = fold
+            summary, _, _ = self._pulse(
+                summary_prompt,
+                max_tokens=context.summary_tokens,
+                temperature=0.0,
+                cache_site="summary",
+            )
+            context.apply_fold(key, summary)
+        return context.render(reserve_tokens)
 
     # ----- STEP EXECUTION --------------------------------------------------
 
-    def _execute_step(
-        self,
-        step: str,
-        user_prompt: str,
-        prior_output: str,
-    ) -> str:
-        exec_prompt = (
+    @staticmethod
+    def _build_step_prompt(step: str, user_prompt: str, prior_output: str) -> str:
+        return (
             f"USER GOAL: {user_prompt}\n\n"
             f"CURRENT STEP OF THE PLAN:\n{step}\n\n"
             "CONTEXT (what has already been produced in earlier steps):\n"
@@ -120,39 +430,237 @@ class IntentArchitect:
             "do not apologise. If this step involves code, output the full usable "
             "code and minimal necessary explanation."
         )
-        text, _, _ = self.model.generate_pulse(
-            exec_prompt,
+
+    def _execute_step(
+        self,
+        step: str,
+        user_prompt: str,
+        prior_output: str,
+    ) -> Tuple[str, object]:
+        """Returns (text, raw_response); raw carries the finish status."""
+        text, _, raw = self._pulse(
+            self._build_step_prompt(step, user_prompt, prior_output),
             max_tokens=900,
             temperature=0.5,
+            cache_site="step",
         )
-        return text
+        return text, raw
 
-    # ----- MICRO-REFLECTION ------------------------------------------------
+    # ----- STEP CACHE ------------------------------------------------------
+
+    def _model_version(self) -> str:
+        return getattr(self.model, "model_name", "unknown")
+
+    def _lookup_step(
+        self,
+        step: str,
+        user_prompt: str,
+    ) -> Tuple[Optional[List[float]], Optional[StepHit]]:
+        """(key embedding, nearest cached step) – (None, None) without a cache."""
+        if self.step_cache is None:
+            return None, None
+        try:
+            vector = self.model.embed(
+                self.step_cache.key_text(step, user_prompt),
+                model=self.step_cache.embed_model,
+            )
+        except Exception as e:
+            print(f"   >>> ARCHITECT: Step cache unavailable ({e}).")
+            return None, None
+        return vector, self.step_cache.lookup(vector, self._model_version())
+
+    def _remember_step(
+        self,
+        vector: Optional[List[float]],
+        step: str,
+        user_prompt: str,
+        chunk: str,
+    ) -> None:
+        if self.step_cache is not None and vector is not None:
+            self.step_cache.store(vector, step, user_prompt, self._model_version(), chunk)
+
+    @staticmethod
+    def _build_adapt_prompt(step: str, user_prompt: str, prior_output: str, hit: StepHit) -> str:
+        return (
+            f"USER GOAL: {user_prompt}\n\n"
+            f"CURRENT STEP OF THE PLAN:\n{step}\n\n"
+            "CONTEXT (what has already been produced in earlier steps):\n"
+            f"{prior_output}\n\n"
+            "A closely matching step was already solved for a related goal:\n"
+            f"PREVIOUS GOAL: {hit.goal}\n"
+            f"PREVIOUS STEP: {hit.step}\n"
+            f"PREVIOUS OUTPUT:\n{hit.chunk}\n\n"
+            "TASK: Produce ONLY the content for the CURRENT step by adapting the "
+            "previous output. Keep everything that still applies; change only names, "
+            "details and gaps that this goal, step or context require. Output the "
+            "complete result, without commentary about the adaptation."
+        )
+
+    def _adapt_step(
+        self,
+        step: str,
+        user_prompt: str,
+        prior_output: str,
+        hit: StepHit,
+    ) -> Tuple[str, object]:
+        text, _, raw = self._pulse(
+            self._build_adapt_prompt(step, user_prompt, prior_output, hit),
+            max_tokens=900,
+            temperature=0.2,
+            cache_site="step",
+        )
+        return text, raw
+
+    # ----- CONTINUATION ----------------------------------------------------
+
+    @staticmethod
+    def _open_fence(text: str) -> Optional[str]:
+        """
+        Return the opening line of an unclosed ``` block (e.g. '```python'),
+        or None when all fences are balanced.
+        """
+        fences = [ln.strip() for ln in text.splitlines() if ln.strip().startswith("```")]
+        if len(fences) % 2 == 0:
+            return None
+        return fences[-1]
+
+    @classmethod
+    def _build_continuation_prompt(
+        cls,
+        step: str,
+        user_prompt: str,
+        partial: str,
+        tail_chars: int = 2000,
+    ) -> str:
+        tail = partial[-tail_chars:]
+        fence = cls._open_fence(partial)
+        if fence:
+            where = (
+                f"The output stopped INSIDE an open code block ({fence}). "
+                "Continue the code exactly where it stops, do not re-open the "
+                "block, and close it with ``` when the code is finished."
+            )
+        else:
+            where = "The output stopped before the step was finished."
+        return (
+            f"USER GOAL: {user_prompt}\n\n"
+            f"CURRENT STEP OF THE PLAN:\n{step}\n\n"
+            "PARTIAL OUTPUT FOR THIS STEP (last part, verbatim):\n"
+            f"{tail}\n\n"
+            f"TASK: {where}\n"
+            "Output ONLY the missing remainder, starting with the very next "
+            "character. Do not repeat anything that is already written, do not "
+            "add commentary."
+        )
 
-    def _reflect_and_update(self, chunk: str) -> bool:
+    @staticmethod
+    def _cut_mid_token(partial: str, continuation: str, in_code: bool) -> bool:
         """
-        Softer critic:
-        - If output is clearly truncated (very short, unclosed code block, ends on '...' etc.) -> NO.
-        - Otherwise we *strongly bias* toward YES.
+        True when the partial clearly stopped inside one identifier or number
+        (snake_case, digits, and in code camelCase across the cut). A plain
+        word on each side is ambiguous ('the' + 'game') and counts as two.
         """
+        head = re.search(r"\w+$", partial)
+        tail = re.match(r"\w+", continuation)
+        if head is None or tail is None:
+            return False
+        a, b = head.group(), tail.group()
+        return (
+            a.endswith("_")
+            or b.startswith("_")
+            or (a[-1].isdigit() and b[0].isdigit())
+            or (in_code and a[-1].islower() and b[0].isupper() and not b.isupper())
+        )
 
-        text = chunk.strip()
+    @staticmethod
+    def _ends_open_expression(line: str) -> bool:
+        """Last code line cannot end here ('return', 'x +', 'f(a,')."""
+        line = line.rstrip()
+        if line.endswith(("(", "[", "{", ",", "=", "+", "-", "*", "/", "%", "\\", ".")):
+            return True
+        words = line.split()
+        return bool(words) and keyword.iskeyword(words[-1])
+
+    @classmethod
+    def _splice_continuation(
+        cls,
+        partial: str,
+        continuation: str,
+        max_overlap: int = 400,
+    ) -> str:
+        """
+        Join a truncated output and its raw (unstripped) continuation into
+        one clean text:
+        - drop a re-opened fence when the partial already has one open,
+        - drop the longest prefix of the continuation that repeats the
+          partial's tail (models often restate the last line),
+        - keep whitespace the continuation starts with; otherwise glue
+          directly only when the cut split an identifier, else insert a
+          newline (open code block, new block element) or a space.
+        """
+        cont = continuation
+        fence = cls._open_fence(partial)
+        if fence and cont.lstrip().startswith("```"):
+            first_line, _, rest = cont.lstrip().partition("\n")
+            # '```' alone would close the block – keep it; '```lang' re-opens it.
+            if first_line.strip() != "```":
+                cont = rest
+
+        limit = min(max_overlap, len(partial), len(cont))
+        for size in range(limit, 7, -1):
+            if partial.endswith(cont[:size]):
+                cont = cont[size:]
+                break
 
-        # 1) Hard heuristics first – obvious truncation
-        # very short = probably not a full step
-        if len(text.split()) < 25:
-            return False
+        if not cont.strip():
+            return partial
+        if partial[-1:].isspace() or cont[:1].isspace():
+            return partial + cont
+        if cls._cut_mid_token(partial, cont, in_code=fence is not None):
+            return partial + cont
+        last_line = partial.rsplit("\n", 1)[-1]
+        if fence:
+            sep = " " if cls._ends_open_expression(last_line) else "\n"
+        elif _BLOCK_START.match(cont):
+            sep = "\n"
+        else:
+            sep = " "
+        return partial + sep + cont
+
+    def _continue_step(
+        self,
+        step: str,
+        user_prompt: str,
+        partial: str,
+    ) -> Tuple[str, object]:
+        text, _, raw = self._pulse(
+            self._build_continuation_prompt(step, user_prompt, partial),
+            max_tokens=900,
+            temperature=0.3,
+            cache_site="continue",
+        )
+        # generate_pulse strips the text; the splice needs its leading whitespace
+        return GyroLLMClient._extract_text(raw) or text, raw
 
-        # unclosed fenced code block → clearly incomplete
-        if "```" in text and text.count("```") % 2 == 1:
-            return False
+    # ----- MICRO-REFLECTION ------------------------------------------------
 
-        # ends in obvious mid-thought markers
-        if text.endswith("...") or text.endswith(".."):
-            return False
+    @staticmethod
+    def _precheck_chunk(text: str, raw: object = None) -> Optional[bool]:
+        """
+        Local completeness check (gyroscope_completeness): fences, brackets,
+        Python `ast` parse, sentence termination and max_output_tokens
+        detection on the raw response.
+        Returns True / False when decided locally, None for the ambiguous
+        band (i.e. the LLM critic has to decide).
+        """
+        verdict, _ = classify_completeness(text, raw)
+        if verdict == AMBIGUOUS:
+            return None
+        return verdict == COMPLETE
 
-        # 2) Ask the model, but tell it to be *very* generous
-        meta_prompt = (
+    @staticmethod
+    def _build_reflection_prompt(text: str) -> str:
+        return (
             "You are an internal critic helping another model.\n"
             "Given the following output, answer in a single word:\n"
             "- Reply 'NO' ONLY if the text clearly ends mid-sentence, mid-code, "
@@ -162,23 +670,100 @@ class IntentArchitect:
             "ANSWER (YES or NO):"
         )
 
-        decision, _, _ = self.model.generate_pulse(
-            meta_prompt,
+    @staticmethod
+    def _parse_reflection(decision: str) -> bool:
+        decision = (decision or "").strip().upper()
+        return decision.startswith("YES")
+
+    def _reflect_and_update(self, chunk: str, raw: object = None) -> bool:
+        """
+        Softer critic:
+        - Decide locally whenever possible (truncated / clearly finished).
+        - Only in the ambiguous band ask the model, *strongly biased* toward YES.
+        """
+
+        text = chunk.strip()
+
+        # 1) Local classifier first – no network round trip
+        verdict = self._precheck_chunk(text, raw)
+        if verdict is not None:
+            return verdict
+
+        # 2) Ask the model, but tell it to be *very* generous
+        decision, _, _ = self._pulse(
+            self._build_reflection_prompt(text),
             max_tokens=16,
             temperature=0.0,
+            cache_site="reflect",
         )
-        decision = (decision or "").strip().upper()
-        return decision.startswith("YES")
+        return self._parse_reflection(decision)
 
     # ----- MAIN ARCHITECT SESSION ------------------------------------------
 
+    def _run_step(self, step: str, prompt: str, context: StepContextWindow) -> str:
+        """
+        Execute one plan step: generate, reflect, continue/repeat until the
+        chunk is complete (max 5 attempts, fewer when the budget runs low).
+        Returns the accepted chunk; if the budget runs out after the first
+        generation, the partial chunk is returned as is.
+        """
+        vector, hit = self._lookup_step(step, prompt)
+        if hit is not None and hit.mode == REUSE:
+            print(f"   >>> ARCHITECT: Step OK (step cache, sim={hit.similarity:.3f}) → {step}")
+            return hit.chunk
+
+        prior_output = self._render_context(context, self._context_reserve(step, prompt, hit))
+
+        if hit is not None:
+            print(f"   >>> ARCHITECT: Adapting cached step (sim={hit.similarity:.3f}) → {step}")
+            chunk, raw = self._adapt_step(step, prompt, prior_output, hit)
+        else:
+            chunk, raw = self._execute_step(step, prompt, prior_output)
+        attempt = 1
+        try:
+            while True:
+                is_ok = self._reflect_and_update(chunk, raw)
+
+                status = "OK" if is_ok else "INCOMPLETE"
+                action = "continue" if self.retry_mode == "continue" else "repeat"
+                print(
+                    f"   >>> ARCHITECT: Step {status} → {step}"
+                    + ("" if is_ok else f" ({action}).")
+                )
+
+                if is_ok:
+                    self._remember_step(vector, step, prompt, chunk)
+                if is_ok or attempt >= self.budget.attempts_per_step(5):
+                    return chunk
+
+                attempt += 1
+                if self.retry_mode == "continue":
+                    continuation, raw = self._continue_step(step, prompt, chunk)
+                    spliced = self._splice_continuation(chunk, continuation)
+                    if spliced == chunk:
+                        # model had nothing to add – accept what we have
+                        return chunk
+                    chunk = spliced
+                else:
+                    chunk, raw = self._execute_step(step, prompt, prior_output)
+        except BudgetExhausted as e:
+            print(f"   >>> ARCHITECT: Budget exhausted mid-step ({e}), keeping partial output.")
+            return chunk
+
     def run_architect_session(
         self,
         prompt: str,
         plan_steps: Optional[List[str]] = None,
+        precomputed: Optional[List[Tuple[str, str]]] = None,
+        on_step: Optional[StepCallback] = None,
     ) -> str:
         """
         High-level driver for Level 5.
+
+        `precomputed` – (step, chunk) pairs already executed for the leading
+        steps of this plan (speculative execution, resumed checkpoint); used
+        in order as long as the step text matches.
+        `on_step(index, step, chunk)` is called for every accepted step.
         """
         if plan_steps is None:
             print("   >>> ARCHITECT: Constructing Blueprint V0...")
@@ -189,30 +774,28 @@ class IntentArchitect:
         for s in plan_steps:
             print(f"     - {s}")
 
+        reused = list(precomputed or [])
         full_output = ""
-        for raw_step in plan_steps:
-            step = raw_step.strip()
-            if not step:
-                continue
-
+        context = self._new_context()
+        steps = [raw_step.strip() for raw_step in plan_steps if raw_step.strip()]
+        for idx, step in enumerate(steps):
             print(f"\n[FOCUS] Executing Step: {step}")
-            attempt = 0
-            while True:
-                attempt += 1
-                chunk = self._execute_step(step, prompt, full_output)
-                is_ok = self._reflect_and_update(chunk)
-
-                status = "OK" if is_ok else "INCOMPLETE"
-                print(
-                    f"   >>> ARCHITECT: Step {status} → {step}"
-                    + ("" if is_ok else " (repeat).")
-                )
-
-                full_output += "\n" + chunk
-
-                if is_ok or attempt >= 5:
+            if idx < len(reused) and reused[idx][0] == step:
+                chunk = reused[idx][1]
+                print(f"   >>> ARCHITECT: Step OK (reused) → {step}")
+            else:
+                reused = []
+                try:
+                    chunk = self._run_step(step, prompt, context)
+                except BudgetExhausted as e:
+                    print(f"\n--- BUDGET EXHAUSTED ({e}): returning partial result ---\n")
                     break
 
+            full_output += "\n" + chunk
+            context.add(step, chunk)
+            if on_step is not None:
+                on_step(idx, step, chunk)
+
         print("\n--- SESSION COMPLETE ---\n")
         return full_output.strip()
 
@@ -221,42 +804,92 @@ class IntentArchitect:
 # Level 6 – Meta-Architect (Recursion / OPTIMA-01)
 # ---------------------------------------------------------------------------
 
+class _SpeculationCancelled(Exception):
+    """Raised in the speculation thread instead of an LLM call once cancelled."""
+
+
 class MetaArchitect(IntentArchitect):
     """
     Level 6 controller.
 
     Adds a pre-execution loop:
         Plan V0 → Critique → Plan V1 → Critique → ... → Plan V* → Execute
+
+    Optional speculation: the first `speculative_steps` steps of Plan V0 run
+    in the background while the critique loop is still going. A result is
+    kept only if its step (and every step before it) survives unchanged in
+    the final blueprint; `speculation_stats` tracks hits and time saved.
+
+    refine_mode "fused" replaces critique + rewrite (two calls per cycle)
+    with a single structured call; malformed answers fall back to the
+    two-call path.
+
+    With a `session_store`, sessions run under a session ID are
+    checkpointed (blueprint + every accepted step) and resumed from the
+    last completed step when started again with the same ID.
     """
 
+    def __init__(
+        self,
+        model: GyroLLMClient,
+        refine_mode: str = "two_call",
+        session_store: Optional[SessionStore] = None,
+        **kwargs,
+    ):
+        if refine_mode not in ("two_call", "fused"):
+            raise ValueError(f"Unknown refine_mode: {refine_mode!r}")
+        super().__init__(model, **kwargs)
+        self.refine_mode = refine_mode
+        self.session_store = session_store
+        self.speculation_stats: Dict[str, float] = {
+            "steps_launched": 0,
+            "steps_hit": 0,
+            "steps_discarded": 0,
+            "seconds_saved": 0.0,
+        }
+        # per thread: the speculation thread's cancel flag, checked by _pulse
+        self._speculation = threading.local()
+
+    def speculation_hit_rate(self) -> float:
+        launched = self.speculation_stats["steps_launched"]
+        return self.speculation_stats["steps_hit"] / launched if launched else 0.0
+
     # ---- PLAN CRITIC ------------------------------------------------------
 
-    def _critique_plan(self, plan_steps: List[str]) -> str:
+    @staticmethod
+    def _build_critique_prompt(plan_steps: List[str]) -> str:
         plan_str = "\n".join(plan_steps)
-        meta_prompt = (
+        return (
             f"CURRENT PLAN:\n{plan_str}\n\n"
             "CRITICAL REVIEW: Identify ONE major structural flaw in this plan "
             "(e.g. lack of modularity, missing edge cases, poor separation of concerns).\n"
             "If the plan is solid and well-structured, reply exactly with 'OPTIMAL'.\n"
             "Otherwise, describe the flaw briefly in 1–3 sentences."
         )
-        critique, _, _ = self.model.generate_pulse(
-            meta_prompt,
+
+    @staticmethod
+    def _is_plan_validated(critique: str) -> bool:
+        return "OPTIMAL" in critique.upper() or len(critique) < 5
+
+    def _critique_plan(self, plan_steps: List[str]) -> str:
+        critique, _, _ = self._pulse(
+            self._build_critique_prompt(plan_steps),
             max_tokens=160,
             temperature=0.0,
+            cache_site="critique",
         )
         return critique.strip()
 
     # ---- PLAN OPTIMIZER ---------------------------------------------------
 
-    def _optimize_plan(
-        self,
+    @staticmethod
+    def _build_optimize_prompt(
         prompt: str,
         old_plan: List[str],
         critique: str,
-    ) -> List[str]:
+    ) -> str:
         old_plan_str = "\n".join(old_plan)
-        meta_prompt = (
+        return (
             f"GOAL: {prompt}\n"
             f"OLD PLAN:\n{old_plan_str}\n\n"
             f"CRITIQUE: {critique}\n\n"
@@ -264,13 +897,90 @@ class MetaArchitect(IntentArchitect):
             "and abstraction. Keep it concise but explicit.\n"
             "Format: '1. [Step Name] - [Description]' per line, no extra commentary."
         )
-        new_plan_text, _, _ = self.model.generate_pulse(
-            meta_prompt,
+
+    def _optimize_plan(
+        self,
+        prompt: str,
+        old_plan: List[str],
+        critique: str,
+    ) -> List[str]:
+        new_plan_text, _, _ = self._pulse(
+            self._build_optimize_prompt(prompt, old_plan, critique),
             max_tokens=260,
             temperature=0.3,
+            cache_site="optimize",
         )
-        lines = [ln.strip(" -") for ln in new_plan_text.splitlines() if ln.strip()]
-        return lines
+        return self._parse_plan(new_plan_text)
+
+    # ---- FUSED CRITIQUE + REWRITE ----------------------------------------
+
+    @staticmethod
+    def _build_refine_prompt(prompt: str, plan_steps: List[str]) -> str:
+        plan_str = "\n".join(plan_steps)
+        return (
+            f"GOAL: {prompt}\n"
+            f"CURRENT PLAN:\n{plan_str}\n\n"
+            "CRITICAL REVIEW: Identify ONE major structural flaw in this plan "
+            "(e.g. lack of modularity, missing edge cases, poor separation of concerns).\n"
+            "If the plan is solid and well-structured, reply exactly with 'OPTIMAL'.\n"
+            "Otherwise reply in exactly this format and nothing else:\n"
+            "CRITIQUE: <the flaw in 1–3 sentences>\n"
+            "PLAN:\n"
+            "1. [Step Name] - [Description]\n"
+            "2. [Step Name] - [Description]\n"
+            "(the full rewritten plan, addressing the critique, concise but explicit)"
+        )
+
+    @classmethod
+    def _parse_refinement(cls, text: str) -> Optional[Tuple[str, Optional[List[str]]]]:
+        """
+        Parse a fused refinement answer into (critique, new_plan).
+        - ("OPTIMAL", None)    – plan validated,
+        - (critique, None)     – critique readable, rewritten plan malformed,
+        - None                 – unusable answer (fall back to two calls).
+        """
+        text = (text or "").strip()
+        if not text:
+            return None
+        if text.upper().startswith("OPTIMAL"):
+            return "OPTIMAL", None
+
+        m = re.search(
+            r"CRITIQUE\s*:\s*(.*?)\s*(?:^\s*(?:REWRITTEN\s+)?PLAN\s*:\s*$(.*))?\Z",
+            text,
+            re.S | re.I | re.M,
+        )
+        if m is None or not m.group(1).strip():
+            return None
+
+        critique = m.group(1).strip()
+        steps = [
+            ln for ln in cls._parse_plan(m.group(2) or "")
+            if re.match(r"^\d+[.)]\s+\S", ln)
+        ]
+        return critique, (steps if len(steps) >= 2 else None)
+
+    def _refine_plan(
+        self,
+        prompt: str,
+        plan_steps: List[str],
+    ) -> Tuple[str, Optional[List[str]]]:
+        """
+        One round trip for critique + rewrite. Returns (critique, new_plan);
+        new_plan is None when validated or when the rewrite has to be
+        requested separately.
+        """
+        text, _, _ = self._pulse(
+            self._build_refine_prompt(prompt, plan_steps),
+            max_tokens=420,
+            temperature=0.2,
+            cache_site="refine",
+        )
+        parsed = self._parse_refinement(text)
+        if parsed is None:
+            print("   >>> META-ARCHITECT: Fused refinement malformed, using two-call path.")
+            return self._critique_plan(plan_steps), None
+        return parsed
 
     @staticmethod
     def _plan_to_bullet_str(plan_steps: List[str]) -> str:
@@ -282,24 +992,41 @@ class MetaArchitect(IntentArchitect):
         self,
         prompt: str,
         max_retries: int = 2,
+        initial_plan: Optional[List[str]] = None,
     ) -> List[str]:
-        print("   >>> META-ARCHITECT: Generating Initial Blueprint (V0)...")
-        plan = self._generate_plan(prompt)
+        if initial_plan is None:
+            print("   >>> META-ARCHITECT: Generating Initial Blueprint (V0)...")
+            plan = self._generate_plan(prompt)
+        else:
+            plan = list(initial_plan)
 
         for i in range(max_retries):
+            if i >= self.budget.critique_cycles(max_retries):
+                print("   >>> META-ARCHITECT: Budget running low, skipping further critique.")
+                break
+
             print(f"\n   [RECURSION CYCLE {i+1}]")
             print("   CURRENT PLAN:")
             for s in plan:
                 print(f"     - {s}")
 
-            critique = self._critique_plan(plan)
-            print(f"\n   CRITIC SAYS: {critique}")
+            try:
+                if self.refine_mode == "fused":
+                    critique, new_plan = self._refine_plan(prompt, plan)
+                else:
+                    critique, new_plan = self._critique_plan(plan), None
+                print(f"\n   CRITIC SAYS: {critique}")
 
-            if "OPTIMAL" in critique.upper() or len(critique) < 5:
-                print("   >>> PLAN VALIDATED.")
-                break
+                if self._is_plan_validated(critique):
+                    print("   >>> PLAN VALIDATED.")
+                    break
 
-            plan = self._optimize_plan(prompt, plan, critique)
+                if new_plan is None:
+                    new_plan = self._optimize_plan(prompt, plan, critique)
+            except BudgetExhausted as e:
+                print(f"   >>> META-ARCHITECT: Budget exhausted ({e}), keeping current plan.")
+                break
+            plan = new_plan
             print(f"   >>> BLUEPRINT UPDATED to V{i+1}")
 
         print("\n>>> FINAL BLUEPRINT <<<")
@@ -308,23 +1035,229 @@ class MetaArchitect(IntentArchitect):
 
         return plan
 
+    # ---- SPECULATIVE EXECUTION -------------------------------------------
+
+    def _pulse(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        cache_site: Optional[str] = None,
+    ) -> Tuple[str, Optional[int], object]:
+        cancel = getattr(self._speculation, "cancel", None)
+        if cancel is not None and cancel.is_set():
+            raise _SpeculationCancelled(cache_site)
+        return super()._pulse(prompt, max_tokens, temperature, cache_site)
+
+    def _speculate_steps(
+        self,
+        prompt: str,
+        steps: List[str],
+        results: "queue.Queue",
+        cancel: threading.Event,
+    ) -> None:
+        """
+        Background worker: execute leading V0 steps in order, pushing
+        (step, chunk, started, finished) per finished step and None when done.
+        Once `cancel` is set every further LLM call of this thread raises
+        _SpeculationCancelled, so a discarded step stops at its next call.
+        """
+        self._speculation.cancel = cancel
+        try:
+            context = self._new_context()
+            for step in steps:
+                if cancel.is_set():
+                    break
+                t0 = time.perf_counter()
+                chunk = self._run_step(step, prompt, context)
+                results.put((step, chunk, t0, time.perf_counter()))
+                context.add(step, chunk)
+        except _SpeculationCancelled:
+            pass
+        except Exception as e:
+            print(f"   >>> SPECULATION: aborted ({e})")
+        finally:
+            self._speculation.cancel = None
+            results.put(None)
+
+    @staticmethod
+    def _surviving_prefix(speculated: List[str], final_plan: List[str]) -> int:
+        final_steps = [s.strip() for s in final_plan if s.strip()]
+        n = 0
+        for spec_step, final_step in zip(speculated, final_steps):
+            if spec_step != final_step:
+                break
+            n += 1
+        return n
+
+    def _record_speculation(
+        self,
+        launched: int,
+        hits: List[Tuple[str, str, float, float]],
+        blueprint_done: float,
+    ):
+        """
+        seconds_saved counts only the part of each kept step that ran before
+        the final blueprint was ready (perf_counter time): the rest the
+        session would have waited for anyway.
+        """
+        self.speculation_stats["steps_launched"] += launched
+        self.speculation_stats["steps_hit"] += len(hits)
+        self.speculation_stats["steps_discarded"] += launched - len(hits)
+        self.speculation_stats["seconds_saved"] += sum(
+            max(0.0, min(finished, blueprint_done) - started)
+            for _, _, started, finished in hits
+        )
+        print(
+            f"   >>> SPECULATION: {len(hits)}/{launched} steps kept "
+            f"(hit rate {self.speculation_hit_rate():.0%}, "
+            f"saved {self.speculation_stats['seconds_saved']:.1f}s total)"
+        )
+
+    # ---- CHECKPOINTS -------------------------------------------------------
+
+    def _load_checkpoint(self, session_id: Optional[str]) -> Optional[Dict]:
+        """A resumable checkpoint (one with a blueprint) for session_id, or None."""
+        if self.session_store is None or session_id is None:
+            return None
+        record = self.session_store.load(session_id)
+        if not record or not record.get("blueprint"):
+            return None
+        return record
+
+    def _checkpoint_writer(self, session_id: Optional[str]) -> Optional[StepCallback]:
+        if self.session_store is None or session_id is None:
+            return None
+        store = self.session_store
+
+        def write(index: int, step: str, chunk: str) -> None:
+            store.save_step(session_id, index, step, chunk)
+
+        return write
+
+    def _finish_checkpoint(self, session_id: Optional[str], plan: List[str]) -> None:
+        if self.session_store is None or session_id is None:
+            return
+        record = self.session_store.load(session_id)
+        if record is None:
+            return
+        steps = [s.strip() for s in plan if s.strip()]
+        if len(record.get("steps", [])) >= len(steps):
+            self.session_store.mark_complete(session_id)
+
     # ---- FULL META SESSION -----------------------------------------------
 
-    def run_meta_session(self, prompt: str, max_retries: int = 2) -> str:
+    def run_meta_session(
+        self,
+        prompt: str,
+        max_retries: int = 2,
+        speculative_steps: int = 0,
+        budget: Optional[SessionBudget] = None,
+        session_id: Optional[str] = None,
+    ) -> str:
         """
-        1) Generate & refine blueprint.
+        1) Generate & refine blueprint
+           (optionally executing the first V0 steps speculatively meanwhile).
         2) Execute optimized plan with Level 5.
         3) Print truncated preview.
+
+        With a `budget`, critique cycles, retries and step max_tokens shrink
+        as it runs low; once exhausted the partial result is returned.
+
+        With a `session_id` (and a session_store), progress is checkpointed;
+        an existing checkpoint is resumed: its blueprint and prompt are
+        reused and only the steps that never completed are executed.
         """
         print("\n=== LEVEL 6: META-ARCHITECT / OPTIMA-01 ===")
+        budget = budget or SessionBudget()
+        budget.start()
+        token = _SESSION_BUDGET.set(budget)
+        try:
+            return self._meta_session(prompt, max_retries, speculative_steps, session_id)
+        finally:
+            _SESSION_BUDGET.reset(token)
+
+    def _meta_session(
+        self,
+        prompt: str,
+        max_retries: int,
+        speculative_steps: int,
+        session_id: Optional[str],
+    ) -> str:
+        checkpoint = self._load_checkpoint(session_id)
+        if checkpoint is not None:
+            done = len(checkpoint["steps"])
+            print(f"   >>> META-ARCHITECT: Resuming session {session_id} "
+                  f"({done}/{len(checkpoint['blueprint'])} steps done).")
+            if checkpoint["prompt"] != prompt:
+                print("   >>> META-ARCHITECT: Prompt differs from checkpoint; using the checkpointed one.")
+            return self._execute_and_report(
+                checkpoint["prompt"],
+                checkpoint["blueprint"],
+                self.session_store.completed_steps(checkpoint),
+                session_id,
+            )
+
+        print("   >>> META-ARCHITECT: Generating Initial Blueprint (V0)...")
+        try:
+            plan_v0 = self._generate_plan(prompt)
+        except BudgetExhausted as e:
+            print(f"   >>> META-ARCHITECT: Budget exhausted before planning ({e}).")
+            return ""
+
+        speculated = [s.strip() for s in plan_v0 if s.strip()][:max(0, speculative_steps)]
+        if speculated:
+            results: "queue.Queue" = queue.Queue()
+            cancel = threading.Event()
+            executor = ThreadPoolExecutor(max_workers=1)
+            # the worker thread charges this session's budget
+            executor.submit(
+                contextvars.copy_context().run,
+                self._speculate_steps, prompt, speculated, results, cancel,
+            )
+
         optimized_plan = self.generate_optimized_blueprint(
             prompt,
             max_retries=max_retries,
+            initial_plan=plan_v0,
         )
+        blueprint_done = time.perf_counter()
+
+        precomputed: List[Tuple[str, str]] = []
+        if speculated:
+            hits = []
+            for _ in range(self._surviving_prefix(speculated, optimized_plan)):
+                item = results.get()
+                if item is None:
+                    break
+                hits.append(item)
+            cancel.set()
+            executor.shutdown(wait=False)
+            self._record_speculation(len(speculated), hits, blueprint_done)
+            precomputed = [(step, chunk) for step, chunk, _, _ in hits]
+
+        if self.session_store is not None and session_id is not None:
+            self.session_store.save_blueprint(session_id, prompt, optimized_plan)
 
+        return self._execute_and_report(prompt, optimized_plan, precomputed, session_id)
+
+    def _execute_and_report(
+        self,
+        prompt: str,
+        plan: List[str],
+        precomputed: List[Tuple[str, str]],
+        session_id: Optional[str],
+    ) -> str:
         print("\n>>> EXECUTING OPTIMIZED PLAN...\n")
-        final_text = self.run_architect_session(prompt, plan_steps=optimized_plan)
+        final_text = self.run_architect_session(
+            prompt,
+            plan_steps=plan,
+            precomputed=precomputed,
+            on_step=self._checkpoint_writer(session_id),
+        )
+        self._finish_checkpoint(session_id, plan)
 
+        print(f"   >>> BUDGET: {self.budget.snapshot()}")
         print("\n===== FINAL ARTIFACT (TRUNCATED PREVIEW) =====\n")
         preview = final_text[:1500]
         print(preview)
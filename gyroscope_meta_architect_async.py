@@ -0,0 +1,807 @@
+#!/usr/bin/env python
+"""
+gyroscope_meta_architect_async.py
+
+Native asyncio variant of the Level 5 / Level 6 architect stack.
+
+The synchronous GyroLLMClient / IntentArchitect / MetaArchitect block one
+OS thread per session. The classes below reuse the very same prompts and
+parsers, but every LLM round trip is awaited, so thousands of sessions can
+share a single event loop.
+
+Run:
+    OPENAI_API_KEY=... python gyroscope_meta_architect_async.py
+"""
+
+import asyncio
+import inspect
+import os
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from openai import AsyncOpenAI
+
+from gyroscope_budget import BudgetExhausted, SessionBudget
+from gyroscope_cache import ResponseCache
+from gyroscope_context import StepContextWindow, estimate_tokens
+from gyroscope_meta_architect import (
+    _SESSION_BUDGET,
+    GyroLLMClient,
+    IntentArchitect,
+    MetaArchitect,
+    StepCallback,
+)
+from gyroscope_ratelimit import RateLimiter, request_tokens, shared_limiter
+from gyroscope_resilience import ResilientCaller
+from gyroscope_step_cache import DEFAULT_EMBED_MODEL, REUSE, StepHit
+from gyroscope_streaming import AsyncPulseStream, StopPredicate
+
+
+# ---------------------------------------------------------------------------
+# Low-level async LLM wrapper (Responses API)
+# ---------------------------------------------------------------------------
+
+class AsyncGyroLLMClient:
+    """
+    Async twin of GyroLLMClient (same return contract, same optional cache,
+    resilience layer and rate limiter; losing hedged requests are cancelled).
+    """
+
+    def __init__(
+        self,
+        model_name: str = "gpt-4.1-mini",
+        cache: Optional[ResponseCache] = None,
+        resilience: Optional[ResilientCaller] = None,
+        base_url: Optional[str] = None,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY is not set in the environment.")
+        client_kwargs = {"api_key": api_key, "base_url": base_url}
+        if resilience is not None:
+            client_kwargs["max_retries"] = 0
+        self.client = AsyncOpenAI(**client_kwargs)
+        self.model_name = model_name
+        self.cache = cache
+        self.resilience = resilience
+        self.limiter = limiter if limiter is not None else shared_limiter()
+
+    def _admission(self, tokens: int, site: Optional[str]):
+        """ResilientCaller admit hook: quota for every request it sends."""
+        async def admit(blocking: bool) -> bool:
+            if blocking:
+                await self.limiter.aacquire(tokens, site=site)
+                return True
+            return self.limiter.try_acquire(tokens, site=site)
+
+        return admit
+
+    async def _create(self, cache_site: Optional[str], hedge: Optional[bool] = None, **kwargs):
+        reserved = request_tokens(kwargs["input"], kwargs["max_output_tokens"])
+        if self.resilience is None:
+            await self.limiter.aacquire(reserved, site=cache_site)
+            resp = await self.client.responses.create(**kwargs)
+        else:
+            resp = await self.resilience.acall(
+                cache_site,
+                lambda timeout: self.client.responses.create(timeout=timeout, **kwargs),
+                hedge=hedge,
+                admit=self._admission(reserved, cache_site),
+            )
+        if not kwargs.get("stream"):
+            usage = getattr(resp, "usage", None)
+            self.limiter.settle(reserved, getattr(usage, "total_tokens", None))
+        return resp
+
+    async def generate_pulse(
+        self,
+        prompt: str,
+        max_tokens: int = 256,
+        temperature: float = 0.5,
+        cache_site: Optional[str] = None,
+    ) -> Tuple[str, Optional[int], object]:
+        """
+        Single non-streaming call to the model.
+        Returns (text, token_count, raw_response).
+        """
+
+        # Responses API: max_output_tokens must be >= 16
+        max_tokens = max(max_tokens, 16)
+
+        if self.cache is not None:
+            hit = await self.cache.aget(
+                cache_site, self.model_name, prompt, temperature, max_tokens
+            )
+            if hit is not None:
+                return hit
+
+        resp = await self._create(
+            cache_site,
+            model=self.model_name,
+            input=prompt,
+            max_output_tokens=max_tokens,
+            temperature=temperature,
+        )
+        result = GyroLLMClient._unpack_response(resp)
+
+        if self.cache is not None:
+            text, total_tokens, _ = result
+            await self.cache.aput(
+                cache_site, self.model_name, prompt, temperature, max_tokens,
+                text, total_tokens, resp,
+            )
+        return result
+
+    async def embed(self, text: str, model: str = DEFAULT_EMBED_MODEL) -> List[float]:
+        if self.resilience is None:
+            await self.limiter.aacquire(estimate_tokens(text), site="embed")
+            resp = await self.client.embeddings.create(model=model, input=text)
+        else:
+            resp = await self.resilience.acall(
+                "embed",
+                lambda timeout: self.client.embeddings.create(
+                    model=model, input=text, timeout=timeout
+                ),
+                admit=self._admission(estimate_tokens(text), "embed"),
+            )
+        return list(resp.data[0].embedding)
+
+    def _cache_writer(self, cache_site, prompt, temperature, max_tokens):
+        """Stream on_complete hook: the whole put runs in a worker thread."""
+        if self.cache is None:
+            return None
+        loop = asyncio.get_running_loop()
+
+        def write(text: str, total_tokens: Optional[int], raw: object) -> None:
+            loop.run_in_executor(
+                None, self.cache.put,
+                cache_site, self.model_name, prompt, temperature, max_tokens,
+                text, total_tokens, raw,
+            )
+
+        return write
+
+    async def stream_pulse(
+        self,
+        prompt: str,
+        max_tokens: int = 256,
+        temperature: float = 0.5,
+        cache_site: Optional[str] = None,
+        stop_when: Optional[StopPredicate] = None,
+    ) -> AsyncPulseStream:
+        """
+        Streaming call to the model.
+        `async for delta in stream` yields text deltas; afterwards
+        `await stream.result()` gives (text, token_count, raw_response).
+        """
+        max_tokens = max(max_tokens, 16)
+
+        if self.cache is not None:
+            hit = await self.cache.aget(
+                cache_site, self.model_name, prompt, temperature, max_tokens
+            )
+            if hit is not None:
+                return AsyncPulseStream.from_result(*hit)
+
+        events = await self._create(
+            cache_site,
+            hedge=False,
+            model=self.model_name,
+            input=prompt,
+            max_output_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+        )
+        return AsyncPulseStream(
+            events,
+            stop_when=stop_when,
+            on_complete=self._cache_writer(cache_site, prompt, temperature, max_tokens),
+            prompt_tokens=estimate_tokens(prompt),
+            on_finish=lambda used: self.limiter.settle(request_tokens(prompt, max_tokens), used),
+        )
+
+
+def _status(message: str) -> Dict[str, Any]:
+    print(f"   >>> {message}")
+    return {"type": "status", "message": message}
+
+
+# ---------------------------------------------------------------------------
+# Level 5 – Intent Architect (async)
+# ---------------------------------------------------------------------------
+
+class AsyncIntentArchitect(IntentArchitect):
+    """
+    Level 5 controller on asyncio.
+
+    Prompt builders and parsers are inherited from IntentArchitect;
+    only the LLM-facing methods are redefined as coroutines.
+
+    stream_steps=True streams step generation token-by-token: the session
+    yields content events as deltas arrive (continuation retries are
+    appended as one block once spliced).
+    """
+
+    def __init__(self, model: AsyncGyroLLMClient, stream_steps: bool = False, **kwargs):
+        super().__init__(model, **kwargs)
+        self.stream_steps = stream_steps
+
+    # ----- LLM CALL (budget-aware) -----------------------------------------
+
+    async def _pulse(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        cache_site: Optional[str] = None,
+    ) -> Tuple[str, Optional[int], object]:
+        self.budget.check()
+        if cache_site in self._BUDGET_SCALED_SITES:
+            max_tokens = self.budget.scale_tokens(max_tokens)
+        started = time.monotonic()
+        text, total_tokens, raw = await self.model.generate_pulse(
+            prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            cache_site=cache_site,
+        )
+        self.budget.charge(total_tokens, cached=getattr(raw, "cached", False))
+        self._record_pulse(cache_site, temperature, raw, total_tokens, time.monotonic() - started)
+        return text, total_tokens, raw
+
+    async def _open_step_stream(self, step: str, user_prompt: str, prior_output: str):
+        self.budget.check()
+        return await self.model.stream_pulse(
+            self._build_step_prompt(step, user_prompt, prior_output),
+            max_tokens=self.budget.scale_tokens(900),
+            temperature=0.5,
+            cache_site="step",
+            stop_when=lambda _text: self.budget.exhausted,
+        )
+
+    def _settle_stream(self, stream: AsyncPulseStream) -> Tuple[str, object]:
+        self.budget.charge(stream.total_tokens, cached=getattr(stream.raw, "cached", False))
+        # latency unknown here: the stream was opened (and consumed) elsewhere
+        self._record_pulse("step", 0.5, stream.raw, stream.total_tokens, None)
+        return stream.text, stream.raw
+
+    # ----- PLAN GENERATION -------------------------------------------------
+
+    async def _generate_plan(self, prompt: str) -> List[str]:
+        text, _, _ = await self._pulse(
+            self._build_plan_prompt(prompt),
+            max_tokens=220,
+            temperature=0.2,
+            cache_site="plan",
+        )
+        return self._parse_plan(text)
+
+    # ----- CONTEXT WINDOW --------------------------------------------------
+
+    async def _render_context(self, context: StepContextWindow, reserve_tokens: int = 0) -> str:
+        while True:
+            fold = context.next_fold()
+            if fold is None:
+                break
+            key, summary_prompt = fold
+            summary, _, _ = await self._pulse(
+                summary_prompt,
+                max_tokens=context.summary_tokens,
+                temperature=0.0,
+                cache_site="summary",
+            )
+            context.apply_fold(key, summary)
+        return context.render(reserve_tokens)
+
+    # ----- STEP EXECUTION --------------------------------------------------
+
+    async def _execute_step(
+        self,
+        step: str,
+        user_prompt: str,
+        prior_output: str,
+    ) -> Tuple[str, object]:
+        text, _, raw = await self._pulse(
+            self._build_step_prompt(step, user_prompt, prior_output),
+            max_tokens=900,
+            temperature=0.5,
+            cache_site="step",
+        )
+        return text, raw
+
+    async def _lookup_step(
+        self,
+        step: str,
+        user_prompt: str,
+    ) -> Tuple[Optional[List[float]], Optional[StepHit]]:
+        if self.step_cache is None:
+            return None, None
+        try:
+            vector = await self.model.embed(
+                self.step_cache.key_text(step, user_prompt),
+                model=self.step_cache.embed_model,
+            )
+        except Exception as e:
+            print(f"   >>> ARCHITECT: Step cache unavailable ({e}).")
+            return None, None
+        # first lookup loads the JSONL file; the scan itself is a large matmul
+        hit = await asyncio.to_thread(self.step_cache.lookup, vector, self._model_version())
+        return vector, hit
+
+    async def _remember_step(
+        self,
+        vector: Optional[List[float]],
+        step: str,
+        user_prompt: str,
+        chunk: str,
+    ) -> None:
+        if self.step_cache is not None and vector is not None:
+            await asyncio.to_thread(
+                self.step_cache.store, vector, step, user_prompt, self._model_version(), chunk
+            )
+
+    async def _adapt_step(
+        self,
+        step: str,
+        user_prompt: str,
+        prior_output: str,
+        hit: StepHit,
+    ) -> Tuple[str, object]:
+        text, _, raw = await self._pulse(
+            self._build_adapt_prompt(step, user_prompt, prior_output, hit),
+            max_tokens=900,
+            temperature=0.2,
+            cache_site="step",
+        )
+        return text, raw
+
+    async def _continue_step(
+        self,
+        step: str,
+        user_prompt: str,
+        partial: str,
+    ) -> Tuple[str, object]:
+        text, _, raw = await self._pulse(
+            self._build_continuation_prompt(step, user_prompt, partial),
+            max_tokens=900,
+            temperature=0.3,
+            cache_site="continue",
+        )
+        # generate_pulse strips the text; the splice needs its leading whitespace
+        return GyroLLMClient._extract_text(raw) or text, raw
+
+    # ----- MICRO-REFLECTION ------------------------------------------------
+
+    async def _reflect_and_update(self, chunk: str, raw: object = None) -> bool:
+        text = chunk.strip()
+
+        verdict = self._precheck_chunk(text, raw)
+        if verdict is not None:
+            return verdict
+
+        decision, _, _ = await self._pulse(
+            self._build_reflection_prompt(text),
+            max_tokens=16,
+            temperature=0.0,
+            cache_site="reflect",
+        )
+        return self._parse_reflection(decision)
+
+    # ----- MAIN ARCHITECT SESSION ------------------------------------------
+
+    async def _run_step_events(
+        self,
+        step: str,
+        prompt: str,
+        context: StepContextWindow,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Execute one plan step (generate → reflect → continue/repeat).
+        Yields status events per attempt, delta events while the first
+        generation streams (stream_steps), and finally one content event
+        with the accepted chunk (without the leading newline).
+        """
+        vector, hit = await self._lookup_step(step, prompt)
+        if hit is not None and hit.mode == REUSE:
+            yield _status(f"ARCHITECT: Step OK (step cache, sim={hit.similarity:.3f}) → {step}")
+            yield {"type": "content", "chunk": hit.chunk}
+            return
+
+        prior_output = await self._render_context(context, self._context_reserve(step, prompt, hit))
+
+        if hit is not None:
+            yield _status(f"ARCHITECT: Adapting cached step (sim={hit.similarity:.3f}) → {step}")
+            chunk, raw = await self._adapt_step(step, prompt, prior_output, hit)
+        elif self.stream_steps and self.retry_mode == "continue":
+            stream = await self._open_step_stream(step, prompt, prior_output)
+            async for delta in stream:
+                yield {"type": "delta", "chunk": delta}
+            chunk, raw = self._settle_stream(stream)
+        else:
+            chunk, raw = await self._execute_step(step, prompt, prior_output)
+        attempt = 1
+        try:
+            while True:
+                is_ok = await self._reflect_and_update(chunk, raw)
+
+                status = "OK" if is_ok else "INCOMPLETE"
+                yield _status(f"ARCHITECT: Step {status} → {step}")
+
+                if is_ok:
+                    await self._remember_step(vector, step, prompt, chunk)
+                if is_ok or attempt >= self.budget.attempts_per_step(5):
+                    break
+
+                attempt += 1
+                if self.retry_mode == "continue":
+                    continuation, raw = await self._continue_step(step, prompt, chunk)
+                    spliced = self._splice_continuation(chunk, continuation)
+                    if spliced == chunk:
+                        break
+                    chunk = spliced
+                else:
+                    chunk, raw = await self._execute_step(step, prompt, prior_output)
+        except BudgetExhausted as e:
+            yield _status(f"ARCHITECT: Budget exhausted mid-step ({e}), keeping partial output.")
+
+        yield {"type": "content", "chunk": chunk}
+
+    async def run_architect_session(
+        self,
+        prompt: str,
+        plan_steps: Optional[List[str]] = None,
+        precomputed: Optional[List[Tuple[str, str]]] = None,
+        on_step: Optional[StepCallback] = None,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Async driver for Level 5 (`precomputed` / `on_step` as in the sync one;
+        `on_step` may also be a coroutine function).
+
+        Yields events:
+            {"type": "status",  "message": str}
+            {"type": "content", "chunk": str}   – one per completed step
+        """
+        if plan_steps is None:
+            yield _status("ARCHITECT: Constructing Blueprint V0...")
+            plan_steps = await self._generate_plan(prompt)
+
+        reused = list(precomputed or [])
+        context = self._new_context()
+        steps = [raw_step.strip() for raw_step in plan_steps if raw_step.strip()]
+        for idx, step in enumerate(steps):
+            yield _status(f"Executing Step: {step}")
+            if idx < len(reused) and reused[idx][0] == step:
+                chunk = reused[idx][1]
+                yield _status(f"ARCHITECT: Step OK (reused) → {step}")
+                yield {"type": "content", "chunk": "\n" + chunk}
+            else:
+                reused = []
+                chunk = ""
+                streamed = ""
+                try:
+                    async for event in self._run_step_events(step, prompt, context):
+                        if event["type"] == "delta":
+                            delta = event["chunk"] if streamed else event["chunk"].lstrip()
+                            if delta:
+                                yield {"type": "content", "chunk": ("" if streamed else "\n") + delta}
+                                streamed += delta
+                        elif event["type"] == "content":
+                            chunk = event["chunk"]
+                        else:
+                            yield event
+                except BudgetExhausted as e:
+                    yield _status(f"BUDGET EXHAUSTED ({e}): returning partial result")
+                    break
+
+                if streamed:
+                    # deltas are already out; send only what continuation added
+                    head = streamed.rstrip()
+                    rest = chunk[len(head):] if chunk.startswith(head) else ""
+                    if rest:
+                        yield {"type": "content", "chunk": rest}
+                else:
+                    yield {"type": "content", "chunk": "\n" + chunk}
+            context.add(step, chunk)
+            if on_step is not None:
+                done = on_step(idx, step, chunk)
+                if inspect.isawaitable(done):
+                    await done
+
+
+# ---------------------------------------------------------------------------
+# Level 6 – Meta-Architect (async)
+# ---------------------------------------------------------------------------
+
+class AsyncMetaArchitect(AsyncIntentArchitect, MetaArchitect):
+    """
+    Level 6 controller on asyncio.
+
+        Plan V0 → Critique → Plan V1 → ... → Plan V* → Execute (streamed events)
+    """
+
+    # ---- PLAN CRITIC ------------------------------------------------------
+
+    async def _critique_plan(self, plan_steps: List[str]) -> str:
+        critique, _, _ = await self._pulse(
+            self._build_critique_prompt(plan_steps),
+            max_tokens=160,
+            temperature=0.0,
+            cache_site="critique",
+        )
+        return critique.strip()
+
+    # ---- PLAN OPTIMIZER ---------------------------------------------------
+
+    async def _optimize_plan(
+        self,
+        prompt: str,
+        old_plan: List[str],
+        critique: str,
+    ) -> List[str]:
+        new_plan_text, _, _ = await self._pulse(
+            self._build_optimize_prompt(prompt, old_plan, critique),
+            max_tokens=260,
+            temperature=0.3,
+            cache_site="optimize",
+        )
+        return self._parse_plan(new_plan_text)
+
+    # ---- META BLUEPRINT LOOP ---------------------------------------------
+
+    async def _refine_plan(
+        self,
+        prompt: str,
+        plan_steps: List[str],
+    ) -> Tuple[str, Optional[List[str]]]:
+        text, _, _ = await self._pulse(
+            self._build_refine_prompt(prompt, plan_steps),
+            max_tokens=420,
+            temperature=0.2,
+            cache_site="refine",
+        )
+        parsed = self._parse_refinement(text)
+        if parsed is None:
+            return await self._critique_plan(plan_steps), None
+        return parsed
+
+    async def _blueprint_events(
+        self,
+        prompt: str,
+        plan: List[str],
+        max_retries: int,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Critique / rewrite cycles starting from `plan`.
+        Yields status events and finally {"type": "blueprint", "plan": [...]}.
+        """
+        for i in range(max_retries):
+            if i >= self.budget.critique_cycles(max_retries):
+                yield _status("META-ARCHITECT: Budget running low, skipping further critique.")
+                break
+
+            try:
+                if self.refine_mode == "fused":
+                    critique, new_plan = await self._refine_plan(prompt, plan)
+                else:
+                    critique, new_plan = await self._critique_plan(plan), None
+                yield _status(f"RECURSION CYCLE {i+1}: CRITIC SAYS: {critique}")
+
+                if self._is_plan_validated(critique):
+                    yield _status("PLAN VALIDATED.")
+                    break
+
+                if new_plan is None:
+                    new_plan = await self._optimize_plan(prompt, plan, critique)
+            except BudgetExhausted as e:
+                yield _status(f"META-ARCHITECT: Budget exhausted ({e}), keeping current plan.")
+                break
+            plan = new_plan
+            yield _status(f"BLUEPRINT UPDATED to V{i+1}")
+
+        yield {"type": "blueprint", "plan": plan}
+
+    async def generate_optimized_blueprint(
+        self,
+        prompt: str,
+        max_retries: int = 2,
+        initial_plan: Optional[List[str]] = None,
+    ) -> List[str]:
+        plan = await self._generate_plan(prompt) if initial_plan is None else list(initial_plan)
+        async for event in self._blueprint_events(prompt, plan, max_retries):
+            if event["type"] == "blueprint":
+                plan = event["plan"]
+        return plan
+
+    # ---- SPECULATIVE EXECUTION -------------------------------------------
+
+    async def _speculate_steps(
+        self,
+        prompt: str,
+        steps: List[str],
+        results: "asyncio.Queue",
+    ) -> None:
+        """
+        Background task: execute leading V0 steps in order, pushing
+        (step, chunk, started, finished) per finished step and None when done.
+        Cancelled as soon as the final blueprint diverges.
+        """
+        try:
+            context = self._new_context()
+            for step in steps:
+                t0 = time.perf_counter()
+                chunk = ""
+                async for event in self._run_step_events(step, prompt, context):
+                    if event["type"] == "content":
+                        chunk = event["chunk"]
+                results.put_nowait((step, chunk, t0, time.perf_counter()))
+                context.add(step, chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"   >>> SPECULATION: aborted ({e})")
+        finally:
+            results.put_nowait(None)
+
+    # ---- CHECKPOINTS -------------------------------------------------------
+
+    def _checkpoint_writer(self, session_id: Optional[str]):
+        """The sync writer, run in a worker thread: checkpoint I/O stays off the loop."""
+        write = super()._checkpoint_writer(session_id)
+        if write is None:
+            return None
+
+        async def awrite(index: int, step: str, chunk: str) -> None:
+            await asyncio.to_thread(write, index, step, chunk)
+
+        return awrite
+
+    # ---- FULL META SESSION -----------------------------------------------
+
+    async def run_meta_session(
+        self,
+        prompt: str,
+        max_retries: int = 2,
+        speculative_steps: int = 0,
+        budget: Optional[SessionBudget] = None,
+        session_id: Optional[str] = None,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        1) Generate & refine blueprint (status events per cycle), optionally
+           executing the first V0 steps speculatively in a background task.
+        2) Execute optimized plan, yielding content events per step.
+        3) Emit the final blueprint as the last status event.
+
+        With a `budget`, the session degrades as it runs low and ends with
+        the partial result once it is exhausted.
+
+        With a `session_id` (and a session_store), progress is checkpointed
+        and an existing checkpoint is resumed from its last completed step;
+        reused steps are replayed as content events.
+        """
+        budget = budget or SessionBudget()
+        budget.start()
+        # Bind the budget only while the session's own code runs, so sessions
+        # interleaved in one task (or driven from another) never share it;
+        # tasks it creates copy the binding.
+        events = self._meta_session(prompt, max_retries, speculative_steps, session_id)
+        try:
+            while True:
+                token = _SESSION_BUDGET.set(budget)
+                try:
+                    event = await events.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    _SESSION_BUDGET.reset(token)
+                yield event
+        finally:
+            token = _SESSION_BUDGET.set(budget)
+            try:
+                await events.aclose()
+            finally:
+                _SESSION_BUDGET.reset(token)
+
+    async def _meta_session(
+        self,
+        prompt: str,
+        max_retries: int,
+        speculative_steps: int,
+        session_id: Optional[str],
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        checkpoint = await asyncio.to_thread(self._load_checkpoint, session_id)
+        if checkpoint is not None:
+            plan = checkpoint["blueprint"]
+            yield _status(
+                f"META-ARCHITECT: Resuming session {session_id} "
+                f"({len(checkpoint['steps'])}/{len(plan)} steps done)."
+            )
+            async for event in self._execute_events(
+                checkpoint["prompt"],
+                plan,
+                self.session_store.completed_steps(checkpoint),
+                session_id,
+            ):
+                yield event
+            return
+
+        yield _status("META-ARCHITECT: Generating Initial Blueprint (V0)...")
+        try:
+            plan_v0 = await self._generate_plan(prompt)
+        except BudgetExhausted as e:
+            yield _status(f"META-ARCHITECT: Budget exhausted before planning ({e}).")
+            return
+        plan = plan_v0
+
+        speculated = [s.strip() for s in plan_v0 if s.strip()][:max(0, speculative_steps)]
+        task = None
+        if speculated:
+            results: "asyncio.Queue" = asyncio.Queue()
+            task = asyncio.create_task(self._speculate_steps(prompt, speculated, results))
+
+        precomputed: List[Tuple[str, str]] = []
+        try:
+            async for event in self._blueprint_events(prompt, plan_v0, max_retries):
+                if event["type"] == "blueprint":
+                    plan = event["plan"]
+                else:
+                    yield event
+            blueprint_done = time.perf_counter()
+
+            if task is not None:
+                hits = []
+                for _ in range(self._surviving_prefix(speculated, plan)):
+                    item = await results.get()
+                    if item is None:
+                        break
+                    hits.append(item)
+                self._record_speculation(len(speculated), hits, blueprint_done)
+                precomputed = [(step, chunk) for step, chunk, _, _ in hits]
+        finally:
+            # also when the consumer closes the generator mid-critique
+            if task is not None:
+                task.cancel()
+
+        if self.session_store is not None and session_id is not None:
+            await asyncio.to_thread(self.session_store.save_blueprint, session_id, prompt, plan)
+
+        async for event in self._execute_events(prompt, plan, precomputed, session_id):
+            yield event
+
+    async def _execute_events(
+        self,
+        prompt: str,
+        plan: List[str],
+        precomputed: List[Tuple[str, str]],
+        session_id: Optional[str],
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        async for event in self.run_architect_session(
+            prompt,
+            plan_steps=plan,
+            precomputed=precomputed,
+            on_step=self._checkpoint_writer(session_id),
+        ):
+            yield event
+        await asyncio.to_thread(self._finish_checkpoint, session_id, plan)
+
+        yield _status(f"BUDGET: {self.budget.snapshot()}")
+        yield _status("Final Blueprint:\n" + "\n".join(plan))
+
+
+# ---------------------------------------------------------------------------
+# Demo
+# ---------------------------------------------------------------------------
+
+async def _demo() -> None:
+    root_prompt = "Write a Python Snake game with a clean, modular architecture using Pygame."
+
+    client = AsyncGyroLLMClient(model_name="gpt-4.1-mini")
+    meta_arch = AsyncMetaArchitect(client)
+
+    async for event in meta_arch.run_meta_session(root_prompt, max_retries=2):
+        if event["type"] == "content":
+            print(event["chunk"][:300])
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
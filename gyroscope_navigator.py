@@ -1,9 +1,10 @@
 import os
-import time
-from typing import Tuple
+from typing import Optional, Tuple
 
 from openai import OpenAI
 
+from gyroscope_ratelimit import RateLimiter, request_tokens, shared_limiter
+
 
 """
 gyroscope_navigator.py
@@ -23,19 +24,25 @@ class LiveLLM:
 
     Uses a completion-style model that exposes temperature and behaves
     deterministically enough for our steering experiments.
+
+    Calls are paced by the shared rate limiter (gyroscope_ratelimit).
     """
 
     def __init__(
         self,
         model: str = "gpt-3.5-turbo-instruct",
         base_temperature: float = 0.7,
+        base_url: Optional[str] = None,
+        limiter: Optional[RateLimiter] = None,
     ):
         if not os.environ.get("OPENAI_API_KEY"):
             raise RuntimeError("OPENAI_API_KEY is not set in the environment.")
 
-        self.client = OpenAI()
+        # base_url: any OpenAI-compatible server (None = SDK default / OPENAI_BASE_URL)
+        self.client = OpenAI(base_url=base_url)
         self.model = model
         self.base_temperature = base_temperature
+        self.limiter = limiter if limiter is not None else shared_limiter()
 
     def generate_pulse(
         self,
@@ -54,6 +61,8 @@ class LiveLLM:
         if temperature is None:
             temperature = self.base_temperature
 
+        reserved = request_tokens(prompt, max_tokens)
+        self.limiter.acquire(reserved, site="navigator")
         response = self.client.completions.create(
             model=self.model,
             prompt=prompt,
@@ -65,6 +74,9 @@ class LiveLLM:
             logprobs=0,  # we don't need detailed telemetry here
         )
 
+        usage = getattr(response, "usage", None)
+        self.limiter.settle(reserved, getattr(usage, "total_tokens", None))
+
         choice = response.choices[0]
         text = choice.text or ""
 
@@ -182,7 +194,6 @@ class NavigatorGyroscope:
             last_block = block
 
             print("[BLOCK", i + 2, "]\n", block.strip(), "\n", sep="")
-            time.sleep(0.7)
 
         print("\n--- SESSION COMPLETE ---\n")
         print("===== FULL TEXT (with directions) =====\n")
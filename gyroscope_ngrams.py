@@ -0,0 +1,132 @@
+"""
+gyroscope_ngrams.py
+
+Incremental n-gram counts over a rolling token window, for fixation
+detection.
+
+AutopoieticGyroscope used to rebuild its repetition signals every pulse:
+repetition_rate() materialized the list of 2-gram tuples plus a fresh
+Counter, and the Beta actuator ran Counter() over the whole 400-token
+history deque. NGramTracker keeps counts for n = 1..max_n up to date as
+tokens enter the window (and, with a window, as they leave it):
+
+    tracker = NGramTracker(max_n=5, window=400)
+    tracker.push(token)               # O(max_n²) tuple work, no rescans
+    tracker.most_common(2)            # (ngram, count), O(1)
+    tracker.rate(2)                   # count / number of 2-grams in window
+
+Per n, counts are also kept in buckets by count value, so the current
+maximum only ever moves by one step per update and "most frequent n-gram"
+is a lookup. On ties the n-gram that reached the count first wins.
+
+It works per token, so the same object drives streamed detection
+(gyroscope_live.PulseMonitor) and the per-pulse / history signals of the
+autopoietic gyroscope.
+"""
+
+from collections import defaultdict, deque
+from itertools import islice
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+
+NGram = Tuple[str, ...]
+
+
+class _Counts:
+    """Counts of one n-gram size with O(1) max tracking."""
+
+    def __init__(self):
+        self.counts: Dict[NGram, int] = {}
+        # count value → n-grams with that count (dict = insertion-ordered set)
+        self.buckets: Dict[int, Dict[NGram, None]] = defaultdict(dict)
+        self.max_count = 0
+
+    def add(self, gram: NGram) -> None:
+        count = self.counts.get(gram, 0)
+        if count:
+            del self.buckets[count][gram]
+        self.counts[gram] = count + 1
+        self.buckets[count + 1][gram] = None
+        if count + 1 > self.max_count:
+            self.max_count = count + 1
+
+    def remove(self, gram: NGram) -> None:
+        count = self.counts[gram]
+        del self.buckets[count][gram]
+        if count == 1:
+            del self.counts[gram]
+        else:
+            self.counts[gram] = count - 1
+            self.buckets[count - 1][gram] = None
+        if count == self.max_count and not self.buckets[count]:
+            self.max_count = count - 1  # gram itself now sits at count - 1
+
+    def best(self) -> Tuple[NGram, int]:
+        if not self.max_count:
+            return (), 0
+        return next(iter(self.buckets[self.max_count])), self.max_count
+
+
+class NGramTracker:
+    """
+    - max_n:  largest n-gram size tracked (1..max_n),
+    - window: keep only the last `window` tokens (None = unbounded, e.g.
+              one pulse).
+    """
+
+    def __init__(self, max_n: int = 5, window: Optional[int] = None):
+        if max_n < 1:
+            raise ValueError("max_n must be >= 1")
+        if window is not None and window < 1:
+            raise ValueError("window must be >= 1")
+        self.max_n = max_n
+        self.window = window
+        self.tokens: Deque[str] = deque()
+        self._counts: List[_Counts] = [_Counts() for _ in range(max_n)]
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def push(self, token: str) -> None:
+        tokens = self.tokens
+        if self.window is not None and len(tokens) == self.window:
+            # n-grams starting at the oldest token leave the window
+            head = tuple(islice(tokens, self.max_n))
+            for n in range(1, len(head) + 1):
+                self._counts[n - 1].remove(head[:n])
+            tokens.popleft()
+
+        tokens.append(token)
+        tail = tuple(islice(reversed(tokens), self.max_n))[::-1]
+        for n in range(1, len(tail) + 1):
+            self._counts[n - 1].add(tail[-n:])
+
+    def extend(self, tokens: Iterable[str]) -> None:
+        for token in tokens:
+            self.push(token)
+
+    def clear(self) -> None:
+        self.tokens.clear()
+        self._counts = [_Counts() for _ in range(self.max_n)]
+
+    def _check(self, n: int) -> _Counts:
+        if not 1 <= n <= self.max_n:
+            raise ValueError(f"n must be in 1..{self.max_n}")
+        return self._counts[n - 1]
+
+    def count(self, gram: NGram) -> int:
+        return self._check(len(gram)).counts.get(tuple(gram), 0)
+
+    def most_common(self, n: int = 2) -> Tuple[NGram, int]:
+        """Most frequent n-gram in the window and its count; ((), 0) if none."""
+        return self._check(n).best()
+
+    def total(self, n: int = 2) -> int:
+        """Number of n-grams (positions) in the window."""
+        self._check(n)
+        return max(0, len(self.tokens) - n + 1)
+
+    def rate(self, n: int = 2) -> float:
+        """Count of the most frequent n-gram / number of n-grams; 0.0 if none."""
+        total = self.total(n)
+        return self._counts[n - 1].max_count / total if total else 0.0
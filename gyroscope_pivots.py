@@ -0,0 +1,238 @@
+"""
+gyroscope_pivots.py
+
+Pivot sentences for AutopoieticGyroscope's Delta actuator, generated ahead
+of time.
+
+On fixation the gyroscope used to ask the model for a pivot sentence and
+wait for it before the next pulse could start: one extra full round trip,
+exactly when the session is already in trouble. PivotProvider moves that
+call off the critical path:
+
+    provider.prefetch(tracker)   # risk trending up → generate in background
+    provider.get(signature)      # on fixation: cached pivot or None
+    provider.pending(signature)  # None → miss; a Future → still generating:
+                                 # the session may Pause and ask again with
+                                 # get(signature, waited=True)
+    provider.put(signature, p)   # a miss was answered synchronously
+
+Pivots are keyed by the loop signature: the dominant n-gram of the history
+window (gyroscope_ngrams.NGramTracker), lower-cased and stripped. The same
+loop ("system failure system failure ...") seen again, in this session or
+another one sharing the provider, reuses its pivot. Only a miss falls back
+to the synchronous call, whose answer is cached as well.
+
+Background calls run on a small thread pool through a blocking execute
+(e.g. LiveLLM.execute), so they work the same under run_session_sync and
+under SessionScheduler. With `path`, pivots are appended to a JSONL file
+and survive restarts.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from gyroscope_ngrams import NGramTracker
+from gyroscope_scheduler import PulseRequest, PulseResult
+
+
+# ======== PROMPT ========
+
+def pivot_request(recent_tokens: Iterable[str]) -> PulseRequest:
+    """Meta prompt asking for one transitional sentence out of the loop."""
+    recent_text = "".join(list(recent_tokens)[-40:])
+
+    meta_prompt = (
+        f"TEXT SEGMENT: '...{recent_text}'\n\n"
+        "TASK: The text above is stuck in a repetitive loop (fixation). "
+        "Write ONE short, clear transitional sentence (max 20 tokens) that "
+        "smoothly pivots from this loop to a related but distinct topic "
+        "(for example: consequences, repair procedures, diagnostics, or impact). "
+        "Do NOT repeat the loop. Do NOT use quotes or brackets. "
+        "Just output the sentence."
+    )
+    return PulseRequest(prompt=meta_prompt, max_tokens=25, temperature=0.7)
+
+
+def clean_pivot(text: str) -> str:
+    """First sentence of the model's answer, quotes removed."""
+    clean = text.strip().replace('"', "").replace("'", "")
+    if "." in clean:
+        clean = clean.split(".")[0] + "."
+    return clean
+
+
+# ======== PROVIDER ========
+
+class PivotProvider:
+    """
+    - execute:     blocking PulseRequest → PulseResult (background calls),
+    - signature_n: n-gram size of the loop signature (falls back to shorter
+                   n-grams while the window is still short),
+    - max_entries: LRU bound of the in-memory cache,
+    - max_workers: concurrent background generations,
+    - path:        optional JSONL file for pivots across restarts.
+    """
+
+    def __init__(
+        self,
+        execute: Callable[[PulseRequest], PulseResult],
+        signature_n: int = 3,
+        max_entries: int = 512,
+        max_workers: int = 2,
+        path: Optional[Path] = None,
+    ):
+        self.execute = execute
+        self.signature_n = signature_n
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+
+        self._pivots: "OrderedDict[str, str]" = OrderedDict()
+        self._pending: Dict[str, Future] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gyro-pivot")
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0, "misses": 0, "waited": 0, "late": 0, "prefetched": 0, "prefetch_failed": 0,
+        }
+        self._load()
+
+    # ---------- KEYS ----------
+
+    def signature(self, tracker: NGramTracker) -> Optional[str]:
+        """Dominant n-gram of the window as a cache key; None if the window is empty."""
+        for n in range(min(self.signature_n, tracker.max_n), 0, -1):
+            gram, count = tracker.most_common(n)
+            if count:
+                words = [tok.strip().lower() for tok in gram]
+                return " ".join(w for w in words if w) or None
+        return None
+
+    # ---------- CACHE ----------
+
+    def get(self, signature: Optional[str], waited: bool = False) -> Optional[str]:
+        """
+        Cached pivot for the signature; never blocks. A signature with
+        nothing cached or pending counts as a miss; one still pending is not
+        counted, so the caller can wait (pending()) and ask again with
+        waited=True: then a hit counts as waited, a None as late.
+        """
+        if signature is None:
+            return None
+        with self._lock:
+            pivot = self._hit_locked(signature)
+            if pivot is not None:
+                if waited:
+                    self._stats["waited"] += 1
+                return pivot
+            if waited:
+                self._stats["late"] += 1
+            elif signature not in self._pending:
+                self._stats["misses"] += 1
+            return None
+
+    def pending(self, signature: Optional[str]) -> Optional[Future]:
+        """Future of an in-flight prefetch for the signature, or None."""
+        with self._lock:
+            return self._pending.get(signature) if signature is not None else None
+
+    def _hit_locked(self, signature: str) -> Optional[str]:
+        pivot = self._pivots.get(signature)
+        if pivot is not None:
+            self._pivots.move_to_end(signature)
+            self._stats["hits"] += 1
+        return pivot
+
+    def put(self, signature: Optional[str], pivot: str) -> None:
+        if signature is None or not pivot:
+            return
+        with self._lock:
+            self._store_locked(signature, pivot)
+        self._append({"signature": signature, "pivot": pivot, "created_at": time.time()})
+
+    def _store_locked(self, signature: str, pivot: str) -> None:
+        self._pivots[signature] = pivot
+        self._pivots.move_to_end(signature)
+        while len(self._pivots) > self.max_entries:
+            self._pivots.popitem(last=False)
+
+    # ---------- BACKGROUND ----------
+
+    def prefetch(self, tracker: NGramTracker) -> bool:
+        """Start generating a pivot for the current loop signature; False if not needed."""
+        signature = self.signature(tracker)
+        if signature is None:
+            return False
+        with self._lock:
+            if signature in self._pivots or signature in self._pending:
+                return False
+            request = pivot_request(tracker.tokens)
+            self._pending[signature] = self._pool.submit(self._generate, signature, request)
+        return True
+
+    def _generate(self, signature: str, request: PulseRequest) -> None:
+        try:
+            pivot = clean_pivot(self.execute(request).text)
+        except Exception as e:
+            with self._lock:
+                self._stats["prefetch_failed"] += 1
+                self._pending.pop(signature, None)
+            print(f"[PivotProvider] Background pivot failed: {e}")
+            return
+        with self._lock:
+            self._pending.pop(signature, None)
+            if pivot:
+                self._store_locked(signature, pivot)
+                self._stats["prefetched"] += 1
+        self._append({"signature": signature, "pivot": pivot, "created_at": time.time()})
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until the background generations started so far are done."""
+        with self._lock:
+            pending = list(self._pending.values())
+        for fut in pending:
+            try:
+                fut.result(timeout=timeout)
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            report: Dict[str, Any] = dict(self._stats)
+            report["entries"] = len(self._pivots)
+            report["pending"] = len(self._pending)
+        lookups = report["hits"] + report["misses"] + report["late"]
+        report["hit_rate"] = report["hits"] / lookups if lookups else 0.0
+        return report
+
+    # ---------- STORAGE ----------
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    entry = json.loads(line)
+                    self._store_locked(entry["signature"], entry["pivot"])
+        except Exception as e:
+            print(f"[PivotProvider] Failed to load pivots: {e}")
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        if self.path is None or not entry.get("pivot"):
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"[PivotProvider] Failed to persist pivot: {e}")
@@ -0,0 +1,182 @@
+"""
+gyroscope_pmon.py
+
+Vectorized PMON-like metrics on the top_logprobs of one pulse.
+
+A pulse's top_logprobs (one {token: logprob} dict per generated token, K <= 5
+alternatives, K may vary per step) is packed once into a padded (steps, K)
+array plus a validity mask. Softmax, normalized spectral entropy, max-prob
+variance and the combined PMON risk then come out of a single numpy pass:
+
+    signal = pmon_signal(top_logprobs_seq)
+    signal.entropy, signal.variance, signal.risk
+
+The per-metric helpers (spectral_entropy_from_toplogprobs,
+variance_from_toplogprobs, compute_pmon_risk) keep their old signatures and
+return the same values as the former per-step loops in gyroscope_live and
+gyroscope_autopoietic. Empty steps are skipped, as before.
+
+RunningPmon gives the same signal incrementally, one token at a time, for
+streamed pulses.
+"""
+
+import math
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+# Upper bound of max-prob variance, used to normalize V into [0, 1].
+MAX_VARIANCE = 0.25
+
+
+@dataclass
+class PmonSignal:
+    entropy: float     # mean normalized spectral entropy, [0, 1]
+    variance: float    # variance of max prob across steps, [0, ~0.25]
+    risk: float        # alpha_entropy * entropy + alpha_variance * V_norm, [0, 1]
+    steps: int         # non-empty steps that contributed
+
+
+def pack_toplogprobs(top_logprobs_seq: List[Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack non-empty steps into a (steps, K_max) float array padded with -inf,
+    plus the boolean mask of real entries. Values are copied exactly once.
+    """
+    steps = [step for step in top_logprobs_seq if step]
+    if not steps:
+        return np.zeros((0, 0), dtype=float), np.zeros((0, 0), dtype=bool)
+
+    lengths = np.fromiter((len(step) for step in steps), dtype=np.intp, count=len(steps))
+    flat = np.fromiter(
+        chain.from_iterable(step.values() for step in steps),
+        dtype=float,
+        count=int(lengths.sum()),
+    )
+    mask = np.arange(int(lengths.max())) < lengths[:, None]
+    logps = np.full(mask.shape, -np.inf)
+    logps[mask] = flat  # row-major fill matches the dict order of each step
+    return logps, mask
+
+
+def _signal_from_packed(
+    logps: np.ndarray,
+    mask: np.ndarray,
+    alpha_entropy: float,
+    alpha_variance: float,
+) -> PmonSignal:
+    n = logps.shape[0]
+    if n == 0:
+        return PmonSignal(entropy=0.0, variance=0.0, risk=0.0, steps=0)
+
+    # Softmax per row; padded -inf entries become exactly 0.
+    ps = np.exp(logps - logps.max(axis=1, keepdims=True))
+    ps /= ps.sum(axis=1, keepdims=True)
+
+    # Padded cells contribute 0 * log(1e-12) = 0 to the entropy sum.
+    H = -np.sum(ps * np.log(ps + 1e-12), axis=1)
+    K = mask.sum(axis=1)
+    log_k = np.log(np.maximum(K, 2))
+    H_norm = np.where(K > 1, H / log_k, 0.0)
+    entropy = float(np.mean(H_norm))
+
+    variance = float(np.var(ps.max(axis=1))) if n >= 2 else 0.0
+
+    V_norm = min(variance / MAX_VARIANCE, 1.0)
+    risk = alpha_entropy * entropy + alpha_variance * V_norm
+    return PmonSignal(
+        entropy=entropy,
+        variance=variance,
+        risk=max(0.0, min(1.0, risk)),
+        steps=n,
+    )
+
+
+def pmon_signal(
+    top_logprobs_seq: List[Dict[str, float]],
+    alpha_entropy: float = 0.7,
+    alpha_variance: float = 0.3,
+) -> PmonSignal:
+    """Entropy, variance and PMON risk of one pulse in a single pass."""
+    logps, mask = pack_toplogprobs(top_logprobs_seq)
+    return _signal_from_packed(logps, mask, alpha_entropy, alpha_variance)
+
+
+# ======== PER-METRIC HELPERS (legacy signatures) ========
+
+def spectral_entropy_from_toplogprobs(top_logprobs_seq: List[Dict[str, float]]) -> float:
+    """Mean normalized spectral entropy, [0, 1]; 0 = very certain."""
+    return pmon_signal(top_logprobs_seq).entropy
+
+
+def variance_from_toplogprobs(top_logprobs_seq: List[Dict[str, float]]) -> float:
+    """Variance of the max probability across steps."""
+    return pmon_signal(top_logprobs_seq).variance
+
+
+def compute_pmon_risk(
+    top_logprobs_seq: List[Dict[str, float]],
+    alpha_entropy: float = 0.7,
+    alpha_variance: float = 0.3,
+) -> float:
+    """Scalar PMON-style risk in [0, 1] from entropy and max-prob variance."""
+    return pmon_signal(top_logprobs_seq, alpha_entropy, alpha_variance).risk
+
+
+# ======== INCREMENTAL (STREAMING) ========
+
+class RunningPmon:
+    """
+    Token-by-token version of pmon_signal for streamed pulses: push() one
+    top_logprobs dict per generated token, read entropy / variance / risk at
+    any point. Running mean + Welford variance; matches pmon_signal on the
+    same steps up to float rounding.
+    """
+
+    def __init__(self, alpha_entropy: float = 0.7, alpha_variance: float = 0.3):
+        self.alpha_entropy = alpha_entropy
+        self.alpha_variance = alpha_variance
+        self.steps = 0
+        self._entropy_sum = 0.0
+        self._max_mean = 0.0
+        self._max_m2 = 0.0
+
+    def push(self, step: Dict[str, float]) -> None:
+        if not step:
+            return
+        # K <= 5: plain floats beat a numpy round-trip per token.
+        values = list(step.values())
+        top = max(values)
+        exps = [math.exp(v - top) for v in values]
+        total = sum(exps)
+        ps = [e / total for e in exps]
+
+        K = len(ps)
+        if K > 1:
+            H = -sum(p * math.log(p + 1e-12) for p in ps)
+            self._entropy_sum += H / math.log(K)
+
+        self.steps += 1
+        max_p = max(ps)
+        delta = max_p - self._max_mean
+        self._max_mean += delta / self.steps
+        self._max_m2 += delta * (max_p - self._max_mean)
+
+    @property
+    def entropy(self) -> float:
+        return self._entropy_sum / self.steps if self.steps else 0.0
+
+    @property
+    def variance(self) -> float:
+        return self._max_m2 / self.steps if self.steps >= 2 else 0.0
+
+    @property
+    def risk(self) -> float:
+        V_norm = min(self.variance / MAX_VARIANCE, 1.0)
+        risk = self.alpha_entropy * self.entropy + self.alpha_variance * V_norm
+        return max(0.0, min(1.0, risk))
+
+    def signal(self) -> PmonSignal:
+        return PmonSignal(entropy=self.entropy, variance=self.variance, risk=self.risk, steps=self.steps)
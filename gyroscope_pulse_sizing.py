@@ -0,0 +1,186 @@
+"""
+gyroscope_pulse_sizing.py
+
+Adaptive pulse length for the pulse controllers (CoherenceController,
+AutopoieticGyroscope).
+
+With a fixed pulse_tokens / max_tokens_per_pulse (40 / 80) a long, stable,
+low-risk generation pays one round trip per 40 tokens, exactly like an
+unstable one that actually needs a check every 40 tokens. PulseSizer picks
+the next pulse's max_tokens from the signals of the last one:
+
+    risk < headroom * target  and  repetition < headroom * limit
+        → grow geometrically      (size * growth, up to max_tokens)
+    risk >= target  or  repetition >= limit  or  pulse cut on fixation
+        → shrink sharply          (size * shrink, down to min_tokens)
+    otherwise (close to target)
+        → hold
+
+So quiet stretches are generated in few long pulses, and as soon as the
+controller sees trouble it is back to short pulses, i.e. frequent checks,
+within one step. The controllers build one PulseSizer per session when
+created with adaptive_pulses=True; the session's pulse_tokens is the
+starting size.
+
+Benchmark (fixed vs adaptive, calls per 1,000 generated tokens) against the
+offline fake upstream:
+    python gyroscope_pulse_sizing.py --sessions 20 --pulses 8
+"""
+
+import argparse
+import time
+from typing import Any, Dict, List
+
+
+class PulseSizer:
+    """
+    - target_risk:      controller's target; at or above it the pulse shrinks,
+    - repetition_limit: repetition (2-gram rate) treated as fixation,
+    - initial:          size of the first pulse,
+    - min_tokens / max_tokens: bounds of the pulse size,
+    - growth:           factor while comfortably below both thresholds,
+    - shrink:           factor once either threshold is reached,
+    - headroom:         fraction of the thresholds below which pulses grow.
+    """
+
+    def __init__(
+        self,
+        target_risk: float,
+        repetition_limit: float,
+        initial: int = 40,
+        min_tokens: int = 16,
+        max_tokens: int = 320,
+        growth: float = 1.6,
+        shrink: float = 0.25,
+        headroom: float = 0.6,
+    ):
+        if not 1 <= min_tokens <= max_tokens:
+            raise ValueError("need 1 <= min_tokens <= max_tokens")
+        if growth < 1.0 or not 0.0 < shrink <= 1.0:
+            raise ValueError("need growth >= 1 and 0 < shrink <= 1")
+        self.target_risk = target_risk
+        self.repetition_limit = repetition_limit
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self.growth = growth
+        self.shrink = shrink
+        self.headroom = headroom
+
+        self.size = self._clamp(initial)
+        self.grown = 0
+        self.shrunk = 0
+
+    def _clamp(self, size: float) -> int:
+        return max(self.min_tokens, min(self.max_tokens, int(round(size))))
+
+    def update(self, risk: float, repetition: float, aborted: bool = False) -> int:
+        """Feed the last pulse's signals; returns the next pulse size."""
+        if aborted or risk >= self.target_risk or repetition >= self.repetition_limit:
+            new_size = self._clamp(self.size * self.shrink)
+            self.shrunk += new_size < self.size
+        elif (
+            risk < self.headroom * self.target_risk
+            and repetition < self.headroom * self.repetition_limit
+        ):
+            new_size = self._clamp(self.size * self.growth)
+            self.grown += new_size > self.size
+        else:
+            new_size = self.size
+        self.size = new_size
+        return new_size
+
+
+# ======== BENCHMARK ========
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fixed vs adaptive pulse sizing against the fake upstream.")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--pulses", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--fixation-prob", type=float, default=0.3)
+    parser.add_argument("--max-pulse-tokens", type=int, default=320)
+    return parser.parse_args()
+
+
+def _summary(telemetry: Any, calls: int, wall: float) -> Dict[str, Any]:
+    """calls counts every LLM request (pivots, folds too); tokens only the text pulses."""
+    rows = telemetry.array()
+    tokens = int(rows["output_tokens"].sum())
+    return {
+        "calls": calls,
+        "tokens": tokens,
+        "calls_per_1k_tokens": 1000.0 * calls / tokens if tokens else 0.0,
+        "mean_pulse_tokens": float(rows["output_tokens"].mean()) if len(rows) else 0.0,
+        "beta": int(rows["beta"].sum()),
+        "wall_s": wall,
+    }
+
+
+if __name__ == "__main__":
+    import asyncio
+    import contextlib
+    import io
+    import os
+
+    from openai import OpenAI
+
+    from gyroscope_autopoietic import AutopoieticGyroscope, LiveLLM
+    from gyroscope_fake_upstream import FakeUpstreamConfig, serve_in_thread
+    from gyroscope_live import CoherenceController
+    from gyroscope_scheduler import AsyncPulseLLM, SessionScheduler
+    from gyroscope_telemetry import PulseTelemetry
+
+    args = _parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+    handle = serve_in_thread(FakeUpstreamConfig(
+        seed=11, median_ms=80, per_token_ms=2,
+        mean_output_tokens=1000,  # a long generation: pulses end at max_tokens
+        fixation_prob=args.fixation_prob,
+    ))
+
+    def live_sessions(adaptive: bool, telemetry: PulseTelemetry) -> List[Any]:
+        shared = OpenAI(base_url=handle.base_url)
+        return [
+            CoherenceController(
+                client=shared, telemetry=telemetry, verbose=False,
+                adaptive_pulses=adaptive, max_pulse_tokens=args.max_pulse_tokens,
+            ).session(f"Session {i}: describe a city at night.\n", max_pulses=args.pulses, pulse_tokens=40)
+            for i in range(args.sessions)
+        ]
+
+    def autopoietic_sessions(adaptive: bool, telemetry: PulseTelemetry) -> List[Any]:
+        shared = LiveLLM(base_url=handle.base_url)
+        return [
+            AutopoieticGyroscope(
+                shared, telemetry=telemetry, verbose=False,
+                adaptive_pulses=adaptive, max_pulse_tokens=args.max_pulse_tokens,
+            ).session(f"Session {i}: describe a city at night.\n", pulses=args.pulses, max_tokens_per_pulse=80)
+            for i in range(args.sessions)
+        ]
+
+    async def run(sessions: List[Any]) -> Any:
+        llm = AsyncPulseLLM(base_url=handle.base_url)
+        scheduler = SessionScheduler(llm, args.concurrency)
+        try:
+            return await scheduler.run_all(sessions), scheduler
+        finally:
+            await llm.client.close()
+
+    try:
+        for name, build in (("live", live_sessions), ("autopoietic", autopoietic_sessions)):
+            for adaptive in (False, True):
+                telemetry = PulseTelemetry(capacity=args.sessions * args.pulses * 2)
+                t0 = time.monotonic()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results, scheduler = asyncio.run(run(build(adaptive, telemetry)))
+                errors = sum(isinstance(r, BaseException) for r in results)
+                report = _summary(telemetry, scheduler.stats()["pulses"], time.monotonic() - t0)
+                print(
+                    f">>> {name:<11} {'adaptive' if adaptive else 'fixed':<8} "
+                    f"calls={report['calls']:<4} tokens={report['tokens']:<6} "
+                    f"calls/1k tokens={report['calls_per_1k_tokens']:6.2f} "
+                    f"mean pulse={report['mean_pulse_tokens']:6.1f} "
+                    f"beta={report['beta']:<3} {report['wall_s']:.2f}s errors={errors}"
+                )
+    finally:
+        handle.stop()
@@ -0,0 +1,216 @@
+"""
+gyroscope_ratelimit.py
+
+Process-wide token-bucket rate limiter shared by every LLM wrapper.
+
+The pulse loops used to pace themselves with fixed sleeps (0.5 s per
+autopoietic pulse, 0.7 s per navigator step): pacing guesses that slowed
+every session even with plenty of quota left, and did nothing to keep many
+concurrent sessions under the account limits. Every wrapper now asks one
+shared RateLimiter before each request instead:
+
+    requests per minute (rpm)  – one unit per request,
+    tokens per minute (tpm)    – prompt estimate + max_tokens per request,
+                                 unused tokens are refunded from `usage`.
+
+Both buckets hold one minute of quota and refill continuously, so sessions
+run at full speed while there is quota. When there is none, each caller
+reserves its cost immediately (the bucket may go negative) and sleeps until
+its debt is repaid: callers are served strictly in arrival order, threads
+and asyncio tasks alike. Time spent waiting is counted as idle time per
+call site (stats()) and reported back to the caller. try_acquire() reserves
+only when no wait is needed, for requests that are optional (hedges).
+
+The shared limiter is unlimited unless configured:
+    export GYRO_RPM=500 GYRO_TPM=200000
+or
+    shared_limiter().configure(rpm=500, tpm=200000)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from gyroscope_context import estimate_tokens
+
+
+def request_tokens(prompt: str, max_tokens: int) -> int:
+    """TPM cost of one request as the API counts it: prompt + max_tokens."""
+    return estimate_tokens(prompt) + max(0, max_tokens)
+
+
+class _Bucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0     # units per second
+        self.level = self.capacity
+
+    def refill(self, elapsed: float) -> None:
+        self.level = min(self.capacity, self.level + elapsed * self.rate)
+
+    def take(self, units: float) -> float:
+        """Debit units (capped at capacity); seconds until the level is >= 0 again."""
+        self.level -= min(units, self.capacity)
+        return -self.level / self.rate if self.level < 0 else 0.0
+
+    def give(self, units: float) -> None:
+        self.level = min(self.capacity, self.level + units)
+
+
+class RateLimiter:
+    """
+    - rpm: requests per minute (None = unlimited),
+    - tpm: tokens per minute (None = unlimited).
+    """
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {
+            "requests": 0,
+            "tokens": 0,
+            "refunded_tokens": 0,
+            "declined": 0,
+            "waited": 0,
+            "idle_s": 0.0,
+            "max_wait_s": 0.0,
+        }
+        self._site_idle: Dict[str, float] = defaultdict(float)
+        self.configure(rpm, tpm)
+
+    def configure(self, rpm: Optional[float] = None, tpm: Optional[float] = None) -> None:
+        """(Re)set the limits; buckets start full."""
+        if (rpm is not None and rpm <= 0) or (tpm is not None and tpm <= 0):
+            raise ValueError("rpm / tpm must be positive (or None for unlimited)")
+        with self._lock:
+            self.rpm, self.tpm = rpm, tpm
+            self._requests = _Bucket(rpm) if rpm else None
+            self._tokens = _Bucket(tpm) if tpm else None
+            self._updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self._requests is not None or self._tokens is not None
+
+    # ---------- RESERVE ----------
+
+    def _refill_locked(self) -> None:
+        now = time.monotonic()
+        elapsed, self._updated = now - self._updated, now
+        if self._requests is not None:
+            self._requests.refill(elapsed)
+        if self._tokens is not None:
+            self._tokens.refill(elapsed)
+
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["tokens"] += tokens
+            self._refill_locked()
+            delay = 0.0
+            if self._requests is not None:
+                delay = max(delay, self._requests.take(1))
+            if self._tokens is not None:
+                delay = max(delay, self._tokens.take(tokens))
+            return delay
+
+    def _cancel(self, tokens: int) -> None:
+        """Give back a reservation whose caller gave up waiting."""
+        with self._lock:
+            if self._requests is not None:
+                self._requests.give(1)
+            if self._tokens is not None:
+                self._tokens.give(tokens)
+
+    def _account(self, site: Optional[str], waited: float) -> None:
+        if waited <= 0:
+            return
+        with self._lock:
+            self._stats["waited"] += 1
+            self._stats["idle_s"] += waited
+            self._stats["max_wait_s"] = max(self._stats["max_wait_s"], waited)
+            self._site_idle[site or "default"] += waited
+
+    def acquire(self, tokens: int = 0, site: Optional[str] = None) -> float:
+        """Block until the request may be sent; returns seconds waited."""
+        if not self.enabled:
+            return 0.0
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        self._account(site, delay)
+        return delay
+
+    async def aacquire(self, tokens: int = 0, site: Optional[str] = None) -> float:
+        """acquire() for asyncio callers (the event loop keeps running)."""
+        if not self.enabled:
+            return 0.0
+        delay = self._reserve(tokens)
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self._cancel(tokens)
+                raise
+        self._account(site, delay)
+        return delay
+
+    def try_acquire(self, tokens: int = 0, site: Optional[str] = None) -> bool:
+        """
+        Reserve only if the request may be sent right now (e.g. an optional
+        hedge); False, with the buckets untouched, if it would have to wait.
+        """
+        if not self.enabled:
+            return True
+        with self._lock:
+            self._refill_locked()
+            if (self._requests is not None and self._requests.level < 1) or (
+                self._tokens is not None and self._tokens.level < min(tokens, self._tokens.capacity)
+            ):
+                self._stats["declined"] += 1
+                return False
+            self._stats["requests"] += 1
+            self._stats["tokens"] += tokens
+            if self._requests is not None:
+                self._requests.take(1)
+            if self._tokens is not None:
+                self._tokens.take(tokens)
+            return True
+
+    def settle(self, reserved: int, used: Optional[int]) -> None:
+        """Refund tokens reserved but not used (usage known after the call)."""
+        if used is None or used >= reserved or self._tokens is None:
+            return
+        with self._lock:
+            self._tokens.give(reserved - used)
+            self._stats["refunded_tokens"] += reserved - used
+
+    # ---------- METRICS ----------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            report = dict(self._stats)
+            report["idle_s_by_site"] = dict(self._site_idle)
+            report["rpm"], report["tpm"] = self.rpm, self.tpm
+        return report
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0.0 if isinstance(self._stats[key], float) else 0
+            self._site_idle.clear()
+
+
+def _env_limit(name: str) -> Optional[float]:
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+_SHARED = RateLimiter(rpm=_env_limit("GYRO_RPM"), tpm=_env_limit("GYRO_TPM"))
+
+
+def shared_limiter() -> RateLimiter:
+    """The process-wide limiter every wrapper uses unless given its own."""
+    return _SHARED
@@ -0,0 +1,421 @@
+"""
+gyroscope_resilience.py
+
+Tail-latency control for LLM calls: per-call deadlines, classified retries
+with exponential backoff + full jitter, and optional hedged requests.
+
+A single slow or hung upstream call used to stall a whole architect session.
+ResilientCaller wraps one request function and, per call site
+("critique", "step", ...), applies a CallPolicy:
+
+    attempt = primary request
+              (+ hedge: an identical request fired after the site's observed
+                p95 latency if the primary has not answered; first wins)
+    retry   = only for transient errors (timeouts, connection errors, 429,
+              5xx), sleeping uniform(0, min(cap, base * 2**n)) in between
+
+The request function receives the per-attempt timeout in seconds and should
+pass it on to the SDK call (`timeout=`), so a hung socket is cut off.
+
+An optional `admit(blocking)` hook runs before every request that is sent
+(primary, hedge, retry), e.g. to take rate-limit quota. For a primary
+request it may block (admit(True)); the attempt's deadline starts only
+after it returns, so waiting for quota never reads as a slow upstream. A
+hedge asks admit(False) and is skipped when that returns False.
+
+Run a self-check against a flaky in-process upstream:
+    python gyroscope_resilience.py
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import openai
+
+
+T = TypeVar("T")
+
+Admit = Callable[[bool], bool]
+AsyncAdmit = Callable[[bool], Awaitable[bool]]
+
+
+@dataclass
+class CallPolicy:
+    """
+    - timeout_s:            deadline for one attempt,
+    - deadline_s:           overall deadline incl. retries (None = unbounded),
+    - max_retries:          extra attempts after the first one,
+    - backoff_base_s/cap_s: exponential backoff with full jitter,
+    - hedge:                fire a duplicate request when the primary is slow,
+    - hedge_quantile:       latency quantile used as hedge delay,
+    - hedge_initial_delay_s: hedge delay until enough samples are collected,
+    - hedge_min_delay_s:    never hedge sooner than this.
+    """
+
+    timeout_s: float = 60.0
+    deadline_s: Optional[float] = None
+    max_retries: int = 2
+    backoff_base_s: float = 0.5
+    backoff_cap_s: float = 8.0
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_initial_delay_s: float = 3.0
+    hedge_min_delay_s: float = 0.3
+
+
+# Critic-style calls are short: tight deadlines, hedged.
+# Step execution is long and expensive: generous deadline, no hedging.
+DEFAULT_CALL_POLICIES: Dict[str, CallPolicy] = {
+    "plan": CallPolicy(timeout_s=30.0, max_retries=2, hedge=True),
+    "critique": CallPolicy(timeout_s=20.0, max_retries=3, hedge=True),
+    "refine": CallPolicy(timeout_s=30.0, max_retries=2, hedge=True),
+    "optimize": CallPolicy(timeout_s=30.0, max_retries=2, hedge=True),
+    "reflect": CallPolicy(timeout_s=10.0, max_retries=3, hedge=True, hedge_initial_delay_s=1.5),
+    "summary": CallPolicy(timeout_s=30.0, max_retries=2, hedge=True),
+    "embed": CallPolicy(timeout_s=10.0, max_retries=2, hedge=True, hedge_initial_delay_s=1.0),
+    "step": CallPolicy(timeout_s=120.0, max_retries=1),
+    "continue": CallPolicy(timeout_s=120.0, max_retries=1),
+}
+
+FALLBACK_CALL_POLICY = CallPolicy()
+
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Transient failures worth another attempt; 4xx client errors are not."""
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError)):
+        return True
+    if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in _RETRYABLE_STATUS or exc.status_code >= 500
+    return False
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LatencyTracker:
+    """Sliding window of successful latencies per call site."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, site: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(site, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, site: str, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(site, ()))
+        if len(samples) < self.min_samples:
+            return None
+        idx = min(len(samples) - 1, int(q * len(samples)))
+        return samples[idx]
+
+
+class ResilientCaller:
+    """
+    Applies CallPolicy per call site around a request function.
+    One instance can be shared by many clients / sessions.
+    """
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, CallPolicy]] = None,
+        seed: Optional[int] = None,
+        max_workers: int = 32,
+    ):
+        self.policies = dict(DEFAULT_CALL_POLICIES)
+        if policies:
+            self.policies.update(policies)
+        self.latency = LatencyTracker()
+        self._rng = random.Random(seed)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    # ---------- POLICY & METRICS ----------
+
+    def policy_for(self, site: Optional[str]) -> CallPolicy:
+        return self.policies.get(site or "", FALLBACK_CALL_POLICY)
+
+    def _bump(self, site: str, field: str) -> None:
+        with self._lock:
+            counters = self._stats.setdefault(
+                site,
+                {"calls": 0, "retries": 0, "timeouts": 0, "failures": 0,
+                 "hedges_fired": 0, "hedges_skipped": 0, "hedge_wins": 0},
+            )
+            counters[field] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            report = {site: dict(c) for site, c in self._stats.items()}
+        for site, counters in report.items():
+            counters["p50_s"] = self.latency.quantile(site, 0.5)
+            counters["p95_s"] = self.latency.quantile(site, 0.95)
+        return report
+
+    def _hedge_delay(self, site: str, policy: CallPolicy) -> Optional[float]:
+        if not policy.hedge:
+            return None
+        observed = self.latency.quantile(site, policy.hedge_quantile)
+        delay = policy.hedge_initial_delay_s if observed is None else observed
+        delay = max(policy.hedge_min_delay_s, delay)
+        return delay if delay < policy.timeout_s else None
+
+    def _backoff(self, attempt: int, policy: CallPolicy, exc: BaseException) -> float:
+        ceiling = min(policy.backoff_cap_s, policy.backoff_base_s * (2 ** attempt))
+        delay = self._rng.uniform(0.0, ceiling)
+        hinted = _retry_after(exc)
+        if hinted is not None:
+            delay = max(delay, min(hinted, policy.backoff_cap_s))
+        return delay
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="gyro-hedge",
+                )
+            return self._pool
+
+    # ---------- SYNC ----------
+
+    def _attempt(
+        self,
+        site: str,
+        fn: Callable[[float], T],
+        policy: CallPolicy,
+        timeout: float,
+        admit: Optional[Admit] = None,
+    ) -> T:
+        if admit is not None:
+            admit(True)
+        t0 = time.monotonic()
+        delay = self._hedge_delay(site, policy)
+        if delay is None:
+            result = fn(timeout)
+            self.latency.record(site, time.monotonic() - t0)
+            return result
+
+        pool = self._get_pool()
+        primary = pool.submit(fn, timeout)
+        pending = {primary}
+        done, _ = wait(pending, timeout=delay)
+        if not done:
+            if admit is None or admit(False):
+                self._bump(site, "hedges_fired")
+                pending.add(pool.submit(fn, timeout))
+            else:
+                self._bump(site, "hedges_skipped")
+
+        last_exc: Optional[BaseException] = None
+        while pending:
+            remaining = timeout - (time.monotonic() - t0)
+            done, pending = wait(pending, timeout=max(remaining, 0.0), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for fut in done:
+                exc = fut.exception()
+                if exc is None:
+                    if fut is not primary:
+                        self._bump(site, "hedge_wins")
+                    self.latency.record(site, time.monotonic() - t0)
+                    return fut.result()
+                last_exc = exc
+        # losers keep running in the pool until their own SDK timeout fires
+        if last_exc is not None and not pending:
+            raise last_exc
+        raise TimeoutError(f"[{site}] no response within {timeout:.1f}s")
+
+    def call(
+        self,
+        site: Optional[str],
+        fn: Callable[[float], T],
+        hedge: Optional[bool] = None,
+        admit: Optional[Admit] = None,
+    ) -> T:
+        """
+        Run fn(timeout_s) under the site's policy (sync).
+        hedge=False disables hedging for this call (e.g. streaming requests);
+        admit runs before every request sent (see module docstring).
+        """
+        site = site or "default"
+        policy = self.policy_for(site)
+        if hedge is False and policy.hedge:
+            policy = CallPolicy(**{**policy.__dict__, "hedge": False})
+        started = time.monotonic()
+        self._bump(site, "calls")
+
+        attempt = 0
+        while True:
+            timeout = policy.timeout_s
+            if policy.deadline_s is not None:
+                timeout = min(timeout, policy.deadline_s - (time.monotonic() - started))
+            try:
+                return self._attempt(site, fn, policy, timeout, admit)
+            except Exception as exc:
+                if isinstance(exc, (TimeoutError, openai.APITimeoutError)):
+                    self._bump(site, "timeouts")
+                delay = self._backoff(attempt, policy, exc)
+                out_of_time = (
+                    policy.deadline_s is not None
+                    and time.monotonic() - started + delay >= policy.deadline_s
+                )
+                if attempt >= policy.max_retries or not is_retryable(exc) or out_of_time:
+                    self._bump(site, "failures")
+                    raise
+                attempt += 1
+                self._bump(site, "retries")
+                time.sleep(delay)
+
+    # ---------- ASYNC ----------
+
+    async def _aattempt(
+        self,
+        site: str,
+        fn: Callable[[float], Awaitable[T]],
+        policy: CallPolicy,
+        timeout: float,
+        admit: Optional[AsyncAdmit] = None,
+    ) -> T:
+        if admit is not None:
+            await admit(True)
+        t0 = time.monotonic()
+        delay = self._hedge_delay(site, policy)
+        if delay is None:
+            result = await asyncio.wait_for(fn(timeout), timeout)
+            self.latency.record(site, time.monotonic() - t0)
+            return result
+
+        primary = asyncio.ensure_future(fn(timeout))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                if admit is None or await admit(False):
+                    self._bump(site, "hedges_fired")
+                    pending.add(asyncio.ensure_future(fn(timeout)))
+                else:
+                    self._bump(site, "hedges_skipped")
+
+            last_exc: Optional[BaseException] = None
+            while pending:
+                remaining = timeout - (time.monotonic() - t0)
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(remaining, 0.0), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in done:
+                    exc = task.exception()
+                    if exc is None:
+                        if task is not primary:
+                            self._bump(site, "hedge_wins")
+                        self.latency.record(site, time.monotonic() - t0)
+                        return task.result()
+                    last_exc = exc
+            if last_exc is not None and not pending:
+                raise last_exc
+            raise TimeoutError(f"[{site}] no response within {timeout:.1f}s")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def acall(
+        self,
+        site: Optional[str],
+        fn: Callable[[float], Awaitable[T]],
+        hedge: Optional[bool] = None,
+        admit: Optional[AsyncAdmit] = None,
+    ) -> T:
+        """Async twin of call(); losing hedges are cancelled."""
+        site = site or "default"
+        policy = self.policy_for(site)
+        if hedge is False and policy.hedge:
+            policy = CallPolicy(**{**policy.__dict__, "hedge": False})
+        started = time.monotonic()
+        self._bump(site, "calls")
+
+        attempt = 0
+        while True:
+            timeout = policy.timeout_s
+            if policy.deadline_s is not None:
+                timeout = min(timeout, policy.deadline_s - (time.monotonic() - started))
+            try:
+                return await self._aattempt(site, fn, policy, timeout, admit)
+            except Exception as exc:
+                if isinstance(exc, (TimeoutError, asyncio.TimeoutError, openai.APITimeoutError)):
+                    self._bump(site, "timeouts")
+                delay = self._backoff(attempt, policy, exc)
+                out_of_time = (
+                    policy.deadline_s is not None
+                    and time.monotonic() - started + delay >= policy.deadline_s
+                )
+                if attempt >= policy.max_retries or not is_retryable(exc) or out_of_time:
+                    self._bump(site, "failures")
+                    raise
+                attempt += 1
+                self._bump(site, "retries")
+                await asyncio.sleep(delay)
+
+
+# ---------------------------------------------------------------------------
+# Self-check against a flaky in-process upstream
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    rng = random.Random(7)
+
+    def flaky_upstream(timeout: float) -> str:
+        roll = rng.random()
+        if roll < 0.10:
+            raise openai.APIConnectionError(request=None)
+        latency = 2.5 if roll > 0.90 else rng.uniform(0.02, 0.08)   # 10% spikes
+        if latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("upstream hung")
+        time.sleep(latency)
+        return "OK"
+
+    caller = ResilientCaller(
+        policies={
+            "critique": CallPolicy(
+                timeout_s=1.0, max_retries=3, backoff_base_s=0.05,
+                hedge=True, hedge_initial_delay_s=0.15,
+            ),
+        },
+        seed=1,
+    )
+    t0 = time.monotonic()
+    latencies = []
+    for _ in range(60):
+        c0 = time.monotonic()
+        caller.call("critique", flaky_upstream)
+        latencies.append(time.monotonic() - c0)
+    latencies.sort()
+    print(f"60 calls in {time.monotonic() - t0:.2f}s, "
+          f"p50={latencies[30]:.3f}s p95={latencies[56]:.3f}s max={latencies[-1]:.3f}s")
+    print(caller.stats())
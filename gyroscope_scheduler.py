@@ -0,0 +1,418 @@
+"""
+gyroscope_scheduler.py
+
+Many supervised pulse sessions (CoherenceController, AutopoieticGyroscope)
+on one event loop.
+
+Each controller used to own its session as a blocking `for` loop, so N
+concurrent sessions meant N threads. The controllers now describe a session
+as a generator that yields what it needs next and receives the answer:
+
+    PulseRequest  → PulseResult   (one completion call, optionally streamed)
+    Pause         → None          (inter-pulse pause, no slot held)
+
+and returns its final text. The same generator is driven
+
+    synchronously:  run_session_sync(session, execute)  – the old blocking API
+    concurrently:   SessionScheduler(AsyncPulseLLM(...)).run_all(sessions)
+
+Every completion call first takes its request / token cost from the
+process-wide RateLimiter (gyroscope_ratelimit); time spent waiting for quota
+comes back as PulseResult.wait_s.
+
+SessionScheduler interleaves sessions at pulse granularity over one shared
+async client. At most max_concurrency pulses are in flight; slots are handed
+out strictly first-come-first-served and every session re-queues at the back
+after each pulse, so sessions advance round-robin and none can starve the
+others. Controller state (temperature, logit_bias, history) lives on the
+controller instance, so each session needs its own instance; sync clients /
+LiveLLM wrappers can be shared.
+
+Run a self-check against the offline fake upstream:
+    python gyroscope_scheduler.py --sessions 200 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Generator, Iterable, List, Optional, Tuple, Union
+
+from openai import AsyncOpenAI, OpenAI
+
+from gyroscope_context import estimate_tokens
+from gyroscope_ratelimit import RateLimiter, request_tokens, shared_limiter
+
+
+# Streaming hook: called per generated token with its top_logprobs dict;
+# return True to cut the pulse short.
+TokenCallback = Callable[[str, Optional[Dict[str, float]]], bool]
+
+
+@dataclass
+class PulseRequest:
+    prompt: str
+    max_tokens: int
+    temperature: float
+    logit_bias: Optional[Dict[str, float]] = None
+    logprobs: Optional[int] = 5
+    on_token: Optional[TokenCallback] = None   # set → streamed pulse
+
+
+@dataclass
+class PulseResult:
+    text: str
+    tokens: List[str]
+    top_logprobs_seq: List[Dict[str, float]]
+    aborted: bool = False   # on_token asked to stop
+    latency_s: float = 0.0  # request sent → last token received
+    prompt_tokens: Optional[int] = None  # from usage (non-streamed calls)
+    wait_s: float = 0.0     # waiting for rate-limit quota before the request
+
+
+@dataclass
+class Pause:
+    seconds: float
+
+
+PulseSession = Generator[Union[PulseRequest, Pause], Optional[PulseResult], Any]
+
+
+# ======== COMPLETION CALLS (sync + async) ========
+
+def _completion_kwargs(model: str, request: PulseRequest) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {
+        "model": model,
+        "prompt": request.prompt,
+        "max_tokens": request.max_tokens,
+        "temperature": request.temperature,
+        "top_p": 1.0,
+        "n": 1,
+        "stream": request.on_token is not None,
+    }
+    if request.logprobs is not None:
+        kwargs["logprobs"] = request.logprobs
+    if request.logit_bias:
+        kwargs["logit_bias"] = {str(k): v for k, v in request.logit_bias.items()}
+    return kwargs
+
+
+def _result_from_response(response: Any, started: float) -> PulseResult:
+    choice = response.choices[0]
+    lp = choice.logprobs
+    usage = getattr(response, "usage", None)
+    return PulseResult(
+        choice.text or "",
+        (lp.tokens or []) if lp is not None else [],
+        (lp.top_logprobs or []) if lp is not None else [],
+        latency_s=time.monotonic() - started,
+        prompt_tokens=getattr(usage, "prompt_tokens", None),
+    )
+
+
+def _settle(limiter: RateLimiter, reserved: int, request: PulseRequest, result: PulseResult) -> PulseResult:
+    """Refund unused max_tokens; streamed pulses have no usage, so estimate the prompt."""
+    prompt_tokens = result.prompt_tokens or estimate_tokens(request.prompt)
+    limiter.settle(reserved, prompt_tokens + len(result.tokens))
+    return result
+
+
+def _event_tokens(event: Any) -> List[Tuple[str, Optional[Dict[str, float]]]]:
+    """(token, top_logprobs) pairs carried by one streamed completion chunk."""
+    if not event.choices:
+        return []
+    choice = event.choices[0]
+    lp = choice.logprobs
+    if lp is not None and lp.tokens:
+        tops = lp.top_logprobs or []
+        return [(tok, tops[i] if i < len(tops) else None) for i, tok in enumerate(lp.tokens)]
+    if choice.text:
+        return [(choice.text, None)]
+    return []
+
+
+class _StreamCollector:
+    def __init__(self, on_token: TokenCallback, started: float):
+        self.on_token = on_token
+        self.started = started
+        self.tokens: List[str] = []
+        self.tops: List[Dict[str, float]] = []
+
+    def feed(self, event: Any) -> bool:
+        """True once on_token asks to stop."""
+        for token, top in _event_tokens(event):
+            self.tokens.append(token)
+            self.tops.append(top or {})
+            if self.on_token(token, top):
+                return True
+        return False
+
+    def result(self, aborted: bool) -> PulseResult:
+        return PulseResult(
+            "".join(self.tokens), self.tokens, self.tops, aborted,
+            latency_s=time.monotonic() - self.started,
+        )
+
+
+def run_pulse(
+    client: OpenAI,
+    model: str,
+    request: PulseRequest,
+    limiter: Optional[RateLimiter] = None,
+) -> PulseResult:
+    """One blocking completion call (streamed when request.on_token is set)."""
+    limiter = limiter if limiter is not None else shared_limiter()
+    reserved = request_tokens(request.prompt, request.max_tokens)
+    waited = limiter.acquire(reserved, site="pulse")
+    result = _blocking_pulse(client, model, request)
+    result.wait_s = waited
+    return _settle(limiter, reserved, request, result)
+
+
+def _blocking_pulse(client: OpenAI, model: str, request: PulseRequest) -> PulseResult:
+    started = time.monotonic()
+    response = client.completions.create(**_completion_kwargs(model, request))
+    if request.on_token is None:
+        return _result_from_response(response, started)
+
+    collector = _StreamCollector(request.on_token, started)
+    try:
+        for event in response:
+            if collector.feed(event):
+                return collector.result(aborted=True)
+    finally:
+        response.close()
+    return collector.result(aborted=False)
+
+
+class AsyncPulseLLM:
+    """Shared async completion client for SessionScheduler."""
+
+    def __init__(
+        self,
+        model: str = "gpt-3.5-turbo-instruct",
+        base_url: Optional[str] = None,
+        client: Optional[AsyncOpenAI] = None,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        self.client = client or AsyncOpenAI(base_url=base_url)
+        self.model = model
+        self.limiter = limiter if limiter is not None else shared_limiter()
+
+    async def execute(self, request: PulseRequest) -> PulseResult:
+        reserved = request_tokens(request.prompt, request.max_tokens)
+        waited = await self.limiter.aacquire(reserved, site="pulse")
+        result = await self._pulse(request)
+        result.wait_s = waited
+        return _settle(self.limiter, reserved, request, result)
+
+    async def _pulse(self, request: PulseRequest) -> PulseResult:
+        started = time.monotonic()
+        response = await self.client.completions.create(**_completion_kwargs(self.model, request))
+        if request.on_token is None:
+            return _result_from_response(response, started)
+
+        collector = _StreamCollector(request.on_token, started)
+        try:
+            async for event in response:
+                if collector.feed(event):
+                    return collector.result(aborted=True)
+        finally:
+            await response.close()
+        return collector.result(aborted=False)
+
+
+# ======== DRIVERS ========
+
+def run_session_sync(session: PulseSession, execute: Callable[[PulseRequest], PulseResult]) -> Any:
+    """Drive a session generator with blocking calls; returns its result."""
+    result: Optional[PulseResult] = None
+    while True:
+        try:
+            request = session.send(result)
+        except StopIteration as stop:
+            return stop.value
+        if isinstance(request, Pause):
+            time.sleep(request.seconds)
+            result = None
+        else:
+            result = execute(request)
+
+
+class FairSlots:
+    """
+    Concurrency cap with strict FIFO hand-off: a released slot goes to the
+    longest-waiting acquirer, never to a newcomer that happens to run first.
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        self.limit = limit
+        self._free = limit
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def in_use(self) -> int:
+        return self.limit - self._free
+
+    async def acquire(self) -> None:
+        if self._free > 0 and not self._waiters:
+            self._free -= 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # slot was handed over just before the cancel
+            elif fut in self._waiters:
+                self._waiters.remove(fut)
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)  # slot passes straight to the waiter
+                return
+        self._free += 1
+
+
+class SessionScheduler:
+    """
+    Runs many PulseSession generators concurrently (see module docstring).
+
+    - llm:             shared AsyncPulseLLM executing every PulseRequest,
+    - max_concurrency: global cap on in-flight pulses across all sessions.
+    """
+
+    def __init__(self, llm: AsyncPulseLLM, max_concurrency: int = 32):
+        self.llm = llm
+        self.slots = FairSlots(max_concurrency)
+        self._stats = {
+            "sessions": 0,
+            "completed": 0,
+            "failed": 0,
+            "pulses": 0,
+            "slot_wait_s": 0.0,
+            "max_slot_wait_s": 0.0,
+            "max_waiting": 0,
+        }
+
+    async def run_session(self, session: PulseSession) -> Any:
+        self._stats["sessions"] += 1
+        result: Optional[PulseResult] = None
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    request = session.send(result)
+                except StopIteration as stop:
+                    self._stats["completed"] += 1
+                    return stop.value
+
+                if isinstance(request, Pause):
+                    await asyncio.sleep(request.seconds)
+                    result = None
+                    continue
+
+                queued_at = loop.time()
+                self._stats["max_waiting"] = max(self._stats["max_waiting"], self.slots.waiting + 1)
+                await self.slots.acquire()
+                waited = loop.time() - queued_at
+                self._stats["slot_wait_s"] += waited
+                self._stats["max_slot_wait_s"] = max(self._stats["max_slot_wait_s"], waited)
+                try:
+                    result = await self.llm.execute(request)
+                finally:
+                    self.slots.release()
+                self._stats["pulses"] += 1
+        except BaseException:
+            self._stats["failed"] += 1
+            session.close()
+            raise
+
+    async def run_all(self, sessions: Iterable[PulseSession], return_exceptions: bool = True) -> List[Any]:
+        """Run sessions to completion; results in submission order."""
+        tasks = [asyncio.create_task(self.run_session(s)) for s in sessions]
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+
+    def stats(self) -> Dict[str, Any]:
+        report = dict(self._stats)
+        pulses = report["pulses"]
+        report["mean_slot_wait_s"] = report["slot_wait_s"] / pulses if pulses else 0.0
+        report["in_flight"] = self.slots.in_use
+        return report
+
+
+# ======== SELF-CHECK ========
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run many gyroscope sessions against the fake upstream.")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--pulses", type=int, default=4)
+    parser.add_argument("--controller", choices=("live", "autopoietic"), default="live")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import os
+
+    from gyroscope_fake_upstream import FakeUpstreamConfig, serve_in_thread
+
+    args = _parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+    handle = serve_in_thread(FakeUpstreamConfig(seed=11, median_ms=80, per_token_ms=2, fixation_prob=0.4))
+
+    if args.controller == "live":
+        from gyroscope_live import CoherenceController
+
+        shared = OpenAI(base_url=handle.base_url)
+        sessions = [
+            CoherenceController(client=shared).session(
+                f"Session {i}: describe a city at night.\n", max_pulses=args.pulses,
+                echo_intermediate=False,
+            )
+            for i in range(args.sessions)
+        ]
+    else:
+        from gyroscope_autopoietic import AutopoieticGyroscope, LiveLLM
+
+        shared_llm = LiveLLM(base_url=handle.base_url)
+        sessions = [
+            AutopoieticGyroscope(shared_llm).session(
+                f"Session {i}: describe a city at night.\n", pulses=args.pulses,
+            )
+            for i in range(args.sessions)
+        ]
+
+    # The controllers import this file as gyroscope_scheduler; use that copy so
+    # isinstance(request, Pause) sees the same class (not __main__.Pause).
+    import gyroscope_scheduler
+
+    scheduler = gyroscope_scheduler.SessionScheduler(
+        gyroscope_scheduler.AsyncPulseLLM(base_url=handle.base_url),
+        max_concurrency=args.concurrency,
+    )
+    t0 = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):  # per-session console logs
+        results = asyncio.run(scheduler.run_all(sessions))
+    wall = time.monotonic() - t0
+    handle.stop()
+
+    errors = [r for r in results if isinstance(r, BaseException)]
+    print(f">>> SCHEDULER: {args.sessions} sessions, {wall:.2f}s wall, {len(errors)} errors")
+    for key, value in scheduler.stats().items():
+        print(f"    {key}: {value:.3f}" if isinstance(value, float) else f"    {key}: {value}")
+    if shared_limiter().enabled:  # GYRO_RPM / GYRO_TPM
+        print(f"    rate_limit: {shared_limiter().stats()}")
@@ -0,0 +1,181 @@
+"""
+gyroscope_sessions.py
+
+Checkpoint store for resumable MetaArchitect sessions.
+
+run_meta_session(..., session_id=...) writes a checkpoint after planning
+(the final blueprint) and after every accepted step output. A session
+started again with the same ID skips planning and critique entirely and
+re-executes only the steps that never completed:
+
+    {
+        "session_id": "3f2a...",
+        "prompt": "...",
+        "status": "planned" | "running" | "complete",
+        "blueprint": ["1. ...", "2. ..."],
+        "steps": [{"step": "1. ...", "chunk": "..."}, ...],
+        "created": 1700000000.0,
+        "updated": 1700000123.0
+    }
+
+One JSON file per session, replaced atomically, so a crash mid-write never
+leaves a corrupt checkpoint behind.
+
+Checkpoints expire: an unfinished one `ttl_s` after its last update, a
+complete one `complete_ttl_s` after completion (long enough for a client to
+reconnect and replay it). Expired files are treated as absent and removed
+by prune(), which save_blueprint runs at most every `prune_interval_s`.
+The store does blocking file I/O; asyncio callers run it in a worker
+thread (asyncio.to_thread).
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_SESSION_DIR = Path(__file__).resolve().parent / ".gyro_cache" / "sessions"
+
+_SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+
+class SessionStore:
+    """
+    Local on-disk store of session checkpoints, keyed by session ID.
+    Session IDs may come from request headers, so they are validated
+    before being turned into file names.
+    """
+
+    def __init__(
+        self,
+        root: Path = DEFAULT_SESSION_DIR,
+        ttl_s: Optional[float] = 7 * 24 * 3600.0,
+        complete_ttl_s: Optional[float] = 3600.0,
+        prune_interval_s: float = 600.0,
+    ):
+        self.root = Path(root)
+        self.ttl_s = ttl_s
+        self.complete_ttl_s = complete_ttl_s
+        self.prune_interval_s = prune_interval_s
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+    # ---------- FILES ----------
+
+    def _path(self, session_id: str) -> Path:
+        if not _SESSION_ID_RE.match(session_id or ""):
+            raise ValueError(f"Invalid session id: {session_id!r}")
+        return self.root / f"{session_id}.json"
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        path = self._path(record["session_id"])
+        record["updated"] = time.time()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # unique per writer: other stores may share the directory
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False, indent=2)
+            tmp.replace(path)
+        except Exception as e:
+            print(f"[SessionStore] Failed to save checkpoint: {e}")
+
+    def _read(self, path: Path) -> Optional[Dict[str, Any]]:
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    # ---------- EXPIRY ----------
+
+    def _expired(self, record: Dict[str, Any], now: float) -> bool:
+        ttl = self.complete_ttl_s if record.get("status") == "complete" else self.ttl_s
+        return ttl is not None and now - record.get("updated", 0.0) > ttl
+
+    def prune(self) -> int:
+        """Delete expired checkpoints; returns how many were removed."""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            self._last_prune = now
+            if not self.root.exists():
+                return 0
+            for path in self.root.glob("*.json"):
+                record = self._read(path)
+                if record is None or self._expired(record, now):
+                    path.unlink(missing_ok=True)
+                    removed += 1
+        return removed
+
+    # ---------- PUBLIC API ----------
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """The checkpoint of session_id, or None if absent or expired."""
+        path = self._path(session_id)
+        record = self._read(path)
+        if record is not None and self._expired(record, time.time()):
+            path.unlink(missing_ok=True)
+            return None
+        return record
+
+    def save_blueprint(self, session_id: str, prompt: str, blueprint: List[str]) -> None:
+        """Start (or restart) a checkpoint with the final blueprint."""
+        if time.time() - self._last_prune >= self.prune_interval_s:
+            self.prune()
+        with self._lock:
+            now = time.time()
+            self._write({
+                "session_id": session_id,
+                "prompt": prompt,
+                "status": "planned",
+                "blueprint": list(blueprint),
+                "steps": [],
+                "created": now,
+            })
+
+    def save_step(self, session_id: str, index: int, step: str, chunk: str) -> None:
+        """Record the accepted output of step `index` (0-based)."""
+        with self._lock:
+            record = self.load(session_id)
+            if record is None:
+                return
+            entry = {"step": step, "chunk": chunk}
+            if index < len(record["steps"]) and record["steps"][index] == entry:
+                return  # replayed from this very checkpoint
+            steps = record["steps"][:index]
+            if len(steps) < index:
+                # a gap means earlier steps were never checkpointed – keep the prefix only
+                return
+            steps.append(entry)
+            record["steps"] = steps
+            record["status"] = "running"
+            self._write(record)
+
+    def mark_complete(self, session_id: str) -> None:
+        with self._lock:
+            record = self.load(session_id)
+            if record is None:
+                return
+            record["status"] = "complete"
+            self._write(record)
+
+    @staticmethod
+    def completed_steps(record: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """(step, chunk) pairs of a loaded checkpoint, in plan order."""
+        return [(s["step"], s["chunk"]) for s in record.get("steps", [])]
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._path(session_id).unlink(missing_ok=True)
@@ -0,0 +1,426 @@
+"""
+gyroscope_simulator.py
+
+Offline closed-loop simulator for tuning the Alpha / Beta / Delta loops of
+CoherenceController ("live") and AutopoieticGyroscope ("autopoietic").
+
+Tuning kp, target_risk and ngram_fixation_threshold (fixation_thresh) used
+to take live sessions of minutes each. Here the LLM is replaced by a
+synthetic plant whose signals respond to the actuators the way the real
+model does:
+
+    entropy     rises with temperature (saturating), collapses inside a loop
+    pmon_risk   0.7 * entropy + 0.3 * noisy max-prob variance, which also
+                rises with temperature
+    loop        entered with prob fixation_prob * (1 - T/1.5), less often
+                once logit_bias is set; left spontaneously (∝ T) or on a
+                pivot injection (Delta) with prob pivot_success
+    rep2        baseline outside a loop, high inside it, cut by logit_bias
+
+and the controllers' own control laws run against it pulse by pulse,
+vectorized over a batch: every row is one session, every sweep setting a
+block of rows, so one numpy pass simulates thousands of sessions. The laws
+mirror CoherenceController._update_temperature_from_risk /
+_apply_fixation_controls and AutopoieticGyroscope._calculate_metrics /
+_actuate; keep them in step when those change.
+
+Outside a loop only the pmon term moves with temperature, so a target is
+reachable only inside the open-loop risk range of the plant (printed by
+the CLI, see open_loop_risk()). The default plant puts the autopoietic
+default target inside it; the live controller weighs repetition at 0.8, so
+its default target 0.5 lies above any loop-free risk and is reached only
+while looping. base_rep and variance_mean can be swept alongside the
+controller settings (--base-rep, --variance) to move that range.
+
+Per setting the sweep reports:
+
+    settle      median pulses until temperature stays within ±0.05 of its
+                final value for good, counted only if that stable tail lasts
+                at least settle_tail pulses (horizon = never settled)
+    converged   share of sessions whose smoothed risk ends within ±tol of
+                target_risk (last quarter of the horizon)
+    risk_err    mean |risk - target_risk| over the second half
+    overshoot   mean crossing of the smoothed risk past target_risk
+    recovery    mean pulses a fixation loop lasts before it is left
+    stuck       share of sessions still looping at the end
+    loop_time   share of pulses spent in a loop
+
+Run:
+    python gyroscope_simulator.py --controller live \\
+        --kp 0.3,0.5,0.7 --target 0.2,0.3 --threshold 0.25,0.3 --sessions 2000
+"""
+
+import argparse
+import itertools
+import json
+import time
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+LIVE = "live"
+AUTOPOIETIC = "autopoietic"
+CONTROLLERS = (LIVE, AUTOPOIETIC)
+
+# Constructor defaults of the real controllers.
+DEFAULTS: Dict[str, Dict[str, float]] = {
+    LIVE: {"kp": 0.7, "target_risk": 0.5, "threshold": 0.30, "base_temperature": 0.8},
+    AUTOPOIETIC: {"kp": 0.8, "target_risk": 0.25, "threshold": 0.30, "base_temperature": 0.8},
+}
+
+# Temperature clamps of the control laws.
+T_RANGE: Dict[str, Tuple[float, float]] = {LIVE: (0.1, 1.2), AUTOPOIETIC: (0.3, 1.2)}
+
+
+# ======== SYNTHETIC LLM ========
+
+@dataclass
+class SyntheticLLM:
+    """
+    Plant parameters (see module docstring).
+
+    - entropy_floor / entropy_ceiling / entropy_scale: H(T) = floor +
+      (ceiling - floor) * (1 - exp(-T / scale)),
+    - loop_entropy:     entropy multiplier inside a loop,
+    - variance_mean / variance_gain: max-prob variance = mean + gain * T,
+    - fixation_prob:    loop entry chance per pulse at T = 0,
+    - initial_loop:     chance a session starts looping (stress prompts),
+    - escape_rate:      spontaneous exit chance per pulse, times T,
+    - pivot_success:    exit chance when a pivot is injected,
+    - bias_entry_cut / bias_rep_cut: effect of logit_bias on loop entry / rep2,
+    - base_rep, loop_rep, loop_adj: repetition levels,
+    - noise:            std of the per-pulse signal noise.
+
+    Any field may also be an array over sessions (sweep() does so for
+    base_rep / variance_mean).
+    """
+
+    entropy_floor: float = 0.05
+    entropy_ceiling: float = 0.75
+    entropy_scale: float = 0.6
+    loop_entropy: float = 0.15
+    variance_mean: float = 0.05
+    variance_gain: float = 0.4
+    fixation_prob: float = 0.25
+    initial_loop: float = 0.5
+    escape_rate: float = 0.05
+    pivot_success: float = 0.8
+    bias_entry_cut: float = 0.7
+    bias_rep_cut: float = 0.5
+    base_rep: float = 0.15
+    loop_rep: float = 0.5
+    loop_adj: float = 0.1
+    noise: float = 0.04
+
+    def mean_entropy(self, temperature: np.ndarray) -> np.ndarray:
+        span = self.entropy_ceiling - self.entropy_floor
+        return self.entropy_floor + span * (1.0 - np.exp(-temperature / self.entropy_scale))
+
+    def mean_variance(self, temperature: np.ndarray) -> np.ndarray:
+        return self.variance_mean + self.variance_gain * temperature
+
+    def entropy(self, temperature: np.ndarray, loop: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        H = self.mean_entropy(temperature)
+        H = np.where(loop, H * self.loop_entropy, H)
+        return np.clip(H + rng.normal(0.0, self.noise, H.shape), 0.0, 1.0)
+
+    def step_loop(
+        self,
+        loop: np.ndarray,
+        temperature: np.ndarray,
+        biased: np.ndarray,
+        pivot: np.ndarray,
+        rng: np.random.Generator,
+    ) -> np.ndarray:
+        """Loop state for the next pulse, given the actuators applied to it."""
+        u = rng.random((3,) + loop.shape)
+        enter_p = self.fixation_prob * np.clip(1.0 - temperature / 1.5, 0.0, 1.0)
+        enter_p = np.where(biased, enter_p * (1.0 - self.bias_entry_cut), enter_p)
+        leave = (u[0] < self.escape_rate * temperature) | (pivot & (u[1] < self.pivot_success))
+        return np.where(loop, ~leave, u[2] < enter_p)
+
+    def signals(
+        self,
+        temperature: np.ndarray,
+        loop: np.ndarray,
+        biased: np.ndarray,
+        rng: np.random.Generator,
+    ) -> Dict[str, np.ndarray]:
+        """pmon_risk / entropy / rep2 / adj_rate of one pulse per session."""
+        H = self.entropy(temperature, loop, rng)
+        V_norm = np.clip(self.mean_variance(temperature) + rng.normal(0.0, self.noise, H.shape), 0.0, 1.0)
+        pmon = np.clip(0.7 * H + 0.3 * V_norm, 0.0, 1.0)
+
+        loop_rep = np.where(biased, self.loop_rep * (1.0 - self.bias_rep_cut), self.loop_rep)
+        rep2 = np.where(loop, loop_rep, self.base_rep)
+        rep2 = np.clip(rep2 + rng.normal(0.0, self.noise, H.shape), 0.0, 1.0)
+        adj = np.where(loop, self.loop_adj, 0.0)
+        return {"entropy": H, "pmon_risk": pmon, "rep2": rep2, "adj_rate": adj}
+
+
+def _combined_risk(controller: str, pmon, rep2, adj, repetition_weight: float):
+    if controller == LIVE:
+        # CoherenceController.session: combined risk
+        return np.clip(
+            (1.0 - repetition_weight) * pmon + repetition_weight * rep2 + 0.1 * adj, 0.0, 1.0
+        )
+    # AutopoieticGyroscope._calculate_metrics
+    return 0.3 * pmon + 0.7 * rep2
+
+
+def open_loop_risk(
+    controller: str,
+    plant: Optional[SyntheticLLM] = None,
+    repetition_weight: float = 0.8,
+) -> Tuple[float, float]:
+    """Noise-free loop-free risk at the controller's lowest / highest temperature."""
+    plant = plant or SyntheticLLM()
+    T = np.array(T_RANGE[controller])
+    pmon = np.clip(0.7 * plant.mean_entropy(T) + 0.3 * plant.mean_variance(T), 0.0, 1.0)
+    risk = _combined_risk(controller, pmon, plant.base_rep, 0.0, repetition_weight)
+    return float(risk[0]), float(risk[1])
+
+
+# ======== CLOSED LOOP (BATCH) ========
+
+def simulate(
+    controller: str,
+    kp: np.ndarray,
+    target_risk: np.ndarray,
+    threshold: np.ndarray,
+    pulses: int = 40,
+    plant: Optional[SyntheticLLM] = None,
+    base_temperature: float = 0.8,
+    repetition_weight: float = 0.8,
+    seed: int = 0,
+) -> Dict[str, np.ndarray]:
+    """
+    Run one session per row of kp / target_risk / threshold (equal-length
+    arrays). Returns (pulses, sessions) arrays: risk, temperature (before
+    each pulse), loop, beta, delta.
+    """
+    if controller not in CONTROLLERS:
+        raise ValueError(f"controller must be one of {CONTROLLERS}")
+    plant = plant or SyntheticLLM()
+    rng = np.random.default_rng(seed)
+    kp, target_risk, threshold = np.broadcast_arrays(
+        np.asarray(kp, float), np.asarray(target_risk, float), np.asarray(threshold, float)
+    )
+    n = kp.shape[0]
+
+    T = np.full(n, base_temperature)
+    loop = rng.random(n) < plant.initial_loop
+    biased = np.zeros(n, dtype=bool)      # live: logit_bias on the loop tokens
+    pivot = np.zeros(n, dtype=bool)       # Delta injected before the next pulse
+
+    trace = {
+        "risk": np.empty((pulses, n)),
+        "temperature": np.empty((pulses, n)),
+        "loop": np.empty((pulses, n), dtype=bool),
+        "beta": np.empty((pulses, n), dtype=bool),
+        "delta": np.empty((pulses, n), dtype=bool),
+    }
+
+    for t in range(pulses):
+        if t:
+            loop = plant.step_loop(loop, T, biased, pivot, rng)
+        trace["temperature"][t] = T
+        trace["loop"][t] = loop
+        trace["delta"][t] = pivot
+        sig = plant.signals(T, loop, biased, rng)
+
+        risk = _combined_risk(controller, sig["pmon_risk"], sig["rep2"], sig["adj_rate"], repetition_weight)
+        if controller == LIVE:
+            # CoherenceController.session: Beta, Alpha
+            beta = sig["rep2"] >= threshold
+            biased |= beta
+            pivot = beta
+            T = np.clip(T + kp * (target_risk - risk), *T_RANGE[LIVE])
+        else:
+            # AutopoieticGyroscope: _actuate
+            T = np.clip(T - kp * (risk - target_risk), *T_RANGE[AUTOPOIETIC])
+            beta = (sig["rep2"] > threshold) & (sig["entropy"] < 0.1)
+            pivot = beta
+            T = np.where(beta, 0.8, T)
+
+        trace["risk"][t] = risk
+        trace["beta"][t] = beta
+    return trace
+
+
+# ======== METRICS ========
+
+def _ema(x: np.ndarray, alpha: float) -> np.ndarray:
+    out = np.empty_like(x)
+    out[0] = x[0]
+    for t in range(1, x.shape[0]):
+        out[t] = alpha * x[t] + (1.0 - alpha) * out[t - 1]
+    return out
+
+
+def session_metrics(
+    trace: Dict[str, np.ndarray],
+    target_risk: np.ndarray,
+    tol: float = 0.05,
+    settle_band: float = 0.05,
+    smoothing: float = 0.3,
+    settle_tail: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """Per-session metrics (arrays over sessions) from a simulate() trace."""
+    risk, temp, loop = trace["risk"], trace["temperature"], trace["loop"]
+    P = risk.shape[0]
+    smooth = _ema(risk, smoothing)
+    error = smooth - target_risk
+
+    # settle: first pulse after which T stays inside the band around its final
+    # value; the last pulse always is, so a tail shorter than settle_tail
+    # (default: a quarter of the horizon) means T was still moving
+    settle_tail = max(2, P // 4) if settle_tail is None else settle_tail
+    inside = np.abs(temp - temp[-1]) <= settle_band
+    stays = np.flip(np.logical_and.accumulate(np.flip(inside, 0), 0), 0)
+    settle = stays.argmax(0)
+    settle = np.where(P - settle >= settle_tail, settle, P)
+
+    tail = max(1, P // 4)
+    converged = np.all(np.abs(error[-tail:]) <= tol, axis=0)
+    risk_err = np.abs(risk[P // 2:] - target_risk).mean(0)
+
+    side = np.sign(error[0])
+    overshoot = np.maximum(0.0, (-side * error).max(0))
+
+    # loop episodes: pulses in loops that ended vs. still running at the end
+    prev = np.vstack([np.zeros_like(loop[:1]), loop[:-1]])
+    ended = (~loop & prev).sum(0)
+    trailing = np.where(loop[-1], np.flip(~loop, 0).argmax(0), 0)
+    trailing = np.where(loop.all(0), P, trailing)
+    recovered_pulses = loop.sum(0) - trailing
+
+    return {
+        "settle": settle,
+        "converged": converged,
+        "risk_err": risk_err,
+        "overshoot": overshoot,
+        "episodes_ended": ended,
+        "recovered_pulses": recovered_pulses,
+        "stuck": loop[-1],
+        "loop_time": loop.mean(0),
+        "beta_rate": trace["beta"].mean(0),
+    }
+
+
+# ======== SWEEP ========
+
+def sweep(
+    controller: str,
+    kps: Sequence[float],
+    targets: Sequence[float],
+    thresholds: Sequence[float],
+    sessions: int = 1000,
+    pulses: int = 40,
+    plant: Optional[SyntheticLLM] = None,
+    seed: int = 0,
+    tol: float = 0.05,
+    base_reps: Optional[Sequence[float]] = None,
+    variances: Optional[Sequence[float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    All settings in one vectorized batch; one summary dict per setting.
+    base_reps / variances (default: the plant's own) sweep the plant's
+    base_rep / variance_mean alongside the controller settings.
+    """
+    plant = plant or SyntheticLLM()
+    base_reps = base_reps or [plant.base_rep]
+    variances = variances or [plant.variance_mean]
+    grid = list(itertools.product(kps, targets, thresholds, base_reps, variances))
+    params = np.repeat(np.array(grid, dtype=float), sessions, axis=0)
+    kp, target, threshold, base_rep, variance = params.T
+    batch_plant = replace(plant, base_rep=base_rep, variance_mean=variance)
+
+    trace = simulate(controller, kp, target, threshold, pulses=pulses, plant=batch_plant, seed=seed)
+    m = session_metrics(trace, target, tol=tol)
+
+    def per_setting(values: np.ndarray) -> np.ndarray:
+        return values.reshape(len(grid), sessions)
+
+    rows = []
+    for i, (k, tr, th, br, var) in enumerate(grid):
+        ended = per_setting(m["episodes_ended"])[i].sum()
+        reach_lo, reach_hi = open_loop_risk(controller, replace(plant, base_rep=br, variance_mean=var))
+        rows.append({
+            "kp": k,
+            "target_risk": tr,
+            "threshold": th,
+            "base_rep": br,
+            "variance": var,
+            "reach_lo": reach_lo,
+            "reach_hi": reach_hi,
+            "settle": float(np.median(per_setting(m["settle"])[i])),
+            "converged": float(per_setting(m["converged"])[i].mean()),
+            "risk_err": float(per_setting(m["risk_err"])[i].mean()),
+            "overshoot": float(per_setting(m["overshoot"])[i].mean()),
+            "recovery": float(per_setting(m["recovered_pulses"])[i].sum() / ended) if ended else None,
+            "stuck": float(per_setting(m["stuck"])[i].mean()),
+            "loop_time": float(per_setting(m["loop_time"])[i].mean()),
+            "beta_rate": float(per_setting(m["beta_rate"])[i].mean()),
+        })
+    return rows
+
+
+def _floats(text: str) -> List[float]:
+    return [float(v) for v in text.split(",") if v.strip()]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sweep gyroscope controller settings on a synthetic LLM.")
+    parser.add_argument("--controller", choices=CONTROLLERS, default=LIVE)
+    parser.add_argument("--kp", type=_floats, default=None, help="comma-separated, default: controller default")
+    parser.add_argument("--target", type=_floats, default=None)
+    parser.add_argument("--threshold", type=_floats, default=None)
+    parser.add_argument("--sessions", type=int, default=1000, help="sessions per setting")
+    parser.add_argument("--pulses", type=int, default=40)
+    parser.add_argument("--tol", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixation-prob", type=float, default=SyntheticLLM.fixation_prob)
+    parser.add_argument("--initial-loop", type=float, default=SyntheticLLM.initial_loop)
+    parser.add_argument("--base-rep", type=_floats, default=None, help="comma-separated plant base_rep values")
+    parser.add_argument("--variance", type=_floats, default=None, help="comma-separated plant variance_mean values")
+    parser.add_argument("--sort", default="stuck", help="column to sort by (ascending)")
+    parser.add_argument("--json", type=Path, default=None, help="also write the rows here")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    defaults = DEFAULTS[args.controller]
+    kps = args.kp or [defaults["kp"]]
+    targets = args.target or [defaults["target_risk"]]
+    thresholds = args.threshold or [defaults["threshold"]]
+    plant = SyntheticLLM(fixation_prob=args.fixation_prob, initial_loop=args.initial_loop)
+
+    t0 = time.perf_counter()
+    rows = sweep(args.controller, kps, targets, thresholds, args.sessions, args.pulses, plant, args.seed, args.tol,
+                 base_reps=args.base_rep, variances=args.variance)
+    wall = time.perf_counter() - t0
+    total = len(rows) * args.sessions
+
+    rows.sort(key=lambda r: (r[args.sort] is None, r[args.sort]))
+    print(f">>> SIMULATOR: {args.controller}, {len(rows)} settings x {args.sessions} sessions x "
+          f"{args.pulses} pulses in {wall:.2f}s ({total / wall:,.0f} sessions/s)")
+    t_lo, t_hi = T_RANGE[args.controller]
+    for br, var in sorted({(r["base_rep"], r["variance"]) for r in rows}):
+        lo, hi = next((r["reach_lo"], r["reach_hi"]) for r in rows if (r["base_rep"], r["variance"]) == (br, var))
+        print(f">>> SIMULATOR: loop-free risk {lo:.3f}..{hi:.3f} over T {t_lo}..{t_hi} "
+              f"(base_rep={br:g}, variance={var:g})")
+    header = ("kp", "target_risk", "threshold", "base_rep", "variance", "settle", "converged", "risk_err",
+              "overshoot", "recovery", "stuck", "loop_time", "beta_rate")
+    print("    " + " ".join(f"{h:>11}" for h in header))
+    for row in rows:
+        cells = ["-" if row[h] is None else f"{row[h]:.3f}" for h in header]
+        print("    " + " ".join(f"{c:>11}" for c in cells))
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps({"plant": asdict(plant), "rows": rows}, indent=2), encoding="utf-8")
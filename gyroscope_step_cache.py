@@ -0,0 +1,276 @@
+"""
+gyroscope_step_cache.py
+
+Cross-session cache of executed plan steps, keyed by step semantics.
+
+Many goals share near-identical sub-steps ("Define game entities",
+"Set up project structure"). IntentArchitect used to regenerate every one of
+them with a full 900-token call. StepResultCache stores accepted step
+outputs under an embedding of (step text, goal summary) and, for a new step,
+returns the nearest cached one by cosine similarity:
+
+    similarity >= reuse_threshold  → REUSE  (output used as is, no LLM call)
+    similarity >= adapt_threshold  → ADAPT  (cached output is lightly adapted)
+    otherwise                      → miss   (normal generation)
+
+Entries are tagged with the generating model; lookups only see entries of
+the current model, and invalidate() drops a model's entries for good.
+Entries embedded with a different embedding model are ignored on load
+(their vectors live in another space).
+
+Storage is an append-only JSONL file; a new entry costs one appended line
+and one row written into the in-memory embedding matrix. Past max_entries
+the oldest entries are trimmed lazily, once the cache is `trim_slack`
+entries over (matrix rows shifted in place, file compacted in one rewrite).
+The cache does blocking file I/O; asyncio callers run it in a worker
+thread.
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+DEFAULT_STEP_CACHE_PATH = Path(__file__).resolve().parent / ".gyro_cache" / "steps.jsonl"
+DEFAULT_EMBED_MODEL = "text-embedding-3-small"
+
+REUSE = "reuse"
+ADAPT = "adapt"
+
+
+@dataclass
+class StepHit:
+    chunk: str
+    similarity: float
+    mode: str          # REUSE | ADAPT
+    step: str          # the cached step text
+    goal: str
+
+
+class StepResultCache:
+    """
+    Embedding-keyed store of accepted step outputs (see module docstring).
+    The caller embeds key_text(step, goal) and passes the vector in, so the
+    cache works the same for sync and async clients.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = DEFAULT_STEP_CACHE_PATH,
+        reuse_threshold: float = 0.95,
+        adapt_threshold: float = 0.86,
+        max_entries: int = 5000,
+        goal_chars: int = 300,
+        embed_model: str = DEFAULT_EMBED_MODEL,
+        trim_slack: Optional[int] = None,
+    ):
+        if adapt_threshold > reuse_threshold:
+            raise ValueError("adapt_threshold must not exceed reuse_threshold")
+        self.path = Path(path) if path else None
+        self.reuse_threshold = reuse_threshold
+        self.adapt_threshold = adapt_threshold
+        self.max_entries = max_entries
+        self.goal_chars = goal_chars
+        self.embed_model = embed_model
+        self.trim_slack = trim_slack if trim_slack is not None else max(1, max_entries // 10)
+
+        self._entries: List[Dict[str, Any]] = []
+        # row-normalised embeddings / generating model per row; buffers with
+        # spare capacity, rows [:len(self._entries)] are in use
+        self._matrix: Optional[np.ndarray] = None
+        self._models: Optional[np.ndarray] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "reuse_hits": 0, "adapt_hits": 0, "misses": 0, "stores": 0}
+
+    # ---------- KEYS ----------
+
+    def goal_summary(self, goal: str) -> str:
+        """Whitespace-normalised head of the user goal."""
+        return " ".join(goal.split())[: self.goal_chars]
+
+    def key_text(self, step: str, goal: str) -> str:
+        return f"STEP: {step.strip()}\nGOAL: {self.goal_summary(goal)}"
+
+    # ---------- STORAGE ----------
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    entry = json.loads(line)
+                    if entry.get("embed_model") == self.embed_model:
+                        self._entries.append(entry)
+        except Exception as e:
+            print(f"[StepResultCache] Failed to load cache: {e}")
+        self._entries = self._entries[-self.max_entries:]
+        self._matrix = None
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"[StepResultCache] Failed to persist entry: {e}")
+
+    def _rewrite(self) -> None:
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for entry in self._entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            tmp.replace(self.path)
+        except Exception as e:
+            print(f"[StepResultCache] Failed to rewrite cache: {e}")
+
+    @staticmethod
+    def _normalise(rows: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(rows, axis=-1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        return rows / norms
+
+    def _get_matrix(self) -> np.ndarray:
+        n = len(self._entries)
+        if self._matrix is None:
+            if not self._entries:
+                return np.zeros((0, 0), dtype=np.float32)
+            m = np.asarray([e["embedding"] for e in self._entries], dtype=np.float32)
+            capacity = max(n * 2, 64)
+            self._matrix = np.zeros((capacity, m.shape[1]), dtype=np.float32)
+            self._matrix[:n] = self._normalise(m)
+            self._models = np.empty(capacity, dtype=object)
+            self._models[:n] = [e["model"] for e in self._entries]
+        return self._matrix[:n]
+
+    def _add_row(self, entry: Dict[str, Any]) -> None:
+        """Write the newest entry's row (call after appending it to _entries)."""
+        if self._matrix is None:
+            return  # built from _entries on the next lookup
+        row = np.asarray(entry["embedding"], dtype=np.float32)
+        if row.shape[0] != self._matrix.shape[1]:
+            self._matrix = None
+            return
+        n = len(self._entries)
+        if n > self._matrix.shape[0]:
+            grown = np.zeros((n * 2, self._matrix.shape[1]), dtype=np.float32)
+            grown[: n - 1] = self._matrix[: n - 1]
+            self._matrix = grown
+            models = np.empty(n * 2, dtype=object)
+            models[: n - 1] = self._models[: n - 1]
+            self._models = models
+        self._matrix[n - 1] = self._normalise(row)
+        self._models[n - 1] = entry["model"]
+
+    def _trim(self) -> bool:
+        """Drop the oldest entries once trim_slack over max_entries; True if trimmed."""
+        drop = len(self._entries) - self.max_entries
+        if drop < self.trim_slack:
+            return False
+        n = len(self._entries)
+        self._entries = self._entries[drop:]
+        if self._matrix is not None:
+            self._matrix[: n - drop] = self._matrix[drop:n]
+            self._models[: n - drop] = self._models[drop:n]
+        return True
+
+    # ---------- PUBLIC API ----------
+
+    def lookup(self, vector: List[float], model: str) -> Optional[StepHit]:
+        """Nearest cached step for this model above adapt_threshold, or None."""
+        with self._lock:
+            self._load()
+            self._stats["lookups"] += 1
+
+            matrix = self._get_matrix()
+            query = np.asarray(vector, dtype=np.float32)
+            norm = float(np.linalg.norm(query))
+            if matrix.shape[0] == 0 or norm == 0.0 or matrix.shape[1] != query.shape[0]:
+                self._stats["misses"] += 1
+                return None
+
+            sims = matrix @ (query / norm)
+            sims[self._models[: matrix.shape[0]] != model] = -1.0
+            best = int(np.argmax(sims))
+            similarity = float(sims[best])
+
+            if similarity >= self.reuse_threshold:
+                mode = REUSE
+            elif similarity >= self.adapt_threshold:
+                mode = ADAPT
+            else:
+                self._stats["misses"] += 1
+                return None
+
+            self._stats[f"{mode}_hits"] += 1
+            entry = self._entries[best]
+            return StepHit(
+                chunk=entry["chunk"],
+                similarity=similarity,
+                mode=mode,
+                step=entry["step"],
+                goal=entry["goal"],
+            )
+
+    def store(self, vector: List[float], step: str, goal: str, model: str, chunk: str) -> None:
+        if not chunk.strip():
+            return
+        entry = {
+            "step": step.strip(),
+            "goal": self.goal_summary(goal),
+            "model": model,
+            "embed_model": self.embed_model,
+            "embedding": [float(x) for x in vector],
+            "chunk": chunk,
+            "created": time.time(),
+        }
+        with self._lock:
+            self._load()
+            self._entries.append(entry)
+            self._add_row(entry)
+            self._stats["stores"] += 1
+            if self._trim():
+                self._rewrite()
+            else:
+                self._append(entry)
+
+    def invalidate(self, model: Optional[str] = None) -> int:
+        """Drop entries of `model` (all entries when None). Returns how many."""
+        with self._lock:
+            self._load()
+            before = len(self._entries)
+            if model is None:
+                self._entries = []
+            else:
+                self._entries = [e for e in self._entries if e["model"] != model]
+            removed = before - len(self._entries)
+            if removed:
+                self._rewrite()
+                self._matrix = None
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            report = dict(self._stats)
+            hits = report["reuse_hits"] + report["adapt_hits"]
+            report["hit_rate"] = hits / report["lookups"] if report["lookups"] else 0.0
+            report["entries"] = len(self._entries)
+            return report
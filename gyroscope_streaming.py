@@ -0,0 +1,171 @@
+"""
+gyroscope_streaming.py
+
+Streaming wrappers for Responses API calls made by GyroLLMClient /
+AsyncGyroLLMClient.
+
+A PulseStream is iterated for text deltas as they arrive; once it is drained
+(or cut short) it exposes the same data a non-streaming generate_pulse
+returns: .text, .total_tokens and .raw (the final response object).
+
+    stream = client.stream_pulse(prompt, max_tokens=900)
+    for delta in stream:
+        print(delta, end="")
+    text, total_tokens, raw = stream.result()
+
+`stop_when(text_so_far) -> bool` lets the caller cut generation short
+(e.g. a local completeness check or an exhausted deadline); the upstream
+HTTP stream is closed and .stopped_early is set. The upstream is closed as
+well whenever iteration ends before the stream is drained (an error, or a
+consumer that closes / abandons the iterator).
+
+A stream cut short never sees the final usage. With `prompt_tokens`,
+.total_tokens then falls back to prompt_tokens + an estimate of the text
+streamed so far (.estimated is set), so budgets still charge the call.
+
+`on_complete(text, total_tokens, raw)` runs only for a stream that ran to
+its final event (e.g. a cache write); `on_finish(total_tokens)` runs for
+every live stream however it ended (e.g. settling a rate-limit reservation).
+"""
+
+from typing import AsyncIterator, Callable, Iterator, Optional, Tuple
+
+from gyroscope_context import estimate_tokens
+
+
+_DELTA_EVENT = "response.output_text.delta"
+_FINAL_EVENTS = ("response.completed", "response.incomplete", "response.failed")
+
+StopPredicate = Callable[[str], bool]
+CompleteCallback = Callable[[str, Optional[int], object], None]
+FinishCallback = Callable[[Optional[int]], None]
+
+
+class _PulseStreamBase:
+    def __init__(
+        self,
+        events,
+        stop_when: Optional[StopPredicate] = None,
+        on_complete: Optional[CompleteCallback] = None,
+        prompt_tokens: Optional[int] = None,
+        on_finish: Optional[FinishCallback] = None,
+    ):
+        self._events = events
+        self._stop_when = stop_when
+        self._on_complete = on_complete
+        self._on_finish = on_finish
+        self._prompt_tokens = prompt_tokens
+        self._buffer = ""
+        self._done = False
+
+        self.text: str = ""
+        self.total_tokens: Optional[int] = None
+        self.raw: object = None
+        self.stopped_early: bool = False
+        self.estimated: bool = False
+
+    def _absorb(self, event) -> Optional[str]:
+        """Handle one SSE event; return a text delta or None."""
+        kind = getattr(event, "type", "")
+        if kind == _DELTA_EVENT:
+            delta = getattr(event, "delta", "") or ""
+            self._buffer += delta
+            return delta
+        if kind in _FINAL_EVENTS:
+            self.raw = getattr(event, "response", None)
+        return None
+
+    def _should_stop(self) -> bool:
+        if self._stop_when is not None and self._stop_when(self._buffer):
+            self.stopped_early = True
+            return True
+        return False
+
+    def _finish(self) -> None:
+        if self._done:
+            return
+        self._done = True
+        self.text = self._buffer.strip()
+        usage = getattr(self.raw, "usage", None)
+        self.total_tokens = getattr(usage, "total_tokens", None) if usage else None
+        if self.total_tokens is None and self._prompt_tokens is not None:
+            self.total_tokens = self._prompt_tokens + estimate_tokens(self._buffer)
+            self.estimated = True
+        if self._on_finish is not None:
+            self._on_finish(self.total_tokens)
+        if self._on_complete is not None and not self.stopped_early and self.raw is not None:
+            self._on_complete(self.text, self.total_tokens, self.raw)
+
+    @classmethod
+    def from_result(cls, text: str, total_tokens: Optional[int], raw: object):
+        """A stream that replays an already known result (e.g. a cache hit)."""
+        stream = cls(None)
+        stream._buffer = text
+        stream.raw = raw
+        stream._finish()
+        stream.total_tokens = total_tokens
+        return stream
+
+
+class PulseStream(_PulseStreamBase):
+    """Synchronous stream of text deltas (see module docstring)."""
+
+    def __iter__(self) -> Iterator[str]:
+        if self._done:
+            if self.text and self._events is None:
+                yield self.text
+            return
+        drained = False
+        try:
+            for event in self._events:
+                delta = self._absorb(event)
+                if delta:
+                    yield delta
+                    if self._should_stop():
+                        break
+            else:
+                drained = True
+        finally:
+            # cut short by stop_when, an error or a consumer that walked away
+            if not drained:
+                close = getattr(self._events, "close", None)
+                if close is not None:
+                    close()
+            self._finish()
+
+    def result(self) -> Tuple[str, Optional[int], object]:
+        for _ in self:
+            pass
+        return self.text, self.total_tokens, self.raw
+
+
+class AsyncPulseStream(_PulseStreamBase):
+    """Asynchronous stream of text deltas (see module docstring)."""
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        if self._done:
+            if self.text and self._events is None:
+                yield self.text
+            return
+        drained = False
+        try:
+            async for event in self._events:
+                delta = self._absorb(event)
+                if delta:
+                    yield delta
+                    if self._should_stop():
+                        break
+            else:
+                drained = True
+        finally:
+            # cut short by stop_when, an error or a consumer that walked away
+            if not drained:
+                close = getattr(self._events, "close", None)
+                if close is not None:
+                    await close()
+            self._finish()
+
+    async def result(self) -> Tuple[str, Optional[int], object]:
+        async for _ in self:
+            pass
+        return self.text, self.total_tokens, self.raw
@@ -0,0 +1,256 @@
+"""
+gyroscope_telemetry.py
+
+Structured per-pulse telemetry for the pulse controllers and the architect.
+
+CoherenceController and AutopoieticGyroscope used to print several
+formatted lines per pulse; under uvicorn that stdout traffic costs real time
+and nothing could consume the numbers. PulseTelemetry keeps one record per
+pulse in a preallocated numpy structured array used as a ring buffer:
+
+    session, source, pulse, t, temperature, risk, pmon_risk, entropy, rep2,
+    adj_rate, beta, delta, aborted, latency_s, wait_s (rate-limit queueing),
+    prompt_tokens, pulse_tokens (max_tokens requested), output_tokens
+
+Recording a pulse is a row write, no allocation. Consumers:
+
+    telemetry.records()           – dicts, oldest first
+    telemetry.session_history()   – the per-step dicts MemorySynapse
+                                    .extract_telemetry expects
+    telemetry.subscribe(fn)       – fn(record) per pulse; console_subscriber()
+                                    is the old console output, now optional
+    PulseTelemetry(jsonl_path=…)  – rows are appended to a JSONL file in
+                                    batches (and before the ring overwrites them)
+
+Unknown float fields are NaN in the array and left out of the dicts.
+"""
+
+import json
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+PULSE_DTYPE = np.dtype([
+    ("session", "U32"),
+    ("source", "U16"),
+    ("pulse", np.int32),
+    ("t", np.float64),
+    ("temperature", np.float32),
+    ("risk", np.float32),
+    ("pmon_risk", np.float32),
+    ("entropy", np.float32),
+    ("rep2", np.float32),
+    ("adj_rate", np.float32),
+    ("beta", np.bool_),
+    ("delta", np.bool_),
+    ("aborted", np.bool_),
+    ("latency_s", np.float32),
+    ("wait_s", np.float32),
+    ("prompt_tokens", np.int32),
+    ("pulse_tokens", np.int32),
+    ("output_tokens", np.int32),
+])
+
+_FLOAT_FIELDS = tuple(
+    name for name in PULSE_DTYPE.names if PULSE_DTYPE[name].kind == "f" and name != "t"
+)
+_DEFAULTS: Dict[str, Any] = {name: math.nan for name in _FLOAT_FIELDS}
+_DEFAULTS.update(session="", source="", pulse=0, beta=False, delta=False, aborted=False,
+                 prompt_tokens=0, pulse_tokens=0, output_tokens=0)
+
+Subscriber = Callable[[Dict[str, Any]], None]
+
+
+class PulseTelemetry:
+    """
+    Ring buffer of the last `capacity` pulse records (see module docstring).
+    Thread-safe; one instance can be shared by many controllers, records are
+    told apart by `session`.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        jsonl_path: Optional[Path] = None,
+        flush_every: int = 64,
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self.jsonl_path = Path(jsonl_path) if jsonl_path else None
+        self.flush_every = max(1, min(flush_every, capacity))
+
+        self._rows = np.zeros(capacity, dtype=PULSE_DTYPE)
+        self._count = 0        # records ever written
+        self._flushed = 0      # records already in the JSONL file
+        self._subscribers: List[Subscriber] = []
+        self._lock = threading.Lock()
+
+    # ---------- WRITE ----------
+
+    def record(self, **fields: Any) -> None:
+        """Store one pulse; unknown keys raise, missing ones get defaults."""
+        unknown = set(fields) - set(_DEFAULTS) - {"t"}
+        if unknown:
+            raise KeyError(f"Unknown telemetry fields: {sorted(unknown)}")
+        with self._lock:
+            if self.jsonl_path is not None and self._count - self._flushed >= self.capacity:
+                self._flush_locked()  # the ring is about to overwrite unflushed rows
+            row = self._rows[self._count % self.capacity]
+            for name, default in _DEFAULTS.items():
+                value = fields.pop(name, default)
+                row[name] = default if value is None else value
+            row["t"] = fields.pop("t", time.time())
+            self._count += 1
+            due = self.jsonl_path is not None and self._count - self._flushed >= self.flush_every
+            if due:
+                self._flush_locked()
+            subscribers = list(self._subscribers)
+            record = _row_to_dict(row) if subscribers else None
+
+        for fn in subscribers:
+            fn(record)
+
+    # ---------- SUBSCRIBERS ----------
+
+    def subscribe(self, fn: Subscriber) -> Subscriber:
+        with self._lock:
+            self._subscribers.append(fn)
+        return fn
+
+    def unsubscribe(self, fn: Subscriber) -> None:
+        with self._lock:
+            if fn in self._subscribers:
+                self._subscribers.remove(fn)
+
+    # ---------- READ ----------
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def _ordered_rows(self) -> np.ndarray:
+        n = len(self)
+        if self._count <= self.capacity:
+            return self._rows[:n].copy()
+        start = self._count % self.capacity
+        return np.concatenate((self._rows[start:], self._rows[:start]))
+
+    def array(self, session: Optional[str] = None) -> np.ndarray:
+        """Structured array of the buffered records, oldest first."""
+        with self._lock:
+            rows = self._ordered_rows()
+        if session is not None:
+            rows = rows[rows["session"] == session]
+        return rows
+
+    def records(self, session: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [_row_to_dict(row) for row in self.array(session)]
+
+    def session_history(self, session: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per-pulse dicts in the shape MemorySynapse.extract_telemetry reads."""
+        history = []
+        for rec in self.records(session):
+            step = {
+                "pulse": rec["pulse"],
+                "source": rec["source"],
+                "actuator_beta_triggered": rec["beta"],
+                "actuator_delta_triggered": rec["delta"],
+            }
+            for key, name in (
+                ("temperature", "temperature"),
+                ("risk", "risk"),
+                ("entropy", "entropy"),
+                ("repetition_rate", "rep2"),
+            ):
+                if name in rec:
+                    step[key] = rec[name]
+            history.append(step)
+        return history
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self.array()
+        latency = rows["latency_s"][~np.isnan(rows["latency_s"])]
+        return {
+            "records": int(self._count),
+            "buffered": len(rows),
+            "flushed": int(self._flushed),
+            "output_tokens": int(rows["output_tokens"].sum()),
+            "beta": int(rows["beta"].sum()),
+            "delta": int(rows["delta"].sum()),
+            "latency_p50_s": float(np.percentile(latency, 50)) if len(latency) else None,
+            "latency_p95_s": float(np.percentile(latency, 95)) if len(latency) else None,
+            "wait_s": float(np.nansum(rows["wait_s"])),
+        }
+
+    # ---------- JSONL ----------
+
+    def flush(self) -> int:
+        """Append unflushed records to jsonl_path; returns how many."""
+        with self._lock:
+            return self._flush_locked()
+
+    def _flush_locked(self) -> int:
+        if self.jsonl_path is None or self._flushed == self._count:
+            return 0
+        start = max(self._flushed, self._count - self.capacity)
+        lines = [
+            json.dumps(_row_to_dict(self._rows[i % self.capacity]), ensure_ascii=False)
+            for i in range(start, self._count)
+        ]
+        try:
+            self.jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except Exception as e:
+            print(f"[PulseTelemetry] Failed to flush telemetry: {e}")
+            return 0
+        self._flushed = self._count
+        return len(lines)
+
+
+def _row_to_dict(row: np.void) -> Dict[str, Any]:
+    record: Dict[str, Any] = {}
+    for name in PULSE_DTYPE.names:
+        value = row[name].item()
+        if isinstance(value, float) and math.isnan(value):
+            continue
+        if name in _FLOAT_FIELDS:
+            value = round(value, 4)  # float32 storage; don't print 0.30000001
+        record[name] = value
+    return record
+
+
+# ======== CONSOLE ========
+
+def console_subscriber(prefix: str = "[Gyroscope]") -> Subscriber:
+    """One console line per pulse (what the controllers used to print)."""
+    def show(rec: Dict[str, Any]) -> None:
+        parts = [f"{prefix} pulse {rec['pulse']}"]
+        for key, label in (
+            ("temperature", "T"),
+            ("risk", "risk"),
+            ("pmon_risk", "pmon"),
+            ("entropy", "H"),
+            ("rep2", "rep2"),
+            ("adj_rate", "adj"),
+        ):
+            if key in rec:
+                parts.append(f"{label}={rec[key]:.3f}")
+        if rec["pulse_tokens"]:
+            parts.append(f"tokens={rec['output_tokens']}/{rec['pulse_tokens']}")
+        else:
+            parts.append(f"tokens={rec['output_tokens']}")
+        if "latency_s" in rec:
+            parts.append(f"{rec['latency_s']:.2f}s")
+        if rec.get("wait_s"):
+            parts.append(f"waited {rec['wait_s']:.2f}s")
+        flags = [name.upper() for name in ("beta", "delta", "aborted") if rec[name]]
+        if flags:
+            parts.append(" ".join(flags))
+        print(" | ".join(parts))
+    return show
@@ -1,28 +1,310 @@
-import requests
+"""
+test_client.py
+
+SSE client for the Gyroscope gateway (/v1/chat/completions).
+
+    python test_client.py
+        – one streaming request, deltas printed as they arrive
+
+    python test_client.py load --rate 2 --requests 100 --clients 16 \\
+        --mode architect --memory none --label my-build --out report.json
+        – open-loop load: arrivals follow a Poisson process at --rate req/s
+          regardless of how fast the gateway answers; up to --clients
+          requests are in flight at once (the rest wait, and that wait
+          counts towards their latency – no coordinated omission)
+
+Prompt mix (--prompts mix.json):
+    [{"prompt": "...", "weight": 3, "mode": "architect", "memory": "read"}, ...]
+mode / memory per entry are optional and default to --mode / --memory.
+
+The JSON report has TTFB, time to first content chunk, inter-chunk gap,
+total latency and queue delay percentiles, throughput and error rates.
+"""
+
+import argparse
 import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+
+
+DEFAULT_URL = "http://127.0.0.1:8000/v1/chat/completions"
+
+DEFAULT_PROMPTS: List[Dict[str, Any]] = [
+    {"prompt": "Wyjaśnij w 2 zdaniach, co robi Gyroscope middleware.", "weight": 1},
+    {"prompt": "Write a Python Snake game with a clean, modular architecture using Pygame.", "weight": 2},
+    {"prompt": "Design a REST API for a todo list with users and tags.", "weight": 2},
+]
+
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def _payload(prompt: str) -> Dict[str, Any]:
+    return {
+        "model": "gpt-3.5-turbo",
+        "stream": True,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+
+
+def _headers(mode: Optional[str], memory: Optional[str]) -> Dict[str, str]:
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": "Bearer DUMMY",  # proxy i tak tego nie używa na razie
+    }
+    if mode:
+        headers["x-gyro-mode"] = mode
+    if memory:
+        headers["x-gyro-memory"] = memory
+    return headers
+
+
+def _content_delta(data: bytes) -> Optional[str]:
+    try:
+        chunk = json.loads(data)
+        return chunk["choices"][0]["delta"].get("content", "")
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Single request
+# ---------------------------------------------------------------------------
+
+def run_once(url: str, prompt: str, mode: Optional[str], memory: Optional[str]) -> None:
+    with requests.post(url, headers=_headers(mode, memory), data=json.dumps(_payload(prompt)), stream=True) as r:
+        for line in r.iter_lines():
+            if not line:
+                continue
+            if line.startswith(b"data: "):
+                data = line[len(b"data: "):]
+                if data == b"[DONE]":
+                    print("\n[STREAM DONE]")
+                    break
+                delta = _content_delta(data)
+                if delta:
+                    print(delta, end="", flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------------
+
+def _measure(
+    url: str,
+    item: Dict[str, Any],
+    scheduled_at: float,
+    timeout: float,
+) -> Dict[str, Any]:
+    """One streamed request; all times in seconds, relative to scheduled_at."""
+    started = time.monotonic()
+    result: Dict[str, Any] = {
+        "prompt_index": item["_index"],
+        "queue_delay": started - scheduled_at,
+        "ttfb": None,
+        "first_content": None,
+        "gaps": [],
+        "total": None,
+        "chunks": 0,
+        "bytes": 0,
+        "status": None,
+        "error": None,
+    }
+    last_chunk_at = None
+    done = False
+    try:
+        with _session().post(
+            url,
+            headers=_headers(item.get("mode"), item.get("memory")),
+            data=json.dumps(_payload(item["prompt"])),
+            stream=True,
+            timeout=timeout,
+        ) as r:
+            result["status"] = r.status_code
+            if r.status_code != 200:
+                result["error"] = f"http_{r.status_code}"
+            else:
+                for line in r.iter_lines():
+                    now = time.monotonic()
+                    if result["ttfb"] is None:
+                        result["ttfb"] = now - scheduled_at
+                    result["bytes"] += len(line)
+                    if not line.startswith(b"data: "):
+                        continue
+                    data = line[len(b"data: "):]
+                    if data == b"[DONE]":
+                        done = True
+                        break
+                    if _content_delta(data) is None:
+                        continue  # status event
+                    if last_chunk_at is None:
+                        result["first_content"] = now - scheduled_at
+                    else:
+                        result["gaps"].append(now - last_chunk_at)
+                    last_chunk_at = now
+                    result["chunks"] += 1
+                if not done:
+                    result["error"] = "stream_incomplete"
+    except requests.Timeout:
+        result["error"] = "timeout"
+    except requests.RequestException as e:
+        result["error"] = type(e).__name__
+    result["total"] = time.monotonic() - scheduled_at
+    return result
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"count": 0, "p50": None, "p90": None, "p95": None, "p99": None, "max": None, "mean": None}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4)
+
+    return {
+        "count": len(ordered),
+        "p50": pick(0.50),
+        "p90": pick(0.90),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": round(ordered[-1], 4),
+        "mean": round(sum(ordered) / len(ordered), 4),
+    }
+
+
+def build_report(results: List[Dict[str, Any]], wall_s: float, config: Dict[str, Any]) -> Dict[str, Any]:
+    ok = [r for r in results if r["error"] is None]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if r["error"] is not None:
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+    gaps = [g for r in ok for g in r["gaps"]]
+    return {
+        "config": config,
+        "wall_s": round(wall_s, 3),
+        "requests": len(results),
+        "succeeded": len(ok),
+        "error_rate": round((len(results) - len(ok)) / len(results), 4) if results else 0.0,
+        "errors": errors,
+        "throughput_rps": round(len(ok) / wall_s, 4) if wall_s > 0 else None,
+        "chunks_per_s": round(sum(r["chunks"] for r in ok) / wall_s, 2) if wall_s > 0 else None,
+        "latency_s": {
+            "queue_delay": _percentiles([r["queue_delay"] for r in results]),
+            "ttfb": _percentiles([r["ttfb"] for r in ok if r["ttfb"] is not None]),
+            "first_content": _percentiles([r["first_content"] for r in ok if r["first_content"] is not None]),
+            "inter_chunk_gap": _percentiles(gaps),
+            "total": _percentiles([r["total"] for r in ok]),
+        },
+    }
+
+
+def run_load(
+    url: str,
+    prompts: List[Dict[str, Any]],
+    rate: float,
+    total_requests: int,
+    clients: int,
+    timeout: float,
+    seed: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Open-loop Poisson arrivals at `rate` req/s, at most `clients` in flight."""
+    rng = random.Random(seed)
+    weights = [float(p.get("weight", 1.0)) for p in prompts]
+    results: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+
+    def worker(item: Dict[str, Any], scheduled_at: float) -> None:
+        res = _measure(url, item, scheduled_at, timeout)
+        with lock:
+            results.append(res)
+            done = len(results)
+        status = res["error"] or "ok"
+        print(f">>> LOAD: {done}/{total_requests} {status} total={res['total']:.2f}s", file=sys.stderr)
+
+    next_at = time.monotonic()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for _ in range(total_requests):
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            item = rng.choices(prompts, weights=weights)[0]
+            pool.submit(worker, item, next_at)
+            next_at += rng.expovariate(rate) if rate > 0 else 0.0
+    return results
+
+
+def _load_prompts(path: Optional[str], mode: Optional[str], memory: Optional[str]) -> List[Dict[str, Any]]:
+    prompts = DEFAULT_PROMPTS
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            prompts = json.load(f)
+    mix = []
+    for i, p in enumerate(prompts):
+        item = dict(p)
+        item.setdefault("mode", mode)
+        item.setdefault("memory", memory)
+        item["_index"] = i
+        mix.append(item)
+    return mix
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Gyroscope gateway SSE client / load generator.")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--mode", default=None, help="x-gyro-mode header (e.g. architect)")
+    parser.add_argument("--memory", default=None, help="x-gyro-memory header (none|read|write|rw)")
+    sub = parser.add_subparsers(dest="command")
+
+    load = sub.add_parser("load", help="open-loop concurrent load test")
+    load.add_argument("--rate", type=float, default=1.0, help="arrivals per second (Poisson)")
+    load.add_argument("--requests", type=int, default=20, help="total requests to send")
+    load.add_argument("--clients", type=int, default=8, help="max concurrent streams")
+    load.add_argument("--prompts", help="JSON prompt mix file")
+    load.add_argument("--timeout", type=float, default=300.0, help="per-request read timeout (s)")
+    load.add_argument("--seed", type=int, default=None)
+    load.add_argument("--label", default="", help="free-form build label stored in the report")
+    load.add_argument("--out", help="write the JSON report here (default: stdout)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+
+    if args.command != "load":
+        run_once(args.url, DEFAULT_PROMPTS[0]["prompt"], args.mode, args.memory)
+        sys.exit(0)
+
+    mix = _load_prompts(args.prompts, args.mode, args.memory)
+    t0 = time.monotonic()
+    results = run_load(args.url, mix, args.rate, args.requests, args.clients, args.timeout, args.seed)
+    wall = time.monotonic() - t0
 
-url = "http://127.0.0.1:8000/v1/chat/completions"
-payload = {
-    "model": "gpt-3.5-turbo",
-    "stream": True,
-    "messages": [
-        {"role": "user", "content": "Wyjaśnij w 2 zdaniach, co robi Gyroscope middleware."}
-    ]
-}
-headers = {
-    "Content-Type": "application/json",
-    "Authorization": "Bearer DUMMY"  # proxy i tak tego nie używa na razie
-}
-
-with requests.post(url, headers=headers, data=json.dumps(payload), stream=True) as r:
-    for line in r.iter_lines():
-        if not line:
-            continue
-        if line.startswith(b"data: "):
-            data = line[len(b"data: "):]
-            if data == b"[DONE]":
-                print("\n[STREAM DONE]")
-                break
-            chunk = json.loads(data)
-            delta = chunk["choices"][0]["delta"].get("content", "")
-            print(delta, end="", flush=True)
+    report = build_report(results, wall, {
+        "label": args.label,
+        "url": args.url,
+        "rate": args.rate,
+        "requests": args.requests,
+        "clients": args.clients,
+        "mode": args.mode,
+        "memory": args.memory,
+        "prompts": [{k: v for k, v in p.items() if k != "_index"} for p in mix],
+        "seed": args.seed,
+    })
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f">>> LOAD: report written to {args.out}", file=sys.stderr)
+    else:
+        print(text)